@@ -18,6 +18,13 @@ class FamilyInstallerEXT(FamilyUtils):
 
 
 
+        self.setup_batch_parameters()
+        self.setup_placement_parameters()
+        self.setup_profile_parameters()
+        self.setup_governor_parameters()
+        self.setup_library_parameters()
+        self.setup_startup_parameters()
+
         family_name = self.ownerComp.par.Family.eval()
         color = self.ownerComp.parGroup.Color.eval() 
         # Create the generic installer with custom family name
@@ -26,99 +33,258 @@ class FamilyInstallerEXT(FamilyUtils):
             ownerComp=ownerComp,
             family_name=family_name,
             color=color,  # Blue-ish color, adjust as needed
-            compatible_types=["DAT"]
+            compatible_types=["DAT"],
+            interactive=not self.ownerComp.par.Headless.eval()
         )
+        self.installer.master_step = self.tag_master
+        if self.ownerComp.par.Governor.eval():
+            self.installer.Governor()
     
 
 
+    def setup_batch_parameters(self):
+        """
+        Adds the parameters controlling batch operations (Createstubs, Replacestubs,
+        Updateall) on a Batch page. Existing parameters are left untouched.
+        """
+        self.create_parameter('Undomode', 'menu', 'Batch', label='Undo Mode',
+                              menuNames=['single', 'chunked', 'journal'],
+                              menuLabels=['Single Block', 'Chunked', 'Journal Only'])
+        self.create_parameter('Undochunk', 'int', 'Batch', label='Undo Chunk Size',
+                              default=200, norm_min=1,
+                              help='Operations per undo block in Chunked mode')
+        self.create_parameter('Scope', 'menu', 'Batch', label='Scope',
+                              menuNames=['project', 'root', 'selection'],
+                              menuLabels=['Whole Project', 'Scope Root', 'Current Selection'],
+                              help='Where Createstubs, Replacestubs and Updateall look for operators')
+        self.create_parameter('Scoperoot', 'comp', 'Batch', label='Scope Root',
+                              help='COMP searched, with its children, when Scope is Scope Root')
+        self.create_parameter('Stubtype', 'menu', 'Batch', label='Stub Type',
+                              menuNames=['empty', 'frozen'],
+                              menuLabels=['Empty', 'Frozen Outputs'],
+                              help='Frozen stubs keep serving a locked snapshot of their outputs downstream')
+        self.create_parameter('Stubselect', 'menu', 'Batch', label='Stub Selection',
+                              menuNames=['all', 'top', 'score'],
+                              menuLabels=['Whole Family', 'Top N Candidates', 'Score Above'],
+                              help='Which instances Createstubs stubs, ranked by the stub_advisor table')
+        self.create_parameter('Stubtop', 'int', 'Batch', label='Top N',
+                              default=10, norm_min=1,
+                              help='Number of best ranked candidates stubbed in Top N mode')
+        self.create_parameter('Stubminscore', 'float', 'Batch', label='Minimum Score',
+                              default=50.0, norm_min=0, norm_max=100,
+                              help='Stub advisor score (0-100) required in Score Above mode')
+        self.create_parameter('Revertjournal', 'pulse', 'Batch', label='Revert Journal',
+                              help='Reverts the last batch recorded in Journal Only mode')
+        self.create_parameter('Headless', 'toggle', 'Batch', label='Headless',
+                              default=False,
+                              help='Never show dialogs; batch pulses run without confirmation')
+        self.create_parameter('Inventoryfile', 'file', 'Batch', label='Inventory File',
+                              help='JSON lines file written by Export Inventory')
+        self.create_parameter('Exportinventory', 'pulse', 'Batch', label='Export Inventory')
+        self.create_parameter('Backfilltypetags', 'pulse', 'Batch', label='Backfill Type Tags',
+                              help='Tags the instances without a type tag with the type of their master')
+        self.create_parameter('Perffile', 'file', 'Batch', label='Perf Report File',
+                              help='Optional JSON file receiving the perf_report phase timings')
+
+    def setup_placement_parameters(self):
+        """
+        Adds the parameters controlling how operators are placed from the
+        OP Create menu on a Placement page.
+        """
+        self.create_parameter('Placemode', 'menu', 'Placement', label='Place Mode',
+                              menuNames=['copy', 'clone'],
+                              menuLabels=['Independent Copy', 'Clone of Master'],
+                              help='Clone links placed operators to their master, Updateall then only resyncs them')
+
+    def setup_profile_parameters(self):
+        """
+        Adds the cook cost profiler parameters on a Profile page.
+        """
+        self.create_parameter('Profile', 'pulse', 'Profile', label='Profile',
+                              help='Samples the cook cost of every family operator into profile_report')
+        self.create_parameter('Profileframes', 'int', 'Profile', label='Frames',
+                              default=30, norm_min=1,
+                              help='Number of frames sampled by Profile')
+        self.create_parameter('Advise', 'pulse', 'Profile', label='Stub Advisor',
+                              help='Ranks instances by expected stubbing savings into stub_advisor')
+        self.create_parameter('Profiletop', 'int', 'Profile', label='Top Offenders',
+                              default=20, norm_min=1,
+                              help='Number of instances listed in profile_top')
+
+    def setup_governor_parameters(self):
+        """
+        Adds the cooking governor parameters on a Governor page.
+        """
+        self.create_parameter('Governor', 'toggle', 'Governor', label='Cooking Governor',
+                              default=False,
+                              help='Switches cooking off on low priority instances while frame time is over budget')
+        self.create_parameter('Governorbudget', 'float', 'Governor', label='Frame Budget (ms)',
+                              default=16.6, norm_min=1, norm_max=100)
+        self.create_parameter('Governorheadroom', 'float', 'Governor', label='Restore Below',
+                              default=0.8, norm_min=0, norm_max=1,
+                              help='Fraction of the budget frame time must drop under before instances are restored')
+        self.create_parameter('Governorstep', 'int', 'Governor', label='Instances per Step',
+                              default=5, norm_min=1,
+                              help='Instances throttled or restored per adjustment')
+
+    def setup_library_parameters(self):
+        """
+        Adds the lazy master library parameters on a Library page.
+        """
+        self.create_parameter('Externalizemasters', 'pulse', 'Library', label='Externalize Masters',
+                              help='Saves the masters as .tox files in the library folder and unloads them')
+        self.create_parameter('Loadmasters', 'pulse', 'Library', label='Load All Masters',
+                              help='Loads every library master back, before editing them')
+        self.create_parameter('Libraryfolder', 'folder', 'Library', label='Library Folder',
+                              default='masters')
+        self.create_parameter('Unloadidle', 'float', 'Library', label='Unload Idle (s)',
+                              default=300, norm_min=0, norm_max=3600,
+                              help='Seconds a loaded master stays unused before it is unloaded, 0 keeps it')
+        self.create_parameter('Prewarm', 'pulse', 'Library', label='Prewarm',
+                              help='Loads the masters of the most placed operator types')
+        self.create_parameter('Prewarmcount', 'int', 'Library', label='Prewarm Types',
+                              default=10, norm_min=1, norm_max=50)
+
+    def setup_startup_parameters(self):
+        """
+        Adds the startup installation parameters on a Startup page.
+        """
+        self.create_parameter('Startupbudget', 'float', 'Startup', label='Frame Budget (ms)',
+                              default=8, norm_min=0, norm_max=50,
+                              help='Time the startup installation may take per frame, 0 installs in one frame')
+
+    @property
+    def IsReady(self):
+        """
+        True once the startup installation of this family has finished.
+        """
+        return self.installer.startup.ready
+
+    @property
+    def StartupError(self):
+        """
+        The error that stopped the startup installation, or None.
+        """
+        return self.installer.startup.error
+
+    @property
+    def StartupQueue(self):
+        """
+        Paths of the family installers still waiting for their startup turn, shared by every family.
+        """
+        return self.installer.startup.queue()
+
+    @property
+    def Log(self):
+        """
+        The installer's logger, e.g. op.MYFAMILY.Log.Warning("No master for %s", name).
+        """
+        return self.installer.log
+
     def Install(self):
         """
         Your custom installation logic can go here, 
         called after the generic installer completes
         """
-        if self.ownerComp.par.Install:
-            self.installer.Install()
+        with self.installer.perf.phase('Install' if self.ownerComp.par.Install else 'Uninstall'):
+            if self.ownerComp.par.Install:
+                self.installer.Install()
            
             
-            # First, verify the custom_operators folder exists
-            custom_ops_folder = self.ownerComp.op('custom_operators')
-            if not custom_ops_folder:
-                # print(f"ERROR: 'custom_operators' folder not found in {self.ownerComp.path}")
-                return
+                # First, verify the custom_operators folder exists
+                custom_ops_folder = self.ownerComp.op('custom_operators')
+                if not custom_ops_folder:
+                    # print(f"ERROR: 'custom_operators' folder not found in {self.ownerComp.path}")
+                    return
             
-            # Check if there are any operators in the folder
-            master_ops = custom_ops_folder.findChildren(depth=1)
-            # print(f"Found {len(master_ops)} master operators in custom_operators folder")
+                # Check if there are any operators in the folder
+                master_ops = custom_ops_folder.findChildren(depth=1)
+                # print(f"Found {len(master_ops)} master operators in custom_operators folder")
             
-            for custom_op in master_ops:
-                if not custom_op.isCOMP and not custom_op.isBase:
-                    # print(f"Skipping {custom_op.path} - not a COMP/Base") # Adjusted check
-                    continue
+                with self.installer.perf.phase('tag masters'):
+                    for custom_op in master_ops:
+                        self.tag_master(custom_op)
+            
+                self.installer.log.Info("%s specific installation complete", self.ownerComp.par.Family.eval())
+
+            else:
+                self.installer.Uninstall()
+                self.installer.log.Info("%s specific uninstallation complete", self.ownerComp.par.Family.eval())
+
+    def tag_master(self, custom_op):
+        """
+        Tags a master of custom_operators with the family and its type tag
+        and refreshes its FamilyUtils. Called for every master by Install,
+        and one master per step by the startup scheduler.
+        """
+        if not custom_op.isCOMP and not custom_op.isBase:
+            # print(f"Skipping {custom_op.path} - not a COMP/Base") # Adjusted check
+            return
                 
-                # print(f"Processing master operator: {custom_op.path} with tags {custom_op.tags}")
+        # print(f"Processing master operator: {custom_op.path} with tags {custom_op.tags}")
                 
-                # Add the base family tag if not already present
-                if self.ownerComp.par.Family.eval() not in custom_op.tags:
-                    custom_op.tags.add(self.ownerComp.par.Family.eval())
+        # Add the base family tag if not already present
+        if self.ownerComp.par.Family.eval() not in custom_op.tags:
+            custom_op.tags.add(self.ownerComp.par.Family.eval())
                 
-                # Add specific type tags based on the master operator name
-                master_name = custom_op.name  # The name of the master operator
+        # Add specific type tags based on the master operator name
+        master_name = custom_op.name  # The name of the master operator
                 
-                # Add the specific type tag that follows the pattern {type}{family}
-                type_tag = f"{master_name}{self.ownerComp.par.Family.eval()}"
-                custom_op.tags.add(type_tag)
-                # print(f"Added type tag '{type_tag}' to {custom_op.path}")
+        # Add the specific type tag that follows the pattern {type}{family}
+        type_tag = f"{master_name}{self.ownerComp.par.Family.eval()}"
+        custom_op.tags.add(type_tag)
+        self.installer.library_changed()
+        # print(f"Added type tag '{type_tag}' to {custom_op.path}")
                 
-                # Handle FamilyUtils copying
-                target_util = custom_op.op('FamilyUtils')
-                if target_util:
-                    target_util.text = self.ownerComp.op('FamilyUtils').text
-                    target_util.expose = False
-                else:
-                    # Copy the FamilyUtils into the custom_op if it doesn't exist
-                    custom_op.copy(self.ownerComp.op('FamilyUtils'))
-                    new_util = custom_op.op('FamilyUtils')
-                    new_util.expose = False
-                    
-                # Find and tag all DATs that start with 'out'
-                try:
-                    # First let's see ALL the DATs in each operator
-                    all_dats = custom_op.findChildren(type=DAT, depth=1)
-                    if all_dats:
-                        # print(f"Found {len(all_dats)} total DATs:")
-                        for dat in all_dats:
-                            # print(f"  - {dat.name}")
-                            if dat.name.startswith('out') or dat.name.startswith('output'):
-                                # print(f"    This is an output DAT! Current tags: {dat.tags}")
-                               pass
-                    else:
-                        # print("No DATs found at all")
-                        pass
-                except Exception as e:
-                    if hasattr(op,'Logger'):
-                        op.Logger.Error(me,f"Error processing DATs in {custom_op.name}: {e}")
-                    else:
-                        print(f"Error processing DATs in {custom_op.name}: {e}")
-            
-            if hasattr(op,'Logger'):
-                op.Logger.Info(me,self.ownerComp.par.Family.eval() + " specific installation complete")
-            else:
-                print(self.ownerComp.par.Family.eval() + " specific installation complete")
+        # Library placeholders get FamilyUtils from their .tox once loaded
+        if self.installer.is_lazy(custom_op):
+            return
 
+        # Handle FamilyUtils copying
+        target_util = custom_op.op('FamilyUtils')
+        if target_util:
+            target_util.text = self.ownerComp.op('FamilyUtils').text
+            target_util.expose = False
         else:
-            self.installer.Uninstall()
-            if hasattr(op,'Logger'):
-                op.Logger.Info(me,self.ownerComp.par.Family.eval() + " specific uninstallation complete")
+            # Copy the FamilyUtils into the custom_op if it doesn't exist
+            custom_op.copy(self.ownerComp.op('FamilyUtils'))
+            new_util = custom_op.op('FamilyUtils')
+            new_util.expose = False
+    
+        # Find and tag all DATs that start with 'out'
+        try:
+            # First let's see ALL the DATs in each operator
+            all_dats = custom_op.findChildren(type=DAT, depth=1)
+            if all_dats:
+                # print(f"Found {len(all_dats)} total DATs:")
+                for dat in all_dats:
+                    # print(f"  - {dat.name}")
+                    if dat.name.startswith('out') or dat.name.startswith('output'):
+                        # print(f"    This is an output DAT! Current tags: {dat.tags}")
+                       pass
             else:
-                print(self.ownerComp.par.Family.eval() + " specific uninstallation complete")
+                # print("No DATs found at all")
+                pass
+        except Exception as e:
+            self.installer.log.Error("Error processing DATs in %s: %s", custom_op.name, e)
 
     def PlaceOp(self, panelValue, name):
              
         return True
 
     def PostPlaceOp(self, clone):
-       
-        
+        """
+        Called by the panel execute after an operator is placed. Counts the
+        placement in the usage stats and links it to its master when
+        Placemode is 'clone'.
+        """
+        type_tag = self.installer.type_tag(clone)
+        self.installer.record_usage(type_tag.removesuffix(self.installer.family_name) if type_tag else clone.name)
+        if self.ownerComp.par.Placemode.eval() == 'clone':
+            custom_ops_folder = self.ownerComp.op('custom_operators')
+            master, _ = self.installer.find_matching_master_op(clone, custom_ops_folder)
+            if master:
+                self.installer.link_to_master(clone, master)
         return
 
     def selfDestroy(self):
@@ -151,3 +317,129 @@ class FamilyInstallerEXT(FamilyUtils):
         """
         self.installer.Replacestubs()
 
+    def Revertjournal(self):
+        """
+        Reverts the last batch operation recorded in the journal.
+        """
+        self.installer.Revertjournal()
+
+    def Profile(self, frames=None):
+        """
+        Profiles the cook cost of all operators of this family by type.
+        Returns the CookProfile, complete after the sampled frames.
+        """
+        return self.installer.Profile(frames)
+
+    def Governor(self):
+        """
+        Starts or stops the cooking governor.
+        """
+        self.installer.Governor()
+
+    def Externalizemasters(self):
+        """
+        Moves the masters of this family to .tox files loaded on demand.
+        """
+        self.installer.Externalizemasters()
+
+    def Loadmasters(self):
+        """
+        Loads every externalized master back into custom_operators.
+        """
+        self.installer.Loadmasters()
+
+    def Prewarm(self, count=None):
+        """
+        Loads the masters of the most placed operator types of this family.
+        """
+        return self.installer.Prewarm(count)
+
+    def GetMaster(self, name):
+        """
+        Returns the master called name, loading it from the library if needed.
+        """
+        return self.installer.get_master(name)
+
+    def Search(self, query, limit=10):
+        """
+        Returns up to limit operator names of this family matching query, best first.
+        """
+        return self.installer.Search(query, limit)
+
+    def RankMenu(self, table, query):
+        """
+        Orders the op menu search results in table by Search, called by the
+        op menu while this family is the current one.
+        """
+        self.installer.RankMenu(table, query)
+
+    def IsCompatible(self, source, dest):
+        """
+        Returns True if operators of family source can feed operators of family dest.
+        """
+        return self.installer.IsCompatible(source, dest)
+
+    def Recentlog(self, count=50):
+        """
+        Returns the last log messages of this family's installer, oldest first.
+        """
+        return self.installer.log.recent(count)
+
+    def CreatestubsBatch(self, allow_untagged=True, undo_mode=None, stub_type=None, top=None, min_score=None,
+                         scope=None):
+        """
+        Creates stubs for the operators of this family without any dialog,
+        optionally only the top or best scoring stub_advisor candidates.
+        Returns a BatchResult.
+        """
+        return self.installer.CreatestubsBatch(allow_untagged=allow_untagged, undo_mode=undo_mode,
+                                               stub_type=stub_type, top=top, min_score=min_score,
+                                               scope=scope)
+
+    def PlaceOps(self, specs, undo_mode=None):
+        """
+        Places many operators of this family from a script in one batch.
+        Returns a BatchResult.
+        """
+        return self.installer.PlaceOps(specs, undo_mode=undo_mode)
+
+    def Exportinventory(self):
+        """
+        Writes the inventory of this family to the Inventoryfile.
+        """
+        self.installer.ExportInventory()
+
+    def ExportInventory(self, path=None, scope=None):
+        """
+        Writes one JSON line per operator of this family to path.
+        Returns the number of entries written.
+        """
+        return self.installer.ExportInventory(path, scope=scope)
+
+    def Backfilltypetags(self, scope=None, undo_mode=None):
+        """
+        Gives the instances of this family without a type tag the tag of
+        their master. Returns a BatchResult.
+        """
+        return self.installer.Backfilltypetags(scope=scope, undo_mode=undo_mode)
+
+    def Advise(self):
+        """
+        Ranks the operators of this family by expected stubbing savings
+        into the stub_advisor table.
+        """
+        return self.installer.Advise()
+
+    def ReplacestubsBatch(self, undo_mode=None, scope=None):
+        """
+        Regenerates all stubs of this family without any dialog.
+        Returns a BatchResult.
+        """
+        return self.installer.ReplacestubsBatch(undo_mode=undo_mode, scope=scope)
+
+    def UpdateallBatch(self, allow_unmatched=True, undo_mode=None, scope=None):
+        """
+        Updates all operators of this family without any dialog.
+        Returns a BatchResult.
+        """
+        return self.installer.UpdateallBatch(allow_unmatched=allow_unmatched, undo_mode=undo_mode, scope=scope)
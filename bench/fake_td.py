@@ -0,0 +1,1065 @@
+"""
+Headless stand-in for the parts of the TouchDesigner object model used by the
+family injector modules (installer.py, FamilyInstallerEXT.py, FamilyUtils.py,
+GroupMappingCallbacks.py and fam_panel_execute.py).
+
+It is deliberately small: operators, parameters (with modes and sequences),
+connectors, tags, storage, table DATs, copy/destroy and the handful of global
+objects (op, parent, ui, run, absTime, ...) those modules touch. Anything it
+doesn't model raises AttributeError the same way TouchDesigner would.
+
+Usage:
+    td = TD()
+    td.install_builtins()
+    root = td.root
+"""
+
+import builtins
+import fnmatch
+import re
+import sys
+import types
+
+
+class ParMode:
+    CONSTANT = 'CONSTANT'
+    EXPRESSION = 'EXPRESSION'
+    EXPORT = 'EXPORT'
+    BIND = 'BIND'
+
+
+# ---------------------------------------------------------------------------
+# Parameters
+
+class Par:
+    def __init__(self, owner, name, value=0, label=None, style='Float', sequence=None):
+        self.owner = owner
+        self.name = name
+        self._val = value
+        self.default = value
+        self.mode = ParMode.CONSTANT
+        self.expr = ''
+        self.bindExpr = ''
+        self.label = label if label is not None else name
+        self.style = style
+        self.sequence = sequence
+        self.readOnly = False
+        self.menuNames = []
+        self.menuLabels = []
+        self.help = ''
+        self.startSection = False
+        self.normMin = self.normMax = self.min = self.max = 0
+        self.clampMin = self.clampMax = False
+        self.pulses = 0
+
+    @property
+    def val(self):
+        return self._val
+
+    @val.setter
+    def val(self, value):
+        if isinstance(value, Par):
+            value = value.eval()
+        self._val = value
+        if self.name == 'opshortcut':
+            self.owner.td._register_shortcut(self.owner, value)
+
+    def eval(self):
+        if self.mode == ParMode.EXPRESSION and self.expr:
+            try:
+                return eval(self.expr, self.owner.td.expression_globals(self.owner))
+            except Exception:
+                return self._val
+        return self._val
+
+    def pulse(self):
+        self.pulses += 1
+
+    def _copy_state(self, source):
+        self._val = source._val
+        self.default = source.default
+        self.mode = source.mode
+        self.expr = source.expr
+        self.bindExpr = source.bindExpr
+        self.label = source.label
+        self.style = source.style
+        self.readOnly = source.readOnly
+        self.menuNames = list(source.menuNames)
+        self.menuLabels = list(source.menuLabels)
+
+    def __bool__(self):
+        return bool(self.eval())
+
+    def __int__(self):
+        return int(self.eval())
+
+    def __float__(self):
+        return float(self.eval())
+
+    def __str__(self):
+        return str(self.eval())
+
+    def __eq__(self, other):
+        if isinstance(other, Par):
+            other = other.eval()
+        return self.eval() == other
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return f"<Par {self.name} of {self.owner.name}>"
+
+
+class ParCollection:
+    """Attribute and item access to a set of parameters keyed by name."""
+
+    def __init__(self, pars):
+        object.__setattr__(self, '_pars', pars)
+
+    def __getattr__(self, name):
+        try:
+            return self._pars[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        par = self._pars.get(name)
+        if par is None:
+            raise AttributeError(f"Parameter {name} does not exist")
+        par.val = value
+
+    def __getitem__(self, name):
+        return self._pars[name]
+
+
+class ParGroup:
+    def __init__(self, name, pars):
+        self.name = name
+        self.pars = pars
+
+    def __getitem__(self, index):
+        return self.pars[index]
+
+    def eval(self):
+        return tuple(p.eval() for p in self.pars)
+
+
+class ParGroupCollection:
+    _suffixes = ('rgba', 'rgb', 'xyzw', 'xyz', 'xy', 'uvw', 'uv', 'wh')
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    def __getattr__(self, name):
+        pars = self._owner._pars
+        for suffixes in self._suffixes:
+            group = [pars.get(name + s) for s in suffixes]
+            if all(group):
+                return ParGroup(name, group)
+        if name in pars:
+            return ParGroup(name, [pars[name]])
+        raise AttributeError(name)
+
+
+class Sequence:
+    def __init__(self, owner, name, layout):
+        self.owner = owner
+        self.name = name
+        self.layout = list(layout)  # [(base name, default value)]
+        self.blocks = []
+
+    @property
+    def numBlocks(self):
+        return len(self.blocks)
+
+    @numBlocks.setter
+    def numBlocks(self, count):
+        while len(self.blocks) < count:
+            index = len(self.blocks)
+            block_pars = {}
+            for base, default in self.layout:
+                par = Par(self.owner, f"{self.name}{index}{base}", default, sequence=self)
+                self.owner._pars[par.name] = par
+                block_pars[base] = par
+            self.blocks.append(SequenceBlock(self, index, block_pars))
+        while len(self.blocks) > count:
+            block = self.blocks.pop()
+            for par in block._pars.values():
+                self.owner._pars.pop(par.name, None)
+
+
+class SequenceBlock:
+    def __init__(self, sequence, index, pars):
+        self.sequence = sequence
+        self.index = index
+        self._pars = pars
+        self.par = ParCollection(pars)
+        self.owner = sequence.owner
+
+
+class Page:
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def _append(self, names, value, label, style, replace):
+        pars = []
+        for name in names:
+            existing = self.owner._pars.get(name)
+            if existing is not None and not replace:
+                raise Exception(f"Parameter {name} already exists")
+            par = Par(self.owner, name, value, label=label, style=style)
+            self.owner._pars[name] = par
+            pars.append(par)
+        return ParGroup(names[0], pars)
+
+    def __getattr__(self, attr):
+        if not attr.startswith('append'):
+            raise AttributeError(attr)
+        style = attr[len('append'):]
+        defaults = {'Float': 0.0, 'Int': 0, 'Toggle': False, 'Pulse': False, 'Momentary': False}
+        suffixes = {'RGB': 'rgb', 'RGBA': 'rgba', 'XY': 'xy', 'XYZ': 'xyz', 'XYZW': 'xyzw',
+                    'UV': 'uv', 'UVW': 'uvw', 'WH': 'wh'}
+
+        def append(name, label=None, size=1, order=None, replace=True):
+            if style in suffixes:
+                names = [name + s for s in suffixes[style]]
+            elif size > 1:
+                names = [f"{name}{i + 1}" for i in range(size)]
+            else:
+                names = [name]
+            return self._append(names, defaults.get(style, ''), label, style, replace)
+        return append
+
+
+# ---------------------------------------------------------------------------
+# Connectors
+
+class Connector:
+    def __init__(self, owner, index, is_input):
+        self.owner = owner
+        self.index = index
+        self.isInput = is_input
+        self.isOutput = not is_input
+        self.connections = []
+
+    def connect(self, target):
+        if isinstance(target, OP):
+            target = target.outputConnectors[0] if self.isInput else target.inputConnectors[0]
+        if target.isInput == self.isInput:
+            raise Exception("Cannot connect two connectors of the same direction")
+        inp, out = (self, target) if self.isInput else (target, self)
+        inp.disconnect()
+        inp.connections.append(out)
+        out.connections.append(inp)
+        self.owner.td.stats['connects'] += 1
+
+    def disconnect(self):
+        for other in self.connections:
+            if self in other.connections:
+                other.connections.remove(self)
+        self.connections = []
+
+
+# ---------------------------------------------------------------------------
+# Operators
+
+class OP:
+    family = 'OP'
+    isCOMP = isDAT = isTOP = isCHOP = isSOP = isBase = False
+    default_pars = {}
+    num_inputs = 1
+    num_outputs = 1
+
+    def __init__(self, td, optype, name, parent=None):
+        self.td = td
+        self.OPType = optype.name
+        self.type = optype.short
+        self._name = name
+        self._parent = parent
+        self._pars = {}
+        self.par = ParCollection(self._pars)
+        self.parGroup = ParGroupCollection(self)
+        self.customPages = []
+        self._tags = set()
+        self.storage = {}
+        self.valid = True
+        self.id = td._next_id()
+        self.nodeX = self.nodeY = 0
+        self.nodeWidth = 100
+        self.nodeHeight = 80
+        self.allowCooking = True
+        self.bypass = False
+        self.lock = False
+        self.expose = True
+        self.viewer = False
+        self.activeViewer = False
+        self.display = False
+        self.render = False
+        self.color = (0.55, 0.55, 0.55)
+        self.comment = ''
+        self.cookTime = self.cpuCookTime = self.gpuCookTime = 0.0
+        self.cpuMemory = self.gpuMemory = 0
+        self.totalCooks = 0
+        self.cookAbsFrame = 0
+        self.selected = False
+        self.inputConnectors = [Connector(self, i, True) for i in range(self.num_inputs)]
+        self.outputConnectors = [Connector(self, i, False) for i in range(self.num_outputs)]
+        for par_name, value in self.default_pars.items():
+            self._pars[par_name] = Par(self, par_name, value)
+
+    def __bool__(self):
+        return self.valid
+
+    def __repr__(self):
+        return f"<{self.OPType} {self.path if self.valid else self._name}>"
+
+    # naming and hierarchy
+    def _check(self):
+        if not self.valid:
+            raise Exception(f"Cannot access destroyed operator {self._name}")
+
+    @property
+    def name(self):
+        self._check()
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._check()
+        if value == self._name:
+            return
+        parent = self._parent
+        if parent is not None:
+            if value in parent._children:
+                raise Exception(f"Name {value} already in use in {parent.path}")
+            del parent._children[self._name]
+            parent._children[value] = self
+        self._name = value
+
+    @property
+    def path(self):
+        self._check()
+        if self._parent is None:
+            return '/'
+        parent_path = self._parent.path
+        return f"/{self._name}" if parent_path == '/' else f"{parent_path}/{self._name}"
+
+    def parent(self, level=1):
+        result = self
+        for _ in range(level):
+            result = result._parent
+            if result is None:
+                return None
+        return result
+
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        self._tags = set(value)
+
+    # parameters
+    def pars(self, *patterns):
+        patterns = patterns or ('*',)
+        if len(patterns) == 1 and not any(c in patterns[0] for c in '*?['):
+            par = self._pars.get(patterns[0])
+            return [par] if par is not None else []
+        return [p for name, p in self._pars.items() if any(fnmatch.fnmatchcase(name, pat) for pat in patterns)]
+
+    def appendCustomPage(self, name):
+        page = Page(self, name)
+        self.customPages.append(page)
+        return page
+
+    def add_par(self, name, value=0, style='Float'):
+        par = Par(self, name, value, style=style)
+        self._pars[name] = par
+        return par
+
+    def add_sequence(self, name, layout, num_blocks=1):
+        seq = Sequence(self, name, layout)
+        seq.numBlocks = num_blocks
+        return seq
+
+    # storage
+    def store(self, key, value):
+        self.storage[key] = value
+        return value
+
+    def fetch(self, key, *default, search=False, storeDefault=False):
+        if key in self.storage:
+            return self.storage[key]
+        if default:
+            if storeDefault:
+                self.storage[key] = default[0]
+            return default[0]
+        raise KeyError(key)
+
+    def unstore(self, *keys):
+        for pattern in keys:
+            for key in [k for k in self.storage if fnmatch.fnmatchcase(k, pattern)]:
+                del self.storage[key]
+
+    # wiring
+    @property
+    def inputs(self):
+        return [c.connections[0].owner for c in self.inputConnectors if c.connections]
+
+    @property
+    def outputs(self):
+        return [con.owner for c in self.outputConnectors for con in c.connections]
+
+    # lifecycle
+    def cook(self, force=False, recurse=False):
+        self.totalCooks += 1
+        self.cookAbsFrame = self.td.absTime.frame
+        self.td.stats['cooks'] += 1
+
+    def destroy(self):
+        self._check()
+        for descendant in self._walk():
+            for connector in descendant.inputConnectors + descendant.outputConnectors:
+                connector.disconnect()
+            if 'opshortcut' in descendant._pars:
+                self.td._register_shortcut(descendant, '')
+            descendant.valid = False
+        if self._parent is not None:
+            self._parent._children.pop(self._name, None)
+        self.td.stats['destroys'] += 1
+
+    def _walk(self):
+        yield self
+
+    def __getattr__(self, name):
+        # Promoted extension members (capitalised) as on extended COMPs
+        if name[:1].isupper():
+            for ext in self.__dict__.get('extensions', ()):
+                if hasattr(ext, name):
+                    return getattr(ext, name)
+        raise AttributeError(name)
+
+
+class DAT(OP):
+    family = 'DAT'
+    isDAT = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._text = ''
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self.td.stats['text_writes'] += 1
+
+
+class Cell:
+    __slots__ = ('val',)
+
+    def __init__(self, val):
+        self.val = str(val)
+
+    def __str__(self):
+        return self.val
+
+    def __eq__(self, other):
+        return self.val == (other.val if isinstance(other, Cell) else str(other))
+
+    def __hash__(self):
+        return hash(self.val)
+
+
+class TableDAT(DAT):
+    """Table DAT with the row/column API used by the installer and menu scripts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rows = []
+
+    @property
+    def numRows(self):
+        return len(self._rows)
+
+    @property
+    def numCols(self):
+        return len(self._rows[0]) if self._rows else 0
+
+    def _row_index(self, key):
+        if isinstance(key, int):
+            return key if key < len(self._rows) else None
+        if isinstance(key, Cell):
+            key = key.val
+        for i, row in enumerate(self._rows):
+            if row and row[0].val == key:
+                return i
+        return None
+
+    def _col_index(self, key):
+        if isinstance(key, int):
+            return key
+        if isinstance(key, Cell):
+            key = key.val
+        if self._rows:
+            for i, cell in enumerate(self._rows[0]):
+                if cell.val == key:
+                    return i
+        return None
+
+    def _pad(self, row=None):
+        """Keeps the table rectangular. A new row only widens every row when it is wider."""
+        width = max((len(r) for r in self._rows), default=0) if row is None else max(len(row), self.numCols)
+        rows = self._rows if row is None or len(row) > len(self._rows[0]) else [row]
+        for r in rows:
+            while len(r) < width:
+                r.append(Cell(''))
+
+    def __getitem__(self, key):
+        r, c = key
+        r, c = self._row_index(r), self._col_index(c)
+        if r is None or c is None or c >= len(self._rows[r]):
+            return None
+        return self._rows[r][c]
+
+    def __setitem__(self, key, value):
+        r, c = key
+        r, c = self._row_index(r), self._col_index(c)
+        if r is None or c is None:
+            raise IndexError(key)
+        self._rows[r][c].val = str(value.val if isinstance(value, Cell) else value)
+        self.td.stats['cell_writes'] += 1
+
+    def appendRow(self, values=(), *args):
+        row = [Cell(v) for v in values]
+        self._rows.append(row)
+        self._pad(row)
+        self.td.stats['cell_writes'] += len(values)
+        return len(self._rows) - 1
+
+    def insertRow(self, values, index=0):
+        self._rows.insert(index, [Cell(v) for v in values])
+        self._pad()
+        return index
+
+    def appendCol(self, values=()):
+        values = list(values)
+        for i, row in enumerate(self._rows):
+            row.append(Cell(values[i] if i < len(values) else ''))
+        for value in values[len(self._rows):]:
+            self._rows.append([Cell('')] * (self.numCols - 1) + [Cell(value)])
+        self._pad()
+        return self.numCols - 1
+
+    def deleteRow(self, key):
+        index = self._row_index(key)
+        if index is not None:
+            del self._rows[index]
+
+    def deleteCol(self, key):
+        index = self._col_index(key)
+        if index is not None:
+            for row in self._rows:
+                if index < len(row):
+                    del row[index]
+
+    def rows(self, *keys):
+        if not keys:
+            return list(self._rows)
+        return [self._rows[i] for i in (self._row_index(k) for k in keys) if i is not None]
+
+    def cols(self, *keys):
+        columns = [[row[c] for row in self._rows] for c in range(self.numCols)]
+        if not keys:
+            return columns
+        return [columns[i] for i in (self._col_index(k) for k in keys) if i is not None]
+
+    def row(self, key):
+        index = self._row_index(key)
+        return self._rows[index] if index is not None else None
+
+    def col(self, key):
+        index = self._col_index(key)
+        return [row[index] for row in self._rows] if index is not None else None
+
+    def clear(self, keepFirstRow=False, keepFirstCol=False):
+        self._rows = self._rows[:1] if keepFirstRow else []
+
+    @property
+    def text(self):
+        return '\n'.join('\t'.join(c.val for c in row) for row in self._rows)
+
+    @text.setter
+    def text(self, value):
+        self._rows = [[Cell(v) for v in line.split('\t')] for line in value.splitlines()]
+
+
+class COMP(OP):
+    family = 'COMP'
+    isCOMP = True
+    num_inputs = 1
+    num_outputs = 1
+
+    def __init__(self, *args, inputs=None, outputs=None, **kwargs):
+        if inputs is not None:
+            self.num_inputs = inputs
+        if outputs is not None:
+            self.num_outputs = outputs
+        super().__init__(*args, **kwargs)
+        self._children = {}
+        self.inputCOMPConnectors = [Connector(self, 0, True)]
+        self.outputCOMPConnectors = [Connector(self, 0, False)]
+        self.extensions = []
+        self.showCustomOnly = False
+        self.enclosedOPs = []
+
+    @property
+    def children(self):
+        return list(self._children.values())
+
+    @property
+    def numChildren(self):
+        return len(self._children)
+
+    @property
+    def selectedChildren(self):
+        return [c for c in self._children.values() if c.selected]
+
+    @property
+    def ext(self):
+        return types.SimpleNamespace(**{type(e).__name__: e for e in self.extensions})
+
+    def _walk(self):
+        yield self
+        for child in list(self._children.values()):
+            yield from child._walk()
+
+    def _unique_name(self, name):
+        if name not in self._children:
+            return name
+        base = re.sub(r'\d+$', '', name)
+        i = 1
+        while f"{base}{i}" in self._children:
+            i += 1
+        return f"{base}{i}"
+
+    def _adopt(self, child, name):
+        child._name = self._unique_name(name)
+        child._parent = self
+        self._children[child._name] = child
+        return child
+
+    def create(self, optype, name=None):
+        child = optype.cls(self.td, optype, '', parent=self)
+        self.td.stats['creates'] += 1
+        return self._adopt(child, name or f"{optype.short}1")
+
+    def copy(self, source, name=None, includeDocked=False):
+        clone = self.td._clone(source, self)
+        self._adopt(clone, name or source.name)
+        self.td._clone_internal_wiring(source, clone)
+        self.td.stats['copies'] += 1
+        return clone
+
+    def copyOPs(self, sources):
+        return [self.copy(s) for s in sources]
+
+    def op(self, path):
+        return self.td.resolve(path, self)
+
+    def ops(self, *patterns):
+        return [c for name, c in self._children.items() if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+
+    def findChildren(self, type=None, depth=None, maxDepth=None, name=None, key=None, tags=None,
+                     parName=None, path=None, includeUtility=False, **kwargs):
+        result = []
+        names = [name] if isinstance(name, str) else name
+        stack = [(child, 1) for child in reversed(list(self._children.values()))]
+        while stack:
+            child, level = stack.pop()
+            if (depth is None or level == depth) and \
+                    (type is None or isinstance(child, type)) and \
+                    (names is None or any(fnmatch.fnmatchcase(child._name, n) for n in names)) and \
+                    (tags is None or any(t in child._tags for t in tags)) and \
+                    (key is None or key(child)):
+                result.append(child)
+            if child.isCOMP and (maxDepth is None or level < maxDepth) and (depth is None or level < depth):
+                stack.extend((c, level + 1) for c in reversed(list(child._children.values())))
+        return result
+
+    @property
+    def numChildrenRecursive(self):
+        return sum(1 for c in self._walk() if c is not self)
+
+    @property
+    def childrenCookTime(self):
+        return sum(c.cookTime for c in self._walk() if c is not self)
+
+    @property
+    def childrenCPUCookTime(self):
+        return sum(c.cpuCookTime for c in self._walk() if c is not self)
+
+    @property
+    def childrenGPUCookTime(self):
+        return sum(c.gpuCookTime for c in self._walk() if c is not self)
+
+    def childrenCPUMemory(self):
+        return sum(c.cpuMemory for c in self._walk() if c is not self)
+
+    def childrenGPUMemory(self):
+        return sum(c.gpuMemory for c in self._walk() if c is not self)
+
+    def loadTox(self, path):
+        return self.td.load_tox(path, self)
+
+    def save(self, path, createFolders=False):
+        return self.td.save_tox(self, path)
+
+
+class TOP(OP):
+    family = 'TOP'
+    isTOP = True
+
+
+class CHOP(OP):
+    family = 'CHOP'
+    isCHOP = True
+
+
+class SOP(OP):
+    family = 'SOP'
+    isSOP = True
+
+
+class OPTypeDef:
+    """Marker passed to COMP.create (e.g. tableDAT) describing the operator type to build."""
+
+    def __init__(self, name, cls, short=None, default_pars=None, inputs=None, outputs=None):
+        self.name = name
+        self.short = short or re.sub(r'(COMP|DAT|TOP|CHOP|SOP)$', '', name)
+        attrs = {'default_pars': dict(default_pars or {})}
+        if inputs is not None:
+            attrs['num_inputs'] = inputs
+        if outputs is not None:
+            attrs['num_outputs'] = outputs
+        self.cls = type(name, (cls,), attrs)
+
+
+OP_TYPES = {
+    'baseCOMP': OPTypeDef('baseCOMP', COMP, default_pars={
+        'clone': '', 'enablecloning': False, 'enablecloningpulse': False, 'externaltox': ''}),
+    'containerCOMP': OPTypeDef('containerCOMP', COMP, default_pars={'clone': '', 'enablecloning': False}),
+    'annotateCOMP': OPTypeDef('annotateCOMP', COMP, short='annotate', default_pars={'Titletext': ''}),
+    'textDAT': OPTypeDef('textDAT', DAT),
+    'tableDAT': OPTypeDef('tableDAT', TableDAT),
+    'scriptDAT': OPTypeDef('scriptDAT', TableDAT, default_pars={'callbacks': ''}),
+    'insertDAT': OPTypeDef('insertDAT', TableDAT, default_pars={'insert': 'row', 'at': 'index', 'index': 0, 'contents': ''}),
+    'evaluateDAT': OPTypeDef('evaluateDAT', TableDAT, default_pars={'expr': ''}),
+    'selectDAT': OPTypeDef('selectDAT', TableDAT, default_pars={'dat': ''}),
+    'nullDAT': OPTypeDef('nullDAT', TableDAT),
+    'outDAT': OPTypeDef('outDAT', TableDAT),
+    'inDAT': OPTypeDef('inDAT', TableDAT),
+    'opexecuteDAT': OPTypeDef('opexecuteDAT', DAT, default_pars={'op': ''}),
+    'panelexecuteDAT': OPTypeDef('panelexecuteDAT', DAT),
+    'executeDAT': OPTypeDef('executeDAT', DAT),
+    'nullTOP': OPTypeDef('nullTOP', TOP),
+    'outTOP': OPTypeDef('outTOP', TOP),
+    'inTOP': OPTypeDef('inTOP', TOP),
+    'noiseTOP': OPTypeDef('noiseTOP', TOP),
+    'selectTOP': OPTypeDef('selectTOP', TOP, default_pars={'top': ''}),
+    'nullCHOP': OPTypeDef('nullCHOP', CHOP),
+    'outCHOP': OPTypeDef('outCHOP', CHOP),
+    'selectCHOP': OPTypeDef('selectCHOP', CHOP, default_pars={'chop': ''}),
+    'timerCHOP': OPTypeDef('timerCHOP', CHOP, default_pars={'start': False}),
+    'nullSOP': OPTypeDef('nullSOP', SOP),
+    'outSOP': OPTypeDef('outSOP', SOP),
+    'textTOP': OPTypeDef('textTOP', TOP, default_pars={'text': ''}),
+    'buttonCOMP': OPTypeDef('buttonCOMP', COMP, default_pars={'value0': 0}),
+}
+
+
+# ---------------------------------------------------------------------------
+# Global objects
+
+class OpFinder:
+    """The global op(): op(path) relative to a base COMP, op.<Shortcut> for global shortcuts."""
+
+    def __init__(self, td, base):
+        object.__setattr__(self, '_td', td)
+        object.__setattr__(self, '_base', base)
+
+    def __call__(self, *paths):
+        for path in paths:
+            found = self._td.resolve(path, self._base)
+            if found is not None:
+                return found
+        return None
+
+    def __getattr__(self, name):
+        if name == 'TDResources':
+            return self._td.tdresources
+        if name == 'Logger' and self._td.logger is not None:
+            return self._td.logger
+        comp = self._td.shortcuts.get(name)
+        if comp is not None and comp.valid:
+            return comp
+        raise AttributeError(name)
+
+
+class ParentFinder:
+    """The global parent(): parent() / parent(n) and parent.<Shortcut>."""
+
+    def __init__(self, base, shortcuts=None):
+        self._base = base
+        self._shortcuts = shortcuts or {}
+
+    def __call__(self, level=1):
+        return self._base.parent(level)
+
+    def __getattr__(self, name):
+        try:
+            return self._shortcuts[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class Undo:
+    def __init__(self):
+        self.globalState = True
+        self.depth = 0
+        self.blocks = 0
+
+    def startBlock(self, name, enable=True):
+        self.depth += 1
+        self.blocks += 1
+
+    def endBlock(self):
+        self.depth -= 1
+
+
+class Pane:
+    def __init__(self, owner):
+        self.owner = owner
+        self.zoom = 1.0
+        self.placed = 0
+
+    def placeOPs(self, ops, inputIndex=None, outputIndex=None, delMOP=True):
+        # Placing moves the operators into the network shown in the pane
+        for o in ops:
+            if o._parent is not self.owner:
+                o._parent._children.pop(o._name, None)
+                self.owner._adopt(o, o._name)
+        self.placed += len(ops)
+
+
+class UI:
+    def __init__(self, td):
+        self.undo = Undo()
+        self.panes = types.SimpleNamespace(current=Pane(td.root))
+        self.preferences = {'network.viewer': False}
+        self.messages = []
+        self.answer = 0
+        self.status = ''
+
+    def messageBox(self, title, message, buttons=('Ok',)):
+        self.messages.append((title, message))
+        return self.answer
+
+
+class AbsTime:
+    def __init__(self):
+        self.frame = 1
+        self.seconds = 0.0
+        self.stepSeconds = 1 / 60
+
+
+class Run:
+    def __init__(self, td, frame, script, args, from_op):
+        self.td = td
+        self.frame = frame
+        self.script = script
+        self.args = args
+        self.fromOP = from_op
+        self.active = True
+
+    def kill(self):
+        self.active = False
+
+
+class TD:
+    """One fake TouchDesigner session: the root network and the global objects."""
+
+    def __init__(self):
+        self._ids = 0
+        self.stats = dict.fromkeys(('connects', 'cooks', 'copies', 'creates', 'destroys',
+                                    'cell_writes', 'text_writes'), 0)
+        self.shortcuts = {}
+        self.logger = None
+        self.tdresources = types.SimpleNamespace(name='TDResources')
+        self.root = COMP(self, OP_TYPES['containerCOMP'], '', parent=None)
+        self.ui = UI(self)
+        self.absTime = AbsTime()
+        self.project = types.SimpleNamespace(cookRate=60.0, name='bench.toe', folder='.')
+        self.runs = []
+        self.tox_library = {}
+
+    def _next_id(self):
+        self._ids += 1
+        return self._ids
+
+    def _register_shortcut(self, comp, name):
+        for key in [k for k, v in self.shortcuts.items() if v is comp]:
+            del self.shortcuts[key]
+        if name:
+            self.shortcuts[name] = comp
+
+    def expression_globals(self, owner):
+        base = owner if owner.isCOMP else owner.parent()
+        return {'op': OpFinder(self, base), 'me': owner, 'parent': ParentFinder(owner),
+                'absTime': self.absTime, 'project': self.project}
+
+    # path resolution
+    def resolve(self, path, base=None):
+        if path is None:
+            return None
+        if isinstance(path, OP):
+            return path if path.valid else None
+        path = str(path)
+        if path.startswith('/'):
+            node = self.root
+            parts = path.strip('/').split('/') if path != '/' else []
+        else:
+            node = base if base is not None else self.root
+            parts = path.split('/')
+        for part in parts:
+            if part in ('', '.'):
+                continue
+            if part == '..':
+                node = node.parent() if node is not None else None
+            elif node is None or not node.isCOMP:
+                return None
+            else:
+                node = node._children.get(part)
+            if node is None:
+                return None
+        return node
+
+    # copying
+    def _clone(self, source, parent):
+        optype = OP_TYPES.get(source.OPType) or OPTypeDef(source.OPType, type(source).__mro__[1])
+        if source.isCOMP:
+            clone = type(source)(self, optype, source._name, parent=parent,
+                                 inputs=len(source.inputConnectors), outputs=len(source.outputConnectors))
+        else:
+            clone = type(source)(self, optype, source._name, parent=parent)
+        clone._pars.clear()
+        sequences = {}
+        for name, par in source._pars.items():
+            seq = par.sequence
+            if seq is not None:
+                if seq.name not in sequences:
+                    copied = Sequence(clone, seq.name, seq.layout)
+                    copied.numBlocks = seq.numBlocks
+                    sequences[seq.name] = copied
+                clone._pars[name]._copy_state(par)
+                continue
+            copied = Par(clone, name)
+            copied._copy_state(par)
+            clone._pars[name] = copied
+        clone.customPages = [Page(clone, p.name) for p in source.customPages]
+        clone._tags = set(source._tags)
+        clone.storage = dict(source.storage)
+        for attr in ('nodeX', 'nodeY', 'nodeWidth', 'nodeHeight', 'allowCooking', 'bypass', 'lock',
+                     'expose', 'viewer', 'activeViewer', 'color', 'comment', 'cookTime', 'cpuCookTime',
+                     'gpuCookTime', 'cpuMemory', 'gpuMemory'):
+            setattr(clone, attr, getattr(source, attr))
+        if source.isDAT:
+            if isinstance(source, TableDAT):
+                clone._rows = [[Cell(c.val) for c in row] for row in source._rows]
+            else:
+                clone._text = source._text
+        if source.isCOMP:
+            for child in source._children.values():
+                clone._children[child._name] = self._clone(child, clone)
+            clone.enclosedOPs = []
+        return clone
+
+    def _clone_internal_wiring(self, source, clone):
+        if not source.isCOMP:
+            return
+        mapping = {}
+        for src_node, dst_node in zip(source._walk(), clone._walk()):
+            mapping[id(src_node)] = dst_node
+        for src_node in source._walk():
+            if src_node is source:
+                continue
+            dst_node = mapping[id(src_node)]
+            for in_conn in src_node.inputConnectors:
+                for upstream in in_conn.connections:
+                    dst_up = mapping.get(id(upstream.owner))
+                    if dst_up is not None and dst_up is not clone:
+                        dst_up.outputConnectors[upstream.index].connect(dst_node.inputConnectors[in_conn.index])
+
+    # .tox files
+    def save_tox(self, comp, path):
+        self.tox_library[str(path)] = self._clone(comp, None)
+        return path
+
+    def load_tox(self, path, parent):
+        source = self.tox_library[str(path)]
+        clone = self._clone(source, parent)
+        return parent._adopt(clone, source._name)
+
+    # frames
+    def run(self, script, *args, endFrame=False, delayFrames=0, delayMilliSeconds=0,
+            delayRef=None, fromOP=None, group=None, **kwargs):
+        job = Run(self, self.absTime.frame + max(delayFrames, 1 if endFrame else 0), script, args, fromOP)
+        self.runs.append(job)
+        return job
+
+    def step(self, frames=1):
+        """Advances the timeline, executing queued run() calls that become due."""
+        for _ in range(frames):
+            self.absTime.frame += 1
+            self.absTime.seconds += self.absTime.stepSeconds
+            due = [r for r in self.runs if r.frame <= self.absTime.frame]
+            self.runs = [r for r in self.runs if r.frame > self.absTime.frame]
+            for job in due:
+                if not job.active:
+                    continue
+                if callable(job.script):
+                    job.script(*job.args)
+                else:
+                    exec(job.script, {'args': job.args, 'op': OpFinder(self, self.root), 'ui': self.ui})
+
+    def install_builtins(self):
+        """Exposes the TouchDesigner globals to every module (op/parent/me are set per module)."""
+        names = {
+            'ParMode': ParMode, 'ui': self.ui, 'absTime': self.absTime, 'project': self.project,
+            'run': self.run, 'OP': OP, 'COMP': COMP, 'DAT': DAT, 'TOP': TOP, 'CHOP': CHOP, 'SOP': SOP,
+            'op': OpFinder(self, self.root), 'parent': ParentFinder(self.root), 'me': self.root,
+        }
+        names.update(OP_TYPES)
+        for name, value in names.items():
+            setattr(builtins, name, value)
+        for module_name in ('TDStoreTools', 'TDFunctions', 'tdu', 'TDJSON'):
+            module = sys.modules.setdefault(module_name, types.ModuleType(module_name))
+            if module_name == 'TDStoreTools':
+                module.StorageManager = type('StorageManager', (), {})
+            if module_name == 'tdu':
+                module.match = lambda pattern, items, caseSensitive=True: [
+                    i for i in items if fnmatch.fnmatchcase(str(i), pattern)]
+
+    def bind_module(self, module, me, shortcuts=None):
+        """Gives a module the op/parent/me globals of a DAT living at `me`."""
+        base = me.parent() if not me.isCOMP else me
+        module.op = OpFinder(self, base)
+        module.parent = ParentFinder(me, shortcuts)
+        module.me = me
+        return module
@@ -0,0 +1,226 @@
+"""
+Builds a fake TouchDesigner project for the benchmarks: the parts of
+/ui/dialogs the installer patches, an installer component with its
+install_scripts and a custom_operators library, and family instances
+spread over scene containers.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+from fake_td import TD, OP_TYPES, OpFinder, ParentFinder
+
+REPO = Path(__file__).resolve().parents[1]
+
+FAMILY = 'BENCH'
+HEADER_LABEL = 'Family Injector Version 1.013'
+SEARCH_KEY = "if parent.OPCREATE.op('nodetable/destil').numRows > 1:\n"
+BUILTIN_FAMILIES = ['TOP', 'CHOP', 'SOP', 'DAT', 'COMP', 'MAT']
+
+
+def _t(name):
+    return OP_TYPES[name]
+
+
+def build_ui(td):
+    """Creates the /ui/dialogs networks Install and Uninstall patch."""
+    dialogs = td.root.create(_t('containerCOMP'), 'ui').create(_t('containerCOMP'), 'dialogs')
+
+    bookmark_bar = dialogs.create(_t('containerCOMP'), 'bookmark_bar')
+    bookmark_bar.create(_t('containerCOMP'), 'emptypanel')
+
+    menu = dialogs.create(_t('containerCOMP'), 'menu_op')
+    menu.add_par('winclose', False)
+    insert1 = menu.create(_t('insertDAT'), 'insert1')
+    insert1.outputConnectors[0].connect(menu.create(_t('nullDAT'), 'null_families'))
+
+    colors = menu.create(_t('tableDAT'), 'colors')
+    for family in BUILTIN_FAMILIES:
+        colors.appendRow([f"'{family}'", 0.3, 0.3, 0.3])
+
+    menu.create(_t('textDAT'), 'launch_menu_op').text = (
+        'if($type != "none")\n\tset a = 1\nendif\n')
+    menu.create(_t('textDAT'), 'create_node').text = (
+        'set type = `tab("current",0,0)`\nopadd $type\n')
+    menu.create(_t('textDAT'), 'node_script')
+
+    search_exec = menu.create(_t('containerCOMP'), 'search').create(_t('panelexecuteDAT'), 'panelexec1')
+    search_exec.text = (
+        "def onValueChange(panelValue, prev):\n"
+        "\t\tif panelValue == 'enter':\n"
+        f"\t\t\t{SEARCH_KEY}"
+        "\t\t\t\tparent.OPCREATE.op('nodetable').clickID(-9999)\n"
+        "\t\treturn\n")
+
+    compatible = menu.create(_t('tableDAT'), 'compatible')
+    compatible.appendRow([''] + BUILTIN_FAMILIES)
+    for family in BUILTIN_FAMILIES:
+        compatible.appendRow([family] + ['x' if f == family else '' for f in BUILTIN_FAMILIES])
+
+    menu.create(_t('tableDAT'), 'current').appendRow([FAMILY])
+
+    nodetable = menu.create(_t('containerCOMP'), 'nodetable')
+    nodetable.add_par('tablerows', 20)
+    families_in = nodetable.create(_t('nullDAT'), 'families_in')
+    families = nodetable.create(_t('scriptDAT'), 'families')
+    families_in.outputConnectors[0].connect(families)
+    nodetable.create(_t('evaluateDAT'), 'eval4').par.expr = "[x for x in families.keys()]"
+    nodetable.create(_t('tableDAT'), 'destil').appendRow(['name'])
+    return menu
+
+
+def build_master(library, name, num_pars=20, seq_blocks=4, heavy=True):
+    """Creates one master component in custom_operators."""
+    master = library.create(_t('baseCOMP'), name)
+    master.add_par('Version', '1.0.0', style='Str')
+    master.add_par('Copyright', 'bench', style='Str')
+    for i in range(num_pars):
+        master.add_par(f'Param{i}', float(i))
+    master.add_sequence('ext', [('object', ''), ('name', ''), ('promote', False)], 1)
+    master.par.ext0object = f"op('./{name}Ext').module.{name}Ext(me)"
+    master.add_sequence('Layer', [('name', ''), ('opacity', 1.0), ('blend', 'over')], seq_blocks)
+    master.create(_t('textDAT'), f'{name}Ext')
+    if heavy:
+        source = master.create(_t('noiseTOP'), 'noise1')
+        null = master.create(_t('nullTOP'), 'null1')
+        out = master.create(_t('outTOP'), 'out1')
+        source.outputConnectors[0].connect(null)
+        null.outputConnectors[0].connect(out)
+        source.cookTime = source.cpuCookTime = 0.4
+        source.gpuCookTime = 0.8
+        source.gpuMemory = 1 << 22
+    return master
+
+
+def build_installer(td, num_masters=5, heavy=True, num_categories=4):
+    """Creates the installer component with its scripts and master library."""
+    inst = td.root.create(_t('baseCOMP'), 'FamilyInjector')
+    inst.add_par('Install', 0, style='Toggle')
+    inst.add_par('Verbose', 0, style='Toggle')
+    inst.add_par('Family', FAMILY, style='Str')
+    for channel, value in zip('rgb', (0.1, 0.4, 0.8)):
+        inst.add_par(f'Color{channel}', value)
+    inst.add_par('Index', 0, style='Int')
+    inst.add_par('opshortcut', '', style='Str')
+    inst.add_par('Header', '', style='Header').label = HEADER_LABEL
+    inst.add_par('Showbuiltin', 0, style='Toggle')
+
+    scripts = inst.create(_t('baseCOMP'), 'install_scripts')
+    toggle = scripts.create(_t('containerCOMP'), 'fam_toggle')
+    button = toggle.create(_t('buttonCOMP'), 'button')
+    button.create(_t('textTOP'), 'text1')
+    opexec = toggle.create(_t('opexecuteDAT'), 'opexec1')
+    opexec.text = "def onValueChange(par, prev):\n\top.LOP.par.Install = par.eval()\n"
+    scripts.create(_t('textDAT'), 'set_last_node_type')
+    scripts.create(_t('textDAT'), 'fam_panel_execute').text = (REPO / 'fam_panel_execute.py').read_text()
+    scripts.create(_t('textDAT'), 'fam_script_callbacks')
+
+    inst.create(_t('textDAT'), 'FamilyUtils').text = (REPO / 'FamilyUtils.py').read_text()
+    inst.create(_t('textDAT'), 'installer')
+    inst.create(_t('textDAT'), 'FamilyInstallerEXT')
+    inst.create(_t('textDAT'), 'License')
+    inst.create(_t('timerCHOP'), 'timer1')
+    inst.create(_t('scriptDAT'), 'group_mapping')
+
+    library = inst.create(_t('baseCOMP'), 'custom_operators')
+    generators = library.create(_t('annotateCOMP'), 'generators')
+    categories = []
+    for c in range(num_categories):
+        category = library.create(_t('annotateCOMP'), f'category{c}')
+        category.par.Titletext = f'Category {c}'
+        categories.append(category)
+        generators.enclosedOPs.append(category)
+
+    op_fam = inst.create(_t('tableDAT'), 'OP_fam')
+    op_fam.appendRow(['type', 'name'])
+    per_category = [[] for _ in categories]
+    for i in range(num_masters):
+        master = build_master(library, f'Gen{i}', heavy=heavy)
+        category = categories[i % len(categories)]
+        category.enclosedOPs.append(master)
+        generators.enclosedOPs.append(master)
+        per_category[i % len(categories)].append(master.name)
+    for category, names in zip(categories, per_category):
+        op_fam.appendRow([f'{category.name}defLabel', ''])
+        for name in names:
+            op_fam.appendRow([FAMILY, name])
+    return inst
+
+
+def load_modules(td, inst):
+    """Imports the repo modules and binds them to the DATs they live in."""
+    if str(REPO) not in sys.path:
+        sys.path.insert(0, str(REPO))
+    td.install_builtins()
+    modules = {}
+    for name in ('FamilyUtils', 'installer', 'FamilyInstallerEXT', 'GroupMappingCallbacks'):
+        module = importlib.reload(importlib.import_module(name)) if name in sys.modules else importlib.import_module(name)
+        modules[name] = module
+    # Re-bind FamilyInstallerEXT's imported names to the reloaded modules
+    modules['FamilyInstallerEXT'].GenericInstallerEXT = modules['installer'].GenericInstallerEXT
+    td.bind_module(modules['FamilyUtils'], inst.op('FamilyUtils'))
+    td.bind_module(modules['installer'], inst.op('installer'))
+    td.bind_module(modules['FamilyInstallerEXT'], inst.op('FamilyInstallerEXT'))
+    td.bind_module(modules['GroupMappingCallbacks'], inst.op('group_mapping'))
+    return modules
+
+
+def attach_extension(td, inst, modules):
+    ext = modules['FamilyInstallerEXT'].FamilyInstallerEXT(inst)
+    inst.extensions = [ext]
+    td.step(2)
+    return ext
+
+
+def populate(td, inst, num_instances, per_scene=100, edit_every=3):
+    """
+    Places num_instances copies of the (tagged) masters in scene containers,
+    wired in chains of per_scene, with some parameters edited.
+    """
+    library = inst.op('custom_operators')
+    masters = [m for m in library.children if m.OPType == 'baseCOMP']
+    project = td.root.op('project') or td.root.create(_t('containerCOMP'), 'project')
+    instances = []
+    scene = None
+    previous = None
+    for i in range(num_instances):
+        if i % per_scene == 0:
+            scene = project.create(_t('containerCOMP'), f'scene{i // per_scene}')
+            previous = None
+        master = masters[i % len(masters)]
+        comp = scene.copy(master, name=f'{master.name}_{i}')
+        comp.nodeX = (i % per_scene) * 200
+        if i % edit_every == 0:
+            comp.par.Param0 = 100.0 + i
+            comp.par.Layer0opacity = 0.5
+        if previous is not None:
+            previous.outputConnectors[0].connect(comp.inputConnectors[0])
+        previous = comp
+        instances.append(comp)
+    return instances
+
+
+def panel_execute_namespace(td, family=FAMILY):
+    """Executes the installed <family>_panel_execute DAT text and returns its namespace."""
+    menu = td.root.op('ui/dialogs/menu_op')
+    dat = menu.op(f'{family}_panel_execute')
+    namespace = {'op': OpFinder(td, menu), 'parent': ParentFinder(dat, {'OPCREATE': menu}),
+                 'ui': td.ui, 'me': dat}
+    exec(dat.text, namespace)
+    return namespace
+
+
+def make_project(num_masters=5, num_instances=0, heavy=True, install=True):
+    """Builds a complete fake project and returns (td, installer comp, extension, modules)."""
+    td = TD()
+    build_ui(td)
+    inst = build_installer(td, num_masters=num_masters, heavy=heavy)
+    modules = load_modules(td, inst)
+    ext = attach_extension(td, inst, modules)
+    if install:
+        inst.par.Install = 1
+        ext.Install()
+    if num_instances:
+        populate(td, inst, num_instances)
+    return td, inst, ext, modules
@@ -0,0 +1,204 @@
+"""
+Scaling benchmarks for the family installer, run against the headless
+TouchDesigner stand-in in fake_td.py.
+
+Each benchmark is timed at several sizes (family instances for the batch
+operations, library masters for Install/Uninstall and the menu scripts).
+Batch benchmarks fail when the BatchResult has errors or did not process
+every instance, so a broken run can't pass as a fast one. With --check the
+run also fails when the per-item cost grows more than --max-growth times
+between two consecutive sizes, which flags operations that have gone
+super-linear, and a few helpers are checked against known values first.
+panel_execute times a single click on a menu of `size`
+entries, so its per item column is the time of one click.
+
+    python bench/run_benchmarks.py
+    python bench/run_benchmarks.py --sizes 10,1000 --only createstubs,updateall
+    python bench/run_benchmarks.py --check --json bench_output.json
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import project  # noqa: E402
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences the textport output of the modules under test."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(fn, check=None):
+    """Times fn, then passes its return value to check."""
+    gc.collect()
+    start = time.perf_counter()
+    with quiet():
+        value = fn()
+    seconds = time.perf_counter() - start
+    if check is not None:
+        check(value)
+    return seconds
+
+
+def expect(key, size):
+    """Returns a check that a BatchResult is ok and counted size under key."""
+    def check(result):
+        if not result.ok or result.counts.get(key) != size:
+            raise AssertionError(f"{result.operation} at size {size}: expected {key}={size}, "
+                                 f"got {result.counts}, errors {result.errors[:3]}")
+    return check
+
+
+def bench_install(size):
+    """Install then Uninstall with a library of `size` masters."""
+    with quiet():
+        td, inst, ext, _ = project.make_project(num_masters=size, heavy=False, install=False)
+
+    def run():
+        inst.par.Install = 1
+        ext.Install()
+        inst.par.Install = 0
+        ext.Install()
+    return timed(run)
+
+
+def bench_createstubs(size):
+    with quiet():
+        td, inst, ext, _ = project.make_project(num_instances=size)
+    return timed(lambda: ext.CreatestubsBatch(), expect('created', size))
+
+
+def bench_replacestubs(size):
+    with quiet():
+        td, inst, ext, _ = project.make_project(num_instances=size)
+        ext.CreatestubsBatch()
+    return timed(lambda: ext.ReplacestubsBatch(), expect('regenerated', size))
+
+
+def bench_updateall(size):
+    with quiet():
+        td, inst, ext, _ = project.make_project(num_instances=size)
+    return timed(lambda: ext.UpdateallBatch(), expect('updated', size))
+
+
+def bench_group_mapping(size):
+    """GroupMappingCallbacks.onCook over a library of `size` masters."""
+    with quiet():
+        td, inst, ext, modules = project.make_project(num_masters=size, heavy=False)
+    script_op = inst.op('group_mapping')
+    return timed(lambda: modules['GroupMappingCallbacks'].onCook(script_op))
+
+
+def bench_panel_execute(size, clicks=20):
+    """fam_panel_execute.onValueChange placing operators from a `size` entry menu."""
+    with quiet():
+        td, inst, ext, _ = project.make_project(num_masters=size, heavy=False)
+    namespace = project.panel_execute_namespace(td)
+    on_value_change = namespace['onValueChange']
+
+    def run():
+        for _ in range(clicks):
+            on_value_change(1, 0)
+    return timed(run) / clicks
+
+
+# Benchmarks timing one call on `size` items rather than one call per item
+PER_CALL = {'panel_execute'}
+
+
+def per_item(name, size, seconds):
+    return seconds if name in PER_CALL else seconds / size
+
+
+BENCHMARKS = {
+    'install': bench_install,
+    'createstubs': bench_createstubs,
+    'replacestubs': bench_replacestubs,
+    'updateall': bench_updateall,
+    'group_mapping': bench_group_mapping,
+    'panel_execute': bench_panel_execute,
+}
+
+
+def check_helpers():
+    """Returns a list of messages for helpers giving wrong results on known inputs."""
+    with quiet():
+        _, _, _, modules = project.make_project(num_masters=1, heavy=False, install=False)
+    percentile = modules['installer'].CookProfile.percentile
+    failures = []
+    # Nearest rank: ceil(pct / 100 * n)-th value
+    for values, pct, expected in (
+            (list(range(1, 11)), 50, 5), (list(range(1, 11)), 90, 9), (list(range(1, 11)), 99, 10),
+            (list(range(1, 9)), 50, 4), (list(range(1, 9)), 90, 8), ([7], 50, 7), ([], 50, 0.0)):
+        got = percentile(values, pct)
+        if got != expected:
+            failures.append(f"percentile(n={len(values)}, p{pct}) returned {got}, expected {expected}")
+    return failures
+
+
+def check_scaling(results, max_growth, min_size):
+    """Returns a list of messages for benchmarks whose per-item cost grew too fast."""
+    failures = []
+    for name, runs in results.items():
+        sizes = sorted(s for s in runs if s >= min_size)
+        for small, large in zip(sizes, sizes[1:]):
+            before = runs[small] / small
+            after = runs[large] / large
+            if before > 0 and after / before > max_growth:
+                failures.append(f"{name}: per-item cost grew {after / before:.1f}x from {small} to {large}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,1000,10000',
+                        help='Comma separated sizes to time (default: 10,1000,10000)')
+    parser.add_argument('--only', default='', help='Comma separated benchmark names')
+    parser.add_argument('--json', default='', help='Write the results to this JSON file')
+    parser.add_argument('--check', action='store_true', help='Fail on super-linear scaling')
+    parser.add_argument('--max-growth', type=float, default=3.0,
+                        help='Allowed per-item cost growth between consecutive sizes (default: 3)')
+    parser.add_argument('--min-size', type=int, default=100,
+                        help='Ignore sizes below this in --check, they are dominated by overhead')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    names = [n for n in args.only.split(',') if n] or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    print(f"{'benchmark':<16}{'size':>8}{'total s':>12}{'per item us':>14}")
+    for name in names:
+        results[name] = {}
+        for size in sizes:
+            seconds = BENCHMARKS[name](size)
+            results[name][size] = seconds
+            print(f"{name:<16}{size:>8}{seconds:>12.4f}{per_item(name, size, seconds) * 1e6:>14.1f}", flush=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(
+            {name: {str(size): seconds for size, seconds in runs.items()} for name, runs in results.items()},
+            indent=2))
+
+    if args.check:
+        failures = check_helpers() + check_scaling(results, args.max_growth, args.min_size)
+        for failure in failures:
+            print(f"SCALING REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
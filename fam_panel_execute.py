@@ -54,6 +54,7 @@ def onValueChange(panelValue, prev):
     # Handle both regular clicks and ENTER key
     target_index = -1
     if panelValue == -9999:  # ENTER key
+        # Place the first row the menu shows, the one highlighted
         destil = parent.OPCREATE.op('nodetable/destil')
         if destil.numRows > 1:
             selected_name = destil[1,0].val
@@ -102,7 +103,18 @@ def onValueChange(panelValue, prev):
             parent.OPCREATE.par.winclose.pulse()
             return
 
-    master = op.OPNAME.op('custom_operators').findChildren(name=lookup_name, maxDepth=1)[0]
+    if hasattr(op.OPNAME, 'GetMaster'):
+        master = op.OPNAME.GetMaster(lookup_name)
+    else:
+        masters = op.OPNAME.op('custom_operators').findChildren(name=lookup_name, maxDepth=1)
+        master = masters[0] if masters else None
+    if master is None:
+        if hasattr(op.OPNAME, 'Log'):
+            op.OPNAME.Log.Warning("OPNAME: No master component found for %s", lookup_name)
+        else:
+            print(f"OPNAME: No master component found for {lookup_name}")
+        parent.OPCREATE.par.winclose.pulse()
+        return
     clone = op.OPNAME.copy(master, name=normalized_name+'1')
     clone.allowCooking = True
     clone.bypass = False
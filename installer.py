@@ -24,7 +24,909 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import fnmatch
+import json
+import math
+import re
+import sys
+import time
+import types
+import zlib
+from collections import deque
+
+
+# Search box line the family dispatch is inserted after
+SEARCH_KEY = "if parent.OPCREATE.op('nodetable/destil').numRows > 1:\n"
+
+# Single search dispatch shared by every installed family
+SEARCH_DISPATCH = (
+    "\t\t\tfamily_click_id = op('/ui/dialogs/menu_op/family_click_ids')[op('/ui/dialogs/menu_op/current')[0,0].val, 'click_id']\n"
+    "\t\t\tif family_click_id is not None:\n"
+    "\t\t\t\tparent.OPCREATE.op('nodetable').clickID(int(family_click_id.val))\n"
+    "\t\t\t\treturn\n"
+)
+
+# Callbacks of the op menu search results ranking shared by every installed family,
+# see install_search_ranking
+RANK_CALLBACKS = '''# Installed by the family installers: orders the op menu search results
+# of the current family by its search index, see RankMenu
+
+def search_text():
+	panelexec = op('/ui/dialogs/menu_op/search/panelexec1')
+	for comp in (panelexec.par.panels.evalOPs() if panelexec is not None else []):
+		text = getattr(comp.panel, 'field', None)
+		if text is not None:
+			return str(text)
+	return ''
+
+def onCook(scriptOp):
+	scriptOp.copy(scriptOp.inputs[0])
+	installer = getattr(op, op('/ui/dialogs/menu_op/current')[0, 0].val, None)
+	if installer is not None and hasattr(installer, 'RankMenu'):
+		installer.RankMenu(scriptOp, search_text())
+	return
+'''
+
+# Per family branch inserted by earlier versions
+LEGACY_SEARCH_BRANCH = re.compile(
+    r"\t\t\tif\(op\('/ui/dialogs/menu_op/current'\)\[0,0\]\.val=='[^']*'\):\n"
+    r"\t\t\t\tparent\.OPCREATE\.op\('nodetable'\)\.clickID\(-?\d+\)\n"
+    r"\t\t\t\treturn\n"
+)
+
+
+class BatchUndo:
+    """
+    Groups the steps of a batch operation for undo.
+
+    Modes:
+        'single'  - one undo block around the whole batch.
+        'chunked' - a new undo block every chunk_size steps, so TouchDesigner's
+                    undo level limit can discard the oldest chunks.
+        'journal' - TouchDesigner undo is switched off for the batch and each step
+                    is written as one row of a journal table instead.
+    """
+    def __init__(self, name, mode='single', chunk_size=200, journal=None):
+        self.name = name
+        self.mode = mode
+        self.chunk_size = max(1, int(chunk_size))
+        self.journal = journal
+        self.batch_id = f"{name} {time.strftime('%Y-%m-%d %H:%M:%S')}"
+        self.steps = 0
+        self._chunk = 1
+        self._undo_state = None
+
+    def __enter__(self):
+        if self.mode == 'journal':
+            self._undo_state = ui.undo.globalState
+            ui.undo.globalState = False
+        else:
+            ui.undo.startBlock(self._block_name())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.mode == 'journal':
+            ui.undo.globalState = self._undo_state
+        else:
+            ui.undo.endBlock()
+        return False
+
+    def _block_name(self):
+        return self.name if self.mode != 'chunked' else f"{self.name} ({self._chunk})"
+
+    def step(self, action, source, result=''):
+        """
+        Records one completed step of the batch.
+
+        Args:
+            action (str): 'stub', 'rehydrate', 'update' or 'place'.
+            source (str): Path of the operator the step started from.
+            result (str): Path of the resulting operator (or the old version for updates).
+        """
+        self.steps += 1
+        if self.mode == 'journal':
+            if self.journal is not None:
+                self.journal.appendRow([self.batch_id, action, source, result])
+        elif self.mode == 'chunked' and self.steps % self.chunk_size == 0:
+            ui.undo.endBlock()
+            self._chunk += 1
+            ui.undo.startBlock(self._block_name())
+
+
+class BatchResult:
+    """
+    Structured outcome of a batch operation, returned by the non-interactive
+    API (CreatestubsBatch, ReplacestubsBatch, UpdateallBatch).
+
+    Attributes:
+        operation (str): Name of the batch operation.
+        counts (dict): Named counters (e.g. 'created', 'updated', 'skipped').
+        timings (dict): Seconds spent per operator path.
+        errors (list): Error messages.
+        items (list): Operators produced by the batch.
+        skipped (list): Paths that were left untouched.
+        cancelled (bool): True if the batch stopped before doing any work.
+        message (str): Reason for cancelling, if any.
+        duration (float): Total seconds for the batch.
+    """
+    def __init__(self, operation):
+        self.operation = operation
+        self.counts = {}
+        self.timings = {}
+        self.errors = []
+        self.items = []
+        self.skipped = []
+        self.cancelled = False
+        self.message = ''
+        self.duration = 0.0
+        self._start = time.perf_counter()
+
+    @property
+    def ok(self):
+        return not self.cancelled and not self.errors
+
+    def count(self, key, amount=1):
+        self.counts[key] = self.counts.get(key, 0) + amount
+
+    def time_op(self, path, start):
+        """Records the time spent on one operator since start (a perf_counter value)."""
+        self.timings[path] = time.perf_counter() - start
+
+    def cancel(self, message):
+        self.cancelled = True
+        self.message = message
+        return self.finish()
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def summary(self):
+        """Returns a one line description of the result for logs."""
+        if self.cancelled:
+            return f"{self.operation}: cancelled - {self.message}"
+        counts = ', '.join(f"{key} {value}" for key, value in self.counts.items())
+        return f"{self.operation}: {counts or 'nothing done'}, {len(self.errors)} errors in {self.duration:.3f}s"
+
+    def __str__(self):
+        return self.summary()
+
+    def to_dict(self):
+        return {
+            'operation': self.operation,
+            'counts': dict(self.counts),
+            'timings': dict(self.timings),
+            'errors': list(self.errors),
+            'skipped': list(self.skipped),
+            'cancelled': self.cancelled,
+            'message': self.message,
+            'duration': self.duration,
+        }
+
+
+class InstallerLog:
+    """
+    Logging facade shared by the installer and its extension.
+
+    Messages take %-style arguments and are only formatted when emitted,
+    so log.Debug("Stub %s", comp.path) inside a loop costs a level check.
+    Debug and Info messages are emitted only while the owner's Verbose
+    parameter is on, warnings and errors always. The backend (op.Logger,
+    or the textport without it) is resolved on first use.
+
+    Info and higher messages are also kept, unformatted, in a ring buffer
+    of the last `capacity` records; recent() formats them on demand.
+    """
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+    def __init__(self, ownerComp, capacity=1000):
+        self.ownerComp = ownerComp
+        self.records = deque(maxlen=capacity)
+        self._backend = None
+        self._resolved = False
+
+    def backend(self):
+        """Returns op.Logger, or None to print to the textport."""
+        if not self._resolved:
+            self._backend = getattr(op, 'Logger', None)
+            self._resolved = True
+        return self._backend
+
+    def verbose(self):
+        par = getattr(self.ownerComp.par, 'Verbose', None)
+        return bool(par.eval()) if par is not None else False
+
+    def isEnabledFor(self, level):
+        """Returns True if a message of this level would be emitted."""
+        return level >= self.WARNING or self.verbose()
+
+    def log(self, level, msg, *args):
+        if level >= self.INFO:
+            self.records.append((time.time(), level, msg, args))
+        if not self.isEnabledFor(level):
+            return
+        text = self.format(msg, args)
+        backend = self.backend()
+        if backend is None:
+            print(text)
+        elif level >= self.ERROR:
+            backend.Error(text)
+        elif level >= self.WARNING:
+            backend.Warning(text)
+        else:
+            backend.Info(text)
+
+    def Debug(self, msg, *args):
+        self.log(self.DEBUG, msg, *args)
+
+    def Info(self, msg, *args):
+        self.log(self.INFO, msg, *args)
+
+    def Warning(self, msg, *args):
+        self.log(self.WARNING, msg, *args)
+
+    def Error(self, msg, *args):
+        self.log(self.ERROR, msg, *args)
+
+    def format(self, msg, args):
+        if not args:
+            return str(msg)
+        try:
+            return msg % args
+        except (TypeError, ValueError):
+            return ' '.join(str(a) for a in (msg,) + tuple(args))
+
+    def recent(self, count=50, level=INFO):
+        """
+        Returns the last count buffered messages at or above level, oldest first,
+        as 'HH:MM:SS LEVEL message' lines.
+        """
+        lines = []
+        for stamp, record_level, msg, args in reversed(self.records):
+            if record_level < level:
+                continue
+            lines.append(f"{time.strftime('%H:%M:%S', time.localtime(stamp))} "
+                         f"{self.LEVEL_NAMES[record_level]} {self.format(msg, args)}")
+            if len(lines) >= count:
+                break
+        lines.reverse()
+        return lines
+
+
+class PerfPhase:
+    """One timed phase of a PerfRecorder, used as a context manager."""
+    __slots__ = ('recorder', 'name', 'target', 'key', 'start')
+
+    def __init__(self, recorder, name, target=''):
+        self.recorder = recorder
+        self.name = name
+        self.target = target
+        self.key = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.key = self.recorder._push(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder._pop(self.key, self.target, time.perf_counter() - self.start)
+        return False
+
+
+class PerfRecorder:
+    """
+    Nested phase timers for the installer's hot paths.
+
+    Phases nest by name, so 'copy' timed inside 'Updateall' is reported as
+    'Updateall/copy'. Each phase keeps a call count, its total time and the
+    operator with the worst single time. Starting a top level phase drops the
+    previous figures for that phase, so the report shows the latest run of
+    each operation. on_finish is called with the recorder whenever a top
+    level phase ends.
+    """
+    HEADER = ['phase', 'count', 'total_ms', 'mean_ms', 'worst_ms', 'worst_op']
+
+    def __init__(self, on_finish=None):
+        self.on_finish = on_finish
+        self.stats = {}
+        self._stack = []
+
+    def phase(self, name, target=''):
+        """
+        Returns a context manager timing one phase.
+
+        Args:
+            name (str): Phase name, e.g. 'copy' or 'reconnect'.
+            target (str): Path of the operator being worked on, kept for the worst case.
+        """
+        return PerfPhase(self, name, target)
+
+    def _push(self, name):
+        if not self._stack:
+            prefix = f"{name}/"
+            for key in [k for k in self.stats if k == name or k.startswith(prefix)]:
+                del self.stats[key]
+        self._stack.append(name)
+        return '/'.join(self._stack)
+
+    def _pop(self, key, target, elapsed):
+        self._stack.pop()
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0, 0.0, 0.0, '']
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed >= entry[2]:
+            entry[2] = elapsed
+            entry[3] = target
+        if not self._stack and self.on_finish:
+            self.on_finish(self)
+
+    def rows(self):
+        """Returns the report as table rows, header first, times in milliseconds."""
+        rows = [self.HEADER]
+        for key in sorted(self.stats):
+            count, total, worst, worst_op = self.stats[key]
+            rows.append([key, count, f"{total * 1000:.3f}", f"{total * 1000 / count:.3f}",
+                         f"{worst * 1000:.3f}", worst_op])
+        return rows
+
+    def to_dict(self):
+        """Returns the report keyed by phase, times in seconds."""
+        return {
+            key: {'count': count, 'total': total, 'mean': total / count,
+                  'worst': worst, 'worst_op': worst_op}
+            for key, (count, total, worst, worst_op) in sorted(self.stats.items())
+        }
+
+
+class CookProfile:
+    """
+    Cook cost samples of family instances, aggregated by operator type.
+
+    add_sample() is called once per sampled frame for each instance. Times
+    are in milliseconds as TouchDesigner reports them and include the
+    instance's children, memory is in bytes. Each instance is reduced to its
+    mean over the sampled frames before the per type percentiles are taken.
+    """
+    REPORT_HEADER = ['type', 'instances', 'cook_total_ms', 'cpu_total_ms', 'cpu_p50_ms', 'cpu_p90_ms',
+                     'cpu_p99_ms', 'gpu_total_ms', 'gpu_p50_ms', 'gpu_p90_ms', 'gpu_p99_ms',
+                     'cpu_mem_mb', 'gpu_mem_mb', 'children', 'worst_op']
+    TOP_HEADER = ['rank', 'path', 'type', 'cook_ms', 'cpu_ms', 'gpu_ms', 'cpu_mem_mb', 'gpu_mem_mb', 'children']
+
+    def __init__(self, frames=1):
+        self.frames = max(1, int(frames))
+        self.frames_sampled = 0
+        # path -> [type, cook sum, cpu sum, gpu sum, samples, cpu memory, gpu memory, children]
+        self.samples = {}
+
+    @property
+    def done(self):
+        return self.frames_sampled >= self.frames
+
+    def add_sample(self, path, op_type, cook, cpu, gpu, cpu_mem, gpu_mem, children):
+        entry = self.samples.get(path)
+        if entry is None:
+            entry = self.samples[path] = [op_type, 0.0, 0.0, 0.0, 0, 0, 0, 0]
+        entry[1] += cook
+        entry[2] += cpu
+        entry[3] += gpu
+        entry[4] += 1
+        entry[5] = cpu_mem
+        entry[6] = gpu_mem
+        entry[7] = children
+
+    @staticmethod
+    def percentile(values, pct):
+        """Nearest rank percentile of an already sorted list."""
+        if not values:
+            return 0.0
+        rank = max(0, min(len(values) - 1, math.ceil(pct / 100.0 * len(values)) - 1))
+        return values[rank]
+
+    def instances(self):
+        """Returns one dict per instance with its mean times, sorted by cost (cpu + gpu), worst first."""
+        stats = []
+        for path, (op_type, cook, cpu, gpu, count, cpu_mem, gpu_mem, children) in self.samples.items():
+            stats.append({'path': path, 'type': op_type, 'cook': cook / count, 'cpu': cpu / count,
+                          'gpu': gpu / count, 'cpu_mem': cpu_mem, 'gpu_mem': gpu_mem, 'children': children})
+        stats.sort(key=lambda i: i['cpu'] + i['gpu'], reverse=True)
+        return stats
+
+    def by_type(self):
+        """Returns per type aggregates, sorted by total cost, most expensive first."""
+        groups = {}
+        for inst in self.instances():
+            groups.setdefault(inst['type'], []).append(inst)
+        types = []
+        for op_type, insts in groups.items():
+            cpu = sorted(i['cpu'] for i in insts)
+            gpu = sorted(i['gpu'] for i in insts)
+            types.append({
+                'type': op_type,
+                'instances': len(insts),
+                'cook_total': sum(i['cook'] for i in insts),
+                'cpu_total': sum(cpu),
+                'cpu_p50': self.percentile(cpu, 50),
+                'cpu_p90': self.percentile(cpu, 90),
+                'cpu_p99': self.percentile(cpu, 99),
+                'gpu_total': sum(gpu),
+                'gpu_p50': self.percentile(gpu, 50),
+                'gpu_p90': self.percentile(gpu, 90),
+                'gpu_p99': self.percentile(gpu, 99),
+                'cpu_mem': sum(i['cpu_mem'] for i in insts),
+                'gpu_mem': sum(i['gpu_mem'] for i in insts),
+                'children': sum(i['children'] for i in insts),
+                # instances() is sorted, the first of each type is its worst
+                'worst_op': insts[0]['path'],
+            })
+        types.sort(key=lambda t: t['cpu_total'] + t['gpu_total'], reverse=True)
+        return types
+
+    def report_rows(self):
+        rows = [self.REPORT_HEADER]
+        for t in self.by_type():
+            rows.append([t['type'], t['instances'], f"{t['cook_total']:.3f}", f"{t['cpu_total']:.3f}",
+                         f"{t['cpu_p50']:.3f}", f"{t['cpu_p90']:.3f}", f"{t['cpu_p99']:.3f}",
+                         f"{t['gpu_total']:.3f}", f"{t['gpu_p50']:.3f}", f"{t['gpu_p90']:.3f}",
+                         f"{t['gpu_p99']:.3f}", f"{t['cpu_mem'] / 1048576:.2f}",
+                         f"{t['gpu_mem'] / 1048576:.2f}", t['children'], t['worst_op']])
+        return rows
+
+    def top_rows(self, count=20):
+        rows = [self.TOP_HEADER]
+        for rank, i in enumerate(self.instances()[:count], start=1):
+            rows.append([rank, i['path'], i['type'], f"{i['cook']:.3f}", f"{i['cpu']:.3f}", f"{i['gpu']:.3f}",
+                         f"{i['cpu_mem'] / 1048576:.2f}", f"{i['gpu_mem'] / 1048576:.2f}", i['children']])
+        return rows
+
+
+class CookGovernor:
+    """
+    Keeps frame time within a budget by switching allowCooking off on family
+    instances while the budget is exceeded, and back on once there is
+    headroom again.
+
+    Frame time is the smoothed wall time between two ticks, one tick per
+    frame. Instances are throttled lowest priority first, and among equal
+    priorities the ones that have not cooked for longest first; they are
+    restored in the reverse order. Priorities come from get_priority() on the
+    installer. After each adjustment the governor waits settle_frames before
+    measuring again, so the change can show in the frame time.
+
+    The candidates (instance, priority) are collected when the governor
+    starts and refreshed every refresh_seconds on frames within budget, so
+    throttling an over budget frame only re-ranks them.
+    """
+    def __init__(self, installer, settle_frames=10, smoothing=0.2, refresh_seconds=10.0):
+        self.installer = installer
+        self.settle_frames = settle_frames
+        self.smoothing = smoothing
+        self.refresh_seconds = refresh_seconds
+        self.running = False
+        self.frame_ms = None
+        self.throttled = []
+        self.candidates = []
+        self._candidates_time = None
+        self._last_tick = None
+        self._settle = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.frame_ms = None
+        self._last_tick = None
+        self._settle = 0
+        self.refresh_candidates()
+        self.installer.log.Info("Governor: Started with a %.2f ms budget", self.budget())
+        self.schedule()
+
+    def stop(self):
+        """Stops governing and lets every throttled instance cook again."""
+        self.running = False
+        self.candidates = []
+        self._candidates_time = None
+        restored = self.restore(len(self.throttled))
+        self.installer.log.Info("Governor: Stopped, %s instances restored", restored)
+
+    def schedule(self):
+        run("args[0].tick()", self, delayFrames=1, delayRef=op.TDResources)
+
+    def budget(self):
+        return float(self.installer.batch_setting('Governorbudget', 16.6))
+
+    def refresh_candidates(self):
+        """Collects the family instances with their priority, see throttle."""
+        family_name = self.installer.family_name
+        self.candidates = []
+        for comp in self.installer.collect_family_ops():
+            op_type = (self.installer.type_tag(comp) or '').removesuffix(family_name)
+            self.candidates.append((comp.path, comp, self.installer.get_priority(op_type)))
+        self._candidates_time = time.monotonic()
+
+    def tick(self):
+        if not self.running:
+            return
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            elapsed = (now - self._last_tick) * 1000
+            if self.frame_ms is None:
+                self.frame_ms = elapsed
+            else:
+                self.frame_ms += self.smoothing * (elapsed - self.frame_ms)
+        self._last_tick = now
+
+        if self._settle > 0:
+            self._settle -= 1
+        elif self.frame_ms is not None:
+            budget = self.budget()
+            step = int(self.installer.batch_setting('Governorstep', 5))
+            if self.frame_ms > budget:
+                if self.throttle(step):
+                    self._settle = self.settle_frames
+            else:
+                if self.throttled and self.frame_ms < budget * float(self.installer.batch_setting('Governorheadroom', 0.8)):
+                    if self.restore(step):
+                        self._settle = self.settle_frames
+                # Instances placed or removed since, picked up while there is time to spare
+                if self._candidates_time is None or time.monotonic() - self._candidates_time > self.refresh_seconds:
+                    self.refresh_candidates()
+        self.schedule()
+
+    def throttle(self, count):
+        """Switches cooking off on the next count candidates, returns how many were throttled."""
+        throttled_paths = {path for path, _ in self.throttled}
+        frame = absTime.frame
+        candidates = []
+        for path, comp, priority in self.candidates:
+            if not comp.valid or not comp.allowCooking or path in throttled_paths:
+                continue
+            idle = frame - getattr(comp, 'cookAbsFrame', frame)
+            candidates.append((priority, -idle, comp))
+        candidates.sort(key=lambda c: (c[0], c[1]))
+
+        for _, _, comp in candidates[:count]:
+            comp.allowCooking = False
+            self.throttled.append((comp.path, comp))
+        if candidates:
+            self.installer.log.Info("Governor: Frame time %.2f ms over budget, throttled %s instances (%s total)",
+                                    self.frame_ms or 0.0, min(count, len(candidates)), len(self.throttled))
+        return min(count, len(candidates))
+
+    def restore(self, count):
+        """Lets the count most recently throttled instances cook again, returns how many were restored."""
+        restored = 0
+        while self.throttled and restored < count:
+            path, comp = self.throttled.pop()
+            if comp.valid:
+                comp.allowCooking = True
+            restored += 1
+        if restored and self.running:
+            self.installer.log.Info("Governor: Headroom at %.2f ms, restored %s instances (%s still throttled)",
+                                    self.frame_ms or 0.0, restored, len(self.throttled))
+        return restored
+
+    def release(self, comp):
+        """
+        Forgets comp, about to be replaced by a batch operation, and returns the
+        allowCooking state it had before the governor throttled it.
+        """
+        kept = [(path, throttled) for path, throttled in self.throttled if throttled is not comp]
+        if len(kept) == len(self.throttled):
+            return comp.allowCooking
+        self.throttled = kept
+        return True
+
+
+class FamilySearchIndex:
+    """
+    Search index over the masters of a family: a prefix tree of the words
+    of each master's name, category title and keywords, plus a trigram
+    index of the names for typos and partial matches.
 
+    Args:
+        entries (iterable): (name, category, keywords) tuples.
+    """
+    WORDS = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+    def __init__(self, entries):
+        self.names = []
+        # word prefix tree, each node a dict of characters, ids of the words ending there under None
+        self.trie = {}
+        # trigram -> ids of the names containing it
+        self.trigrams = {}
+        self.name_trigrams = []
+        # id -> {word: weight}, 3 for name words, 1 for category and keyword words
+        self.weights = []
+        for name, category, keywords in entries:
+            entry_id = len(self.names)
+            self.names.append(name)
+            weights = {}
+            for word in self.words(name):
+                weights[word] = 3
+            for text in [category] + list(keywords):
+                for word in self.words(text):
+                    weights.setdefault(word, 1)
+            self.weights.append(weights)
+            for word in weights:
+                node = self.trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                node.setdefault(None, set()).add(entry_id)
+            grams = self.grams(name)
+            self.name_trigrams.append(grams)
+            for gram in grams:
+                self.trigrams.setdefault(gram, set()).add(entry_id)
+
+    def words(self, text):
+        """Splits a name into lowercase words (snake_case, camelCase, digits), plus the whole name."""
+        words = [w.lower() for w in self.WORDS.findall(text or '')]
+        whole = (text or '').lower().replace(' ', '_')
+        if whole and whole not in words:
+            words.append(whole)
+        return words
+
+    @staticmethod
+    def grams(text):
+        text = f"  {text.lower()} "
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def prefixed(self, prefix):
+        """Returns the ids of the entries with a word starting with prefix, and the words."""
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return {}
+        found = {}
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    for entry_id in child:
+                        found.setdefault(entry_id, []).append(word)
+                else:
+                    stack.append((child, word + key))
+        return found
+
+    def search(self, query, limit=10, boost=None):
+        """
+        Returns up to limit master names ranked for query. Every query word
+        must prefix a word of the entry, or the query must share trigrams
+        with the name. Exact names rank first, then name words over category
+        and keyword words, then trigram similarity.
+
+        Args:
+            query (str): The text typed in the search box.
+            limit (int): Maximum number of names returned.
+            boost (callable, optional): Returns an extra score for a name.
+        """
+        query = (query or '').strip()
+        if not query:
+            return []
+        lowered = query.lower()
+        scores = {}
+
+        query_words = self.words(query)
+        prefix_hits = [self.prefixed(word) for word in query_words if word != lowered or len(query_words) == 1]
+        if prefix_hits:
+            matched = set(prefix_hits[0]).intersection(*prefix_hits[1:])
+            for entry_id in matched:
+                weights = self.weights[entry_id]
+                scores[entry_id] = 10.0 * sum(max(weights[word] for word in hits[entry_id])
+                                              for hits in prefix_hits)
+
+        grams = self.grams(query)
+        overlap = {}
+        for gram in grams:
+            for entry_id in self.trigrams.get(gram, ()):
+                overlap[entry_id] = overlap.get(entry_id, 0) + 1
+        for entry_id, shared in overlap.items():
+            similarity = shared / len(grams | self.name_trigrams[entry_id])
+            if similarity >= 0.2 or entry_id in scores:
+                scores[entry_id] = scores.get(entry_id, 0.0) + 10.0 * similarity
+
+        for entry_id in scores:
+            name = self.names[entry_id].lower()
+            if name == lowered:
+                scores[entry_id] += 100.0
+            elif name.startswith(lowered):
+                scores[entry_id] += 20.0
+            if boost:
+                scores[entry_id] += boost(self.names[entry_id])
+
+        ranked = sorted(scores, key=lambda entry_id: (-scores[entry_id], self.names[entry_id]))
+        return [self.names[entry_id] for entry_id in ranked[:limit]]
+
+
+class CompatibilityMatrix:
+    """
+    The connection rules of a family compiled into bitsets over the families
+    of the op menu. Every family gets a bit, and the families it can feed are
+    ORed into one int per family, so a check is a lookup and a shift.
+
+    Rules are the (source, dest) keys of connection_map and the
+    compatible_types list, which makes the family compatible with those
+    types both ways. Both accept family names, fnmatch wildcards ('T*', '*')
+    and '@group' names: the groups given, plus '@builtin' for the
+    TouchDesigner families and '@custom' for every other family. Exact keys
+    win over patterns, patterns are tried in order. Only pairs involving the
+    family are compiled, the family is always compatible with itself.
+    """
+    BUILTIN = ('TOP', 'CHOP', 'SOP', 'DAT', 'COMP', 'MAT', 'POP')
+
+    def __init__(self, family, families, compatible_types=(), connection_map=None, groups=None):
+        self.family = family
+        self.families = list(dict.fromkeys(list(families) + [family]))
+        self.index = {name: i for i, name in enumerate(self.families)}
+        self.groups = {'builtin': set(self.BUILTIN),
+                       'custom': {name for name in self.families if name not in self.BUILTIN}}
+        self.groups.update({name: set(members) for name, members in (groups or {}).items()})
+
+        connection_map = connection_map or {}
+        exact = {key: value for key, value in connection_map.items()
+                 if not self.is_pattern(key[0]) and not self.is_pattern(key[1])}
+        patterns = [(key, value) for key, value in connection_map.items() if key not in exact]
+        accepted = {name for name in self.families
+                    if any(self.matches(pattern, name) for pattern in compatible_types)}
+
+        # family -> bitset of the families it can feed, and the table cell values
+        self.outputs = dict.fromkeys(self.families, 0)
+        self.values = {}
+        for other in self.families:
+            for source, dest in ((family, other), (other, family)):
+                value = exact.get((source, dest))
+                if value is None:
+                    value = next((v for (s, d), v in patterns
+                                  if self.matches(s, source) and self.matches(d, dest)), None)
+                if value is None:
+                    value = 'x' if other == family or other in accepted else ''
+                if value:
+                    self.values[(source, dest)] = value
+                    self.outputs[source] |= 1 << self.index[dest]
+
+    @staticmethod
+    def is_pattern(name):
+        return name.startswith('@') or any(c in name for c in '*?[')
+
+    def matches(self, pattern, name):
+        if pattern.startswith('@'):
+            return name in self.groups.get(pattern[1:], ())
+        return fnmatch.fnmatchcase(name, pattern)
+
+    def compatible(self, source, dest):
+        """Returns True if source can feed dest."""
+        bit = self.index.get(dest)
+        return bit is not None and bool(self.outputs.get(source, 0) >> bit & 1)
+
+    def cell(self, source, dest):
+        """Returns the compatible table value for source feeding dest, '' if incompatible."""
+        return self.values.get((source, dest), '')
+
+    def sources(self):
+        """Returns the other families that can feed the family."""
+        return sorted(name for name in self.families if name != self.family and self.compatible(name, self.family))
+
+
+class StartupScheduler:
+    """
+    Spreads the startup installation of the family installers of a project
+    over consecutive frames. The queue of schedulers lives in a module shared
+    by every installer of the process, so it is never saved with the project.
+    Only the installer at its head works, running steps until Startupbudget
+    milliseconds are spent in the frame (at least one step a frame).
+
+    A failing step leaves the queue so the next installers proceed, but the
+    installer stays not ready and keeps the message in error.
+    """
+    QUEUE_KEY = 'family_startup_queue'
+
+    def __init__(self, installer):
+        self.installer = installer
+        self.steps = None
+        self.ready = True
+        self.error = None
+
+    @property
+    def running(self):
+        return self.steps is not None
+
+    @property
+    def alive(self):
+        return self.running and self.installer.ownerComp.valid
+
+    @classmethod
+    def shared_queue(cls):
+        """The list of queued schedulers, shared by every installer module of the process."""
+        shared = sys.modules.get(cls.QUEUE_KEY)
+        if shared is None:
+            shared = types.ModuleType(cls.QUEUE_KEY)
+            shared.queue = []
+            sys.modules[cls.QUEUE_KEY] = shared
+            # Projects saved before the queue moved out of storage
+            op('/').unstore(cls.QUEUE_KEY)
+        return shared.queue
+
+    def queue(self):
+        """Paths of the installers waiting for their startup turn, head first."""
+        return [s.installer.ownerComp.path for s in self.shared_queue() if s.alive]
+
+    def start(self, steps):
+        """Queues this installer to run steps, an iterator yielding after each slice of work."""
+        path = self.installer.ownerComp.path
+        queue = self.shared_queue()
+        # A reinitialized extension replaces the scheduler of its previous instance
+        queue[:] = [s for s in queue if s is not self and s.alive
+                    and s.installer.ownerComp.path != path]
+        queue.append(self)
+        was_running = self.running
+        self.steps = steps
+        self.ready = False
+        self.error = None
+        if not was_running:
+            self.schedule()
+
+    def stop(self):
+        """Drops the pending steps and leaves the queue."""
+        self.ready = True
+        self.error = None
+        self.leave()
+
+    def fail(self, error):
+        """Drops the pending steps and leaves the queue without becoming ready."""
+        self.ready = False
+        self.error = str(error)
+        self.leave()
+
+    def leave(self):
+        self.steps = None
+        queue = self.shared_queue()
+        if self in queue:
+            queue.remove(self)
+
+    def schedule(self):
+        run("args[0].step()", self, delayFrames=1, delayRef=op.TDResources)
+
+    def step(self):
+        if not self.running:
+            return
+        queue = self.shared_queue()
+        if self not in queue:
+            # Replaced by a reinitialized instance of the same installer
+            self.steps = None
+            return
+        # Installers destroyed, failed or reinitialized before finishing do not hold up the others
+        while queue and queue[0] is not self and not queue[0].alive:
+            queue.pop(0)
+        if queue and queue[0] is not self:
+            self.schedule()
+            return
+
+        budget = self.installer.batch_setting('Startupbudget', 8.0) / 1000.0
+        start = time.perf_counter()
+        with self.installer.perf.phase('Startup'):
+            while True:
+                try:
+                    next(self.steps)
+                except StopIteration:
+                    self.stop()
+                    self.installer.log.Info("%s startup installation ready", self.installer.family_name)
+                    return
+                except Exception as e:
+                    self.installer.log.Error("Startup: %s installation step failed: %s",
+                                             self.installer.family_name, e)
+                    self.fail(e)
+                    return
+                if budget > 0 and time.perf_counter() - start >= budget:
+                    break
+        self.schedule()
 
 
 class GenericInstallerEXT:
@@ -35,7 +937,8 @@ class GenericInstallerEXT:
     It replicates the functionality of specific installers but is designed
     to handle any operator family by specifying parameters such as family name and color.
     """
-    def __init__(self, ownerComp, family_name, color, compatible_types=None, connection_map=None):
+    def __init__(self, ownerComp, family_name, color, compatible_types=None, connection_map=None, interactive=True,
+                 compatibility_groups=None):
         """
         Initializes the installer extension.
 
@@ -43,12 +946,14 @@ class GenericInstallerEXT:
             ownerComp (COMP): The component to which this extension is attached.
             family_name (str): The name of the operator family ('e.g., 'LOPS', 'RayTK'').
             color (list or tuple): The color to associate with the operator family.
+            interactive (bool): Show message boxes. When False, no dialog ever
+                blocks and batch pulses run through the *Batch API.
+            compatibility_groups (dict, optional): Named lists of families, usable as
+                '@name' in compatible_types and connection_map, see CompatibilityMatrix.
         """
-        
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Initializing GenericInstallerEXT for {family_name}")
-        else:
-            print(f"Initializing GenericInstallerEXT for {family_name}")
+        # Shared with the extension, reads the Verbose parameter of ownerComp
+        self.log = InstallerLog(ownerComp)
+        self.log.Info("Initializing GenericInstallerEXT for %s", family_name)
 
 
         self.ownerComp = ownerComp
@@ -56,13 +961,38 @@ class GenericInstallerEXT:
         self.color = color
         self.compatible_types = compatible_types or []
         self.connection_map = connection_map or {}
+        self.compatibility_groups = compatibility_groups or {}
+        self._compatibility = None
+        self.interactive = interactive
+        self.last_result = None
+        self.last_profile = None
+        # Parameter copy plans keyed by (old version, master path, master version)
+        self._copy_plans = {}
+        # Sequence block layouts keyed by (sequence name, owner type, owner version), reset per batch
+        self._sequence_schemas = {}
+        # Partial stub policies keyed by operator type, reset by create_stubs
+        self._stub_policies = {}
+        # Governor priorities keyed by operator type, reset when the governor starts
+        self._priorities = {}
+        # Last use time of the lazy masters loaded from the library, keyed by name
+        self._loaded_masters = {}
+        self._idle_check_pending = False
+        self.governor = CookGovernor(self)
+        # Frame sliced startup installation, see IsReady on the extension
+        self.startup = StartupScheduler(self)
+        # Called with each master during the startup installation, set by the family extension
+        self.master_step = None
+        self._search_index = None
+        self._usage_table_pending = False
+        self._perf_report_pending = False
+        # (masters by name, masters by ext0object) of the library, see master_index
+        self._master_index = None
+        # Phase timings of Install and the batch operations, see perf_report
+        self.perf = PerfRecorder(on_finish=self.schedule_perf_report)
         self.find_other_installers(op, self.family_name)
 
         version = str(parent().par.Header.label).split('Version ')[1]
-        if hasattr(op,'Logger'):
-            op.Logger.Info(self.family_name ,version,  'Installed')
-        else:
-            print(self.family_name ,version,  'Installed')
+        self.log.Info("%s %s Installed", self.family_name, version)
         run(
 			"args[0].postInit() if args[0] "
 					"and hasattr(args[0], 'postInit') else None",
@@ -86,11 +1016,12 @@ class GenericInstallerEXT:
         """
         self.ownerComp.par.opshortcut = ''
         if hasattr(op, name):
-            print(f"Found existing {name} installer, destroying this one.")
-            try:
-                ui.messageBox(name, f"{name} exists already ! !")
-            except:
-                pass
+            self.log.Warning("Found existing %s installer, destroying this one.", name)
+            if self.is_interactive():
+                try:
+                    ui.messageBox(name, f"{name} exists already ! !")
+                except:
+                    pass
 
             run("args[0].selfDestroy()", self, endFrame=True, delayRef=op.TDResources)
             return 
@@ -108,7 +1039,8 @@ class GenericInstallerEXT:
         self.ownerComp.par.opshortcut = name
 
         if self.ownerComp.par.Install == 1:
-            self.Install()
+            # Spread over the next frames, one family after the other
+            self.startup.start(self.startup_steps())
         return
 
     def Install(self):
@@ -118,79 +1050,147 @@ class GenericInstallerEXT:
         """
         self.ownerComp.par.Install = 1
         #print(f"Installing {self.family_name}")
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Start {self.family_name} Nodes Injection")
-        else:
-            print(f"Start {self.family_name} Nodes Injection")  
-
-        toggle_path = f"/ui/dialogs/bookmark_bar/{self.family_name}_toggle"
-        if op('/ui/dialogs/bookmark_bar/' + f"{self.family_name}_toggle") is None:
-            # print(f"Creating toggle button at {toggle_path}")
-            op(f"install_scripts/fam_toggle/button/text1").par.text = self.family_name
-            toggle = op('/ui/dialogs/bookmark_bar').copy(
-                self.ownerComp.op('install_scripts/fam_toggle'),
-                name=f"{self.family_name}_toggle"
-            )
-            toggle.allowCooking = True
-            toggle.inputCOMPConnectors[0].connect(op('/ui/dialogs/bookmark_bar/emptypanel'))
-            toggle.op('button').par.value0.bindExpr = f"op.{self.family_name}.par.Install"
-            
-            # Update the opexec1 text to use the correct family name
-            opexec1 = toggle.op('opexec1')
-            if opexec1:
-                opexec1.par.op.expr = f"op.{self.family_name}"
-                opexec1.text = opexec1.text.replace('LOP', self.family_name)
+        self.log.Info("Start %s Nodes Injection", self.family_name)
+        # A manual install supersedes a pending startup installation
+        self.startup.stop()
+        self.library_changed()
+
+        for step in self.install_steps():
+            step()
+
+        #print(f"{self.family_name} installation complete")
+        self.log.Info("%s Nodes Injection complete", self.family_name)
+
+    def install_steps(self):
+        """
+        Returns the steps of Install in order. Install runs them back to back,
+        the startup scheduler spreads them over frames.
+        """
+        return [self.compile_compatibility, self.install_menu_entry, self.install_colors,
+                self.install_menu_scripts, self.install_compatibility]
 
-        self.ownerComp.par.opshortcut = self.family_name
+    def startup_steps(self):
+        """
+        Generator running the startup installation for StartupScheduler,
+        yielding after each step: the Install steps, then master_step on
+        every master of the library if the family extension set one.
+        """
+        self.log.Info("Start %s Nodes Injection", self.family_name)
+        self.library_changed()
+        for step in self.install_steps():
+            step()
+            yield
+        operators_folder = self.ownerComp.op('custom_operators')
+        if self.master_step and operators_folder:
+            for master in operators_folder.findChildren(depth=1):
+                self.master_step(master)
+                yield
+        self.log.Info("%s Nodes Injection complete", self.family_name)
+
+    def compile_compatibility(self):
+        """
+        Compiles the connection rules against the families of the compatible
+        table of the op menu. Returns the CompatibilityMatrix.
+        """
+        families = []
+        compatibleTable = op('/ui/dialogs/menu_op/compatible')
+        if compatibleTable is not None:
+            families = [c.val for c in compatibleTable.row(0)[1:]] + [c.val for c in compatibleTable.col(0)[1:]]
+        self._compatibility = CompatibilityMatrix(self.family_name, families, self.compatible_types,
+                                                  self.connection_map, self.compatibility_groups)
+        return self._compatibility
+
+    def compatibility(self):
+        """Returns the CompatibilityMatrix compiled at install, compiling it if needed."""
+        return self._compatibility or self.compile_compatibility()
+
+    def IsCompatible(self, source, dest):
+        """Returns True if operators of family source can feed operators of family dest."""
+        return self.compatibility().compatible(source, dest)
+
+    def install_menu_entry(self):
+        """Adds the bookmark bar toggle and the family column of the op menu."""
+        with self.perf.phase('menu patch'):
+            toggle_path = f"/ui/dialogs/bookmark_bar/{self.family_name}_toggle"
+            if op('/ui/dialogs/bookmark_bar/' + f"{self.family_name}_toggle") is None:
+                # print(f"Creating toggle button at {toggle_path}")
+                op(f"install_scripts/fam_toggle/button/text1").par.text = self.family_name
+                toggle = op('/ui/dialogs/bookmark_bar').copy(
+                    self.ownerComp.op('install_scripts/fam_toggle'),
+                    name=f"{self.family_name}_toggle"
+                )
+                toggle.allowCooking = True
+                toggle.inputCOMPConnectors[0].connect(op('/ui/dialogs/bookmark_bar/emptypanel'))
+                toggle.op('button').par.value0.bindExpr = f"op.{self.family_name}.par.Install"
+
+                # Update the opexec1 text to use the correct family name
+                opexec1 = toggle.op('opexec1')
+                if opexec1:
+                    opexec1.par.op.expr = f"op.{self.family_name}"
+                    opexec1.text = opexec1.text.replace('LOP', self.family_name)
+
+            self.ownerComp.par.opshortcut = self.family_name
+            menuOp = op('/ui/dialogs/menu_op')
+            nodeTable = op('/ui/dialogs/menu_op/nodetable')
+
+            # Insert family into the families table
+            if menuOp.op(f'{self.family_name}_insert') is None:
+                # print(f"Creating family insert DAT for {self.family_name}")
+                familyInsert = menuOp.create(insertDAT, f'{self.family_name}_insert')
+                familyInsert.par.insert = 'col'
+                familyInsert.par.at = 'index'
+                familyInsert.par.index = self.ownerComp.par.Index
+                familyInsert.par.index.expr = f'op.{self.family_name}.par.Index'
+                familyInsert.par.contents = self.family_name
+                current_output = menuOp.op('insert1').outputs[0]
+                menuOp.op('insert1').outputConnectors[0].disconnect()
+                menuOp.op('insert1').outputConnectors[0].connect(familyInsert)
+                familyInsert.outputConnectors[0].connect(current_output)
+                familyInsert.nodeX = menuOp.op('insert1').nodeX + 150
+                familyInsert.nodeY = menuOp.op('insert1').nodeY
+
+    def install_colors(self):
+        """Writes the family color to the colors table of the op menu."""
+        menuOp = op('/ui/dialogs/menu_op')
+        with self.perf.phase('table writes'):
+            # Update colors table directly instead of using a colorInsert DAT
+            colors_table = menuOp.op('colors')
+            if colors_table:
+                # Check if the family already exists in the colors table
+                family_exists = False
+                for i in range(colors_table.numRows):
+                    if colors_table[i, 0].val == f"'{self.family_name}'":
+                        # Family exists, update its color values
+                        for j in range(1, min(len(self.color) + 1, colors_table.numCols)):
+                            colors_table[i, j] = self.color[j-1]
+                        family_exists = True
+                        break
+                # If family doesn't exist, add a new row
+                if not family_exists:
+                    new_row = [f"'{self.family_name}'"]
+                    for c in self.color:
+                        new_row.append(c)
+                    colors_table.appendRow(new_row)       
+
+    def install_menu_scripts(self):
+        """Patches the op menu scripts: node type detection, families, search and placement."""
         menuOp = op('/ui/dialogs/menu_op')
         nodeTable = op('/ui/dialogs/menu_op/nodetable')
+        with self.perf.phase('menu patch'):
+            # Create and modify the set_last_node_type DAT
+            if menuOp.op('set_last_node_type') is None:
+                setLastNodeType = menuOp.copy(op('install_scripts/set_last_node_type'))
+                setLastNodeType.nodeX, setLastNodeType.nodeY = (
+                    menuOp.op('launch_menu_op').nodeX - 200,
+                    menuOp.op('launch_menu_op').nodeY
+                )
+            else:
+                setLastNodeType = menuOp.op('set_last_node_type')
 
-        # Insert family into the families table
-        if menuOp.op(f'{self.family_name}_insert') is None:
-            # print(f"Creating family insert DAT for {self.family_name}")
-            familyInsert = menuOp.create(insertDAT, f'{self.family_name}_insert')
-            familyInsert.par.insert = 'col'
-            familyInsert.par.at = 'index'
-            familyInsert.par.index = self.ownerComp.par.Index
-            familyInsert.par.index.expr = f'op.{self.family_name}.par.Index'
-            familyInsert.par.contents = self.family_name
-            current_output = menuOp.op('insert1').outputs[0]
-            menuOp.op('insert1').outputConnectors[0].disconnect()
-            menuOp.op('insert1').outputConnectors[0].connect(familyInsert)
-            familyInsert.outputConnectors[0].connect(current_output)
-            familyInsert.nodeX = menuOp.op('insert1').nodeX + 150
-            familyInsert.nodeY = menuOp.op('insert1').nodeY
-
-        # Update colors table directly instead of using a colorInsert DAT
-        colors_table = menuOp.op('colors')
-        if colors_table:
-            # Check if the family already exists in the colors table
-            family_exists = False
-            for i in range(colors_table.numRows):
-                if colors_table[i, 0].val == f"'{self.family_name}'":
-                    # Family exists, update its color values
-                    for j in range(1, min(len(self.color) + 1, colors_table.numCols)):
-                        colors_table[i, j] = self.color[j-1]
-                    family_exists = True
-                    break
-            # If family doesn't exist, add a new row
-            if not family_exists:
-                new_row = [f"'{self.family_name}'"]
-                for c in self.color:
-                    new_row.append(c)
-                colors_table.appendRow(new_row)       
-        # Create and modify the set_last_node_type DAT
-        if menuOp.op('set_last_node_type') is None:
-            setLastNodeType = menuOp.copy(op('install_scripts/set_last_node_type'))
-            setLastNodeType.nodeX, setLastNodeType.nodeY = (
-                menuOp.op('launch_menu_op').nodeX - 200,
-                menuOp.op('launch_menu_op').nodeY
-            )
-        else:
-            setLastNodeType = menuOp.op('set_last_node_type')
-
-        compatible_types_check = ' or '.join([f"menu_type=='{t}'" for t in self.compatible_types])
-        set_last_node_type_script = f'''varTable = op('local/set_variables')
+            # Families feeding this one, compiled once into a set literal
+            sources = self.compatibility().sources()
+            compatible_types_check = '{' + ', '.join(repr(t) for t in sources) + '}' if sources else 'set()'
+            set_last_node_type_script = f'''varTable = op('local/set_variables')
 lastnode = op(varTable['nodepath',1])
 source = varTable['source',1].val
 menu_type = varTable['menu_type',1].val
@@ -199,7 +1199,7 @@ if(lastnode and source == 'output'):
     if ('{self.family_name}' in lastnode.tags):
         type = '{self.family_name}'
     varTable['lasttype',1] = type
-elif(source == 'input' and ({compatible_types_check})):
+elif(source == 'input' and menu_type in {compatible_types_check}):
     pane = ui.panes.current
     zoom = pane.zoom
     currentParent = pane.owner
@@ -214,161 +1214,130 @@ elif(source == 'input' and ({compatible_types_check})):
                 break
     varTable['lasttype',1] = type'''
 
-        setLastNodeType.text = set_last_node_type_script
-        launch_menu_op = menuOp.op('launch_menu_op')
-        code = launch_menu_op.text
-        key = 'if($type != "none")'
-        replacement = (
-            f"{key}\n\tcvar menu_type=$type\n\trun set_last_node_type\n\tset type = $lasttype"
-        )
-        launch_menu_op.text = code.replace(key, replacement)
-        # Set color for all children components- this could be removed
-        for o in self.ownerComp.findChildren():
-            if 'License' not in o.name and o.OPType != 'annotateCOMP':
-                o.color = self.color
-        self.ownerComp.color = self.color 
-
-
-        families_op = nodeTable.op('families')
-        families_op.bypass = False 
-
-        inject_op_name = f'inject_{self.family_name}_fam'
-        if nodeTable.op(inject_op_name) is None:            
-            families_op = nodeTable.op('families')
-            original_input = families_op.inputs[0]  
-            inject_op = nodeTable.copy(families_op, name=inject_op_name, includeDocked=True)
-            inject_op.par.callbacks.expr = f"op.{self.family_name}.op('install_scripts/fam_script_callbacks')"
-            inject_op.nodeX = families_op.nodeX + 150 
-            inject_op.nodeY = families_op.nodeY
-            if original_input:
-                original_input.outputConnectors[0].disconnect()
-                original_input.outputConnectors[0].connect(inject_op)
-                inject_op.outputConnectors[0].connect(families_op)
-            families_op.cook(force=True)
-            inject_op.cook(force=True)
-        else:
-            # debug(menuOp.op(inject_op_name))
-            families_op = nodeTable.op('families')
-            families_op.bypass = False  
-        eval4 = nodeTable.op('eval4')
-        current_expr = eval4.par.expr.eval()
-        if current_expr:
-            if current_expr != "[x for x in families.keys()]":
-                if self.family_name not in current_expr:
-                    eval4.par.expr = f"{current_expr[:-1]}, '{self.family_name}']"
-            else:
-                eval4.par.expr = f"[x for x in families.keys()] + ['{self.family_name}']"
-        else:
-            eval4.par.expr = f"[x for x in families.keys()] + ['{self.family_name}']"
-        createNode = menuOp.op('create_node')
-        if f"if($type=='{self.family_name}')" not in createNode.text:
-            insertion_key = 'set type = `tab("current",0,0)`\n'
-            insert_code = (
-                f"if($type=='{self.family_name}')\n\texit\nendif\n"
-            )
-            index = createNode.text.index(insertion_key)
-            createNode.text = (
-                createNode.text[:index + len(insertion_key)]
-                + insert_code
-                + createNode.text[index + len(insertion_key):]
-            )
-
-        searchExec = menuOp.op('search/panelexec1')
-        if self.family_name not in searchExec.text:
-            key = "if parent.OPCREATE.op('nodetable/destil').numRows > 1:\n"
-            unique_id = -abs(hash(self.family_name) % 10000)  # Creates a unique negative number between -1 and -9999
-            insert_code = (
-                f"\t\t\tif(op('/ui/dialogs/menu_op/current')[0,0].val=='{self.family_name}'):\n"
-                f"\t\t\t\tparent.OPCREATE.op('nodetable').clickID({unique_id})\n"
-                f"\t\t\t\treturn\n"
-            )
-            index = searchExec.text.index(key)
-            searchExec.text = (
-                searchExec.text[:index + len(key)]
-                + insert_code
-                + searchExec.text[index + len(key):]
+            setLastNodeType.text = set_last_node_type_script
+            launch_menu_op = menuOp.op('launch_menu_op')
+            code = launch_menu_op.text
+            key = 'if($type != "none")'
+            replacement = (
+                f"{key}\n\tcvar menu_type=$type\n\trun set_last_node_type\n\tset type = $lasttype"
             )
+            launch_menu_op.text = code.replace(key, replacement)
+            # Set color for all children components- this could be removed
+            for o in self.ownerComp.findChildren():
+                if 'License' not in o.name and o.OPType != 'annotateCOMP':
+                    o.color = self.color
+            self.ownerComp.color = self.color 
 
-        panel_execute_path = f'{self.family_name}_panel_execute'
-        if menuOp.op(panel_execute_path) is None:
-            panel_execute = menuOp.copy(
-                self.ownerComp.op('install_scripts/fam_panel_execute'),
-                name=panel_execute_path
-            )
-            panel_execute.nodeX = menuOp.op('node_script').nodeX
-            panel_execute.nodeY = menuOp.op('node_script').nodeY + 100
-            # Generate the same unique ID used in the search panel
-            unique_id = -abs(hash(self.family_name) % 10000)
-            panel_execute_script = panel_execute.text.replace('OPNAME', self.family_name)
-            panel_execute_script = panel_execute_script.replace('-9999', str(unique_id))
-            panel_execute.text = panel_execute_script
 
-        compatibleTable = menuOp.op('compatible')
-        row_entry = [self.family_name]
-        for index in range(1, compatibleTable.numCols):
-            col_type = compatibleTable[0, index].val
-            connection_key = (self.family_name, col_type)
-            if connection_key in self.connection_map:
-                row_entry.append(self.connection_map[connection_key])
-            elif col_type in self.compatible_types:
-                row_entry.append('x')
+            families_op = nodeTable.op('families')
+            families_op.bypass = False 
+
+            inject_op_name = f'inject_{self.family_name}_fam'
+            if nodeTable.op(inject_op_name) is None:            
+                families_op = nodeTable.op('families')
+                original_input = families_op.inputs[0]  
+                inject_op = nodeTable.copy(families_op, name=inject_op_name, includeDocked=True)
+                inject_op.par.callbacks.expr = f"op.{self.family_name}.op('install_scripts/fam_script_callbacks')"
+                inject_op.nodeX = families_op.nodeX + 150 
+                inject_op.nodeY = families_op.nodeY
+                if original_input:
+                    original_input.outputConnectors[0].disconnect()
+                    original_input.outputConnectors[0].connect(inject_op)
+                    inject_op.outputConnectors[0].connect(families_op)
+                families_op.cook(force=True)
+                inject_op.cook(force=True)
             else:
-                row_entry.append('')
-                
-        col_entry = [self.family_name]
-        for row in compatibleTable.rows()[1:]:  
-            row_type = row[0].val
-            connection_key = (row_type, self.family_name)
-            if connection_key in self.connection_map:
-                col_entry.append(self.connection_map[connection_key])
-            elif row_type in self.compatible_types:
-                col_entry.append('x')
+                # debug(menuOp.op(inject_op_name))
+                families_op = nodeTable.op('families')
+                families_op.bypass = False  
+            eval4 = nodeTable.op('eval4')
+            current_expr = eval4.par.expr.eval()
+            if current_expr:
+                if current_expr != "[x for x in families.keys()]":
+                    if self.family_name not in current_expr:
+                        eval4.par.expr = f"{current_expr[:-1]}, '{self.family_name}']"
+                else:
+                    eval4.par.expr = f"[x for x in families.keys()] + ['{self.family_name}']"
             else:
-                col_entry.append('')        
-
-        # Add the row and column first
-        if not compatibleTable.rows(self.family_name):
-            compatibleTable.appendRow(row_entry)
-        if not compatibleTable.cols(self.family_name):
-            compatibleTable.appendCol(col_entry)
-
-        # Now set the intersection point to 'x'
-        try:
-            # Get row and column indices by searching through the table
-            row_index = None
-            col_index = None
-            
-            # Find row index
-            for i in range(compatibleTable.numRows):
-                if compatibleTable[i, 0].val == self.family_name:
-                    row_index = i
-                    break
-                    
-            # Find column index
-            for i in range(compatibleTable.numCols):
-                if compatibleTable[0, i].val == self.family_name:
-                    col_index = i
-                    break
-                    
-            if row_index is not None and col_index is not None:
-                compatibleTable[row_index, col_index] = 'x'
-        except Exception as e:
-            print(f"Error setting self-compatibility: {e}")
-                
-       
-      
-    
-        #print(f"{self.family_name} installation complete")
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"{self.family_name} Nodes Injection complete")
-        else:
-            print(f"{self.family_name} Nodes Injection complete")
+                eval4.par.expr = f"[x for x in families.keys()] + ['{self.family_name}']"
+            createNode = menuOp.op('create_node')
+            if f"if($type=='{self.family_name}')" not in createNode.text:
+                insertion_key = 'set type = `tab("current",0,0)`\n'
+                insert_code = (
+                    f"if($type=='{self.family_name}')\n\texit\nendif\n"
+                )
+                index = createNode.text.index(insertion_key)
+                createNode.text = (
+                    createNode.text[:index + len(insertion_key)]
+                    + insert_code
+                    + createNode.text[index + len(insertion_key):]
+                )
+
+            # One dispatch for every family, looking the current family up in family_click_ids
+            unique_id = self.family_click_id(menuOp)
+            searchExec = menuOp.op('search/panelexec1')
+            if SEARCH_DISPATCH not in searchExec.text:
+                text = LEGACY_SEARCH_BRANCH.sub('', searchExec.text)
+                index = text.index(SEARCH_KEY)
+                searchExec.text = text[:index + len(SEARCH_KEY)] + SEARCH_DISPATCH + text[index + len(SEARCH_KEY):]
+            self.install_search_ranking(nodeTable)
+
+            panel_execute_path = f'{self.family_name}_panel_execute'
+            if menuOp.op(panel_execute_path) is None:
+                panel_execute = menuOp.copy(
+                    self.ownerComp.op('install_scripts/fam_panel_execute'),
+                    name=panel_execute_path
+                )
+                panel_execute.nodeX = menuOp.op('node_script').nodeX
+                panel_execute.nodeY = menuOp.op('node_script').nodeY + 100
+                # The same click ID the search panel dispatches to
+                panel_execute_script = panel_execute.text.replace('OPNAME', self.family_name)
+                panel_execute_script = panel_execute_script.replace('-9999', str(unique_id))
+                panel_execute.text = panel_execute_script
+
+    def install_compatibility(self):
+        """Adds the family row and column to the compatible table of the op menu."""
+        menuOp = op('/ui/dialogs/menu_op')
+        with self.perf.phase('table writes'):
+            compatibleTable = menuOp.op('compatible')
+            matrix = self.compatibility()
+            row_entry = [self.family_name] + [matrix.cell(self.family_name, cell.val)
+                                              for cell in compatibleTable.row(0)[1:]]
+            col_entry = [self.family_name] + [matrix.cell(cell.val, self.family_name)
+                                              for cell in compatibleTable.col(0)[1:]]
+
+            # Add the row and column first
+            if not compatibleTable.rows(self.family_name):
+                compatibleTable.appendRow(row_entry)
+            if not compatibleTable.cols(self.family_name):
+                compatibleTable.appendCol(col_entry)
+
+            # Now set the intersection point to 'x'
+            try:
+                # Get row and column indices by searching through the table
+                row_index = None
+                col_index = None
+
+                # Find row index
+                for i in range(compatibleTable.numRows):
+                    if compatibleTable[i, 0].val == self.family_name:
+                        row_index = i
+                        break
+
+                # Find column index
+                for i in range(compatibleTable.numCols):
+                    if compatibleTable[0, i].val == self.family_name:
+                        col_index = i
+                        break
+
+                if row_index is not None and col_index is not None:
+                    compatibleTable[row_index, col_index] = 'x'
+            except Exception as e:
+                self.log.Error("Error setting self-compatibility: %s", e)
 
     def Uninstall(self):
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Beginning uninstall of {self.family_name}")
-        else:
-            print(f"Beginning uninstall of {self.family_name}")
+        self.log.Info("Beginning uninstall of %s", self.family_name)
+        self.startup.stop()
         self.ownerComp.par.Install = 0
         menuOp = op('/ui/dialogs/menu_op')
         nodeTable = op('/ui/dialogs/menu_op/nodetable')
@@ -394,6 +1363,17 @@ elif(source == 'input' and ({compatible_types_check})):
         panel_execute_path = f'{self.family_name}_panel_execute'
         if menuOp.op(panel_execute_path):
             menuOp.op(panel_execute_path).destroy()
+        click_ids = menuOp.op('family_click_ids')
+        if click_ids is not None:
+            if click_ids[self.family_name, 0] is not None:
+                click_ids.deleteRow(self.family_name)
+            # The last family out removes the search dispatch
+            if click_ids.numRows <= 1:
+                click_ids.destroy()
+                searchExec = menuOp.op('search/panelexec1')
+                if searchExec is not None:
+                    searchExec.text = searchExec.text.replace(SEARCH_DISPATCH, '')
+                self.uninstall_search_ranking(nodeTable)
         launch_menu_op = menuOp.op('launch_menu_op')
         code = launch_menu_op.text
         key = f'if($type != "none")\n\tcvar menu_type=$type\n\trun set_last_node_type\n\tset type = $lasttype'
@@ -408,41 +1388,315 @@ elif(source == 'input' and ({compatible_types_check})):
             compatibleTable.deleteRow(self.family_name)
         if compatibleTable.cols(self.family_name):
             compatibleTable.deleteCol(self.family_name)
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"{self.family_name} uninstallation complete")
-        else:
-            print(f"{self.family_name} uninstallation complete")
+        self.log.Info("%s uninstallation complete", self.family_name)
 
     def selfDestroy(self):
         """
         Destroys the owner component.
         """
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Destroying {self.family_name} installer component")
-        else:
-            print(f"Destroying {self.family_name} installer component")
+        if self.governor.running:
+            self.governor.stop()
+        self.startup.stop()
+        self.log.Info("Destroying %s installer component", self.family_name)
         self.ownerComp.destroy()
         return
     
 
 
+    def install_search_ranking(self, nodeTable):
+        """
+        Puts a Script DAT running RANK_CALLBACKS in place of the op menu's
+        destil table, the search results the menu lists and ENTER places.
+        The original is renamed destil_source and feeds it, so the rows of
+        the current family come out ordered by its RankMenu. Shared by every
+        family, the first one installs it.
+        """
+        source = nodeTable.op('destil')
+        if source is None or source.fetch('family_ranking', False, search=False):
+            return
+        callbacks = nodeTable.op('family_rank_callbacks') or nodeTable.create(textDAT, 'family_rank_callbacks')
+        callbacks.text = RANK_CALLBACKS
+        callbacks.nodeX, callbacks.nodeY = source.nodeX + 150, source.nodeY - 150
+        outputs = list(source.outputConnectors[0].connections)
+        source.name = 'destil_source'
+        ranking = nodeTable.create(scriptDAT, 'destil')
+        ranking.par.callbacks = callbacks.name
+        ranking.store('family_ranking', True)
+        ranking.nodeX, ranking.nodeY = source.nodeX + 150, source.nodeY
+        source.outputConnectors[0].connect(ranking)
+        for connector in outputs:
+            ranking.outputConnectors[0].connect(connector)
+
+    def uninstall_search_ranking(self, nodeTable):
+        """Removes the ranking of install_search_ranking and gives destil its name back."""
+        ranking = nodeTable.op('destil')
+        source = nodeTable.op('destil_source')
+        if ranking is None or source is None or not ranking.fetch('family_ranking', False, search=False):
+            return
+        outputs = list(ranking.outputConnectors[0].connections)
+        ranking.destroy()
+        if nodeTable.op('family_rank_callbacks'):
+            nodeTable.op('family_rank_callbacks').destroy()
+        source.name = 'destil'
+        for connector in outputs:
+            source.outputConnectors[0].connect(connector)
+
+    def RankMenu(self, table, query):
+        """
+        Orders the result rows of the op menu search (all rows after the
+        header) by Search, best match first, the rows Search doesn't match
+        keeping their order after them. Called by the destil Script DAT
+        while this family is the current one.
+        """
+        if not query or table.numRows < 3:
+            return
+        rows = [[cell.val for cell in table.row(i)] for i in range(1, table.numRows)]
+        order = {name: rank for rank, name in enumerate(self.Search(query, len(rows)))}
+        ranked = sorted(rows, key=lambda row: order.get(row[0].replace(' ', '_'), len(order)))
+        if ranked == rows:
+            return
+        table.clear(keepFirstRow=True)
+        for row in ranked:
+            table.appendRow(row)
+
+    def family_click_id(self, menuOp):
+        """
+        Returns the nodetable click ID of this family, registering it in the
+        family_click_ids table of the op menu. The ID comes from a CRC32 of
+        the family name, so it is the same in every session, and is moved to
+        the next free ID if another family already uses it.
+        """
+        click_ids = menuOp.op('family_click_ids')
+        if click_ids is None:
+            click_ids = menuOp.create(tableDAT, 'family_click_ids')
+            click_ids.appendRow(['family', 'click_id'])
+        if click_ids[self.family_name, 'click_id'] is not None:
+            return int(click_ids[self.family_name, 'click_id'].val)
+
+        # -9999 is the placeholder the ENTER key uses in the panel execute template
+        used = {row[1].val for row in click_ids.rows()[1:]}
+        click_id = -(zlib.crc32(self.family_name.encode()) % 9998 + 1)
+        while str(click_id) in used:
+            click_id = click_id - 1 if click_id > -9998 else -1
+        click_ids.appendRow([self.family_name, click_id])
+        return click_id
+
+    def is_interactive(self):
+        """Returns True if dialogs may be shown (interactive and the Headless parameter is off)."""
+        return self.interactive and not self.batch_setting('Headless', False)
+
+    def type_tag(self, comp):
+        """Returns the {type}{family} tag of a component, or None if it has none."""
+        return next((t for t in comp.tags if t.endswith(self.family_name) and t != self.family_name), None)
+
+    def is_family_op(self, o):
+        """Returns True for an instance of this family outside the installer."""
+        return (
+            self.family_name in o.tags and 
+            not hasattr(o.parent, self.family_name) and 
+            not hasattr(o.parent, f"{self.family_name}OPs") and
+            o != self.ownerComp and  # Exclude the installer component itself
+            self.ownerComp.path not in o.path  # Exclude children of the installer
+        )
+
+    def is_stub(self, o):
+        """Returns True for a stub of this family."""
+        return len(o.tags) == 1 and f"{self.family_name}stub" in self.getElement(o.tags)
+
+    def collect_family_ops(self, roots=None):
+        """
+        Finds all instances of this family in the project, excluding the
+        installer and its children.
+
+        Args:
+            roots (list, optional): Only search these COMPs and their children
+                (see scope_roots). Defaults to the whole project.
+        """
+        with self.perf.phase('discover'):
+            return self.collect_in_scope(roots, self.is_family_op)
+
+    def collect_stubs(self, roots=None):
+        """Finds all stubs of this family in the project, or under roots."""
+        with self.perf.phase('discover'):
+            return self.collect_in_scope(roots, self.is_stub)
+
+    def collect_in_scope(self, roots, key):
+        """
+        Returns the COMPs matching key among roots and their children, each
+        once, so the cost follows the size of the scope.
+        """
+        if roots is None:
+            return op('/').findChildren(type=COMP, key=key)
+        found = {}
+        for root in roots:
+            if not root.isCOMP:
+                continue
+            if root.path != '/' and key(root):
+                found.setdefault(root.path, root)
+            for o in root.findChildren(type=COMP, key=key):
+                found.setdefault(o.path, o)
+        return list(found.values())
+
+    def iter_in_scope(self, roots, key):
+        """
+        Yields the COMPs matching key among roots and their children (the
+        whole project when roots is None) while walking the network, so
+        callers can stream over them without a list of the whole set.
+        """
+        roots = [op('/')] if roots is None else [r for r in roots if r.isCOMP]
+        # Roots inside other roots would be walked twice
+        paths = {root.path for root in roots}
+        stack = [root for root in roots
+                 if not any(root.path.startswith(p.rstrip('/') + '/') for p in paths if p != root.path)]
+        while stack:
+            comp = stack.pop()
+            if comp.path != '/' and key(comp):
+                yield comp
+            if comp != self.ownerComp:
+                stack.extend(c for c in reversed(comp.children) if c.isCOMP)
+
+    def scope_roots(self, scope=None):
+        """
+        Resolves a batch operation scope to the list of COMPs to search.
+
+        Args:
+            scope: None to follow the Scope parameter, 'project', 'selection'
+                (the selected operators of the current network pane), a COMP
+                or path, or a list of COMPs or paths.
+        Returns:
+            list: COMPs to search, or None for the whole project.
+        """
+        if scope is None:
+            mode = self.batch_setting('Scope', 'project')
+            if mode == 'root':
+                scope = self.batch_setting('Scoperoot', None)
+                if not scope:
+                    self.log.Warning("Scope is set to Root but Scoperoot is empty, using the whole project")
+                    return None
+            elif mode == 'selection':
+                scope = 'selection'
+            else:
+                return None
+        if scope == 'project':
+            return None
+        if scope == 'selection':
+            pane = ui.panes.current
+            owner = getattr(pane, 'owner', None)
+            return list(owner.selectedChildren) if owner else []
+
+        items = scope if isinstance(scope, (list, tuple, set)) else [scope]
+        roots = []
+        for item in items:
+            root = op(item) if isinstance(item, str) else item
+            if root:
+                roots.append(root)
+            else:
+                self.log.Warning("Scope: %s not found", item)
+        return roots
+
     def getElement(self, s):
         """Returns the first element of a set/list or None if empty."""
         for e in s:
             return e
         return None
-    def createStub(self, comp):
+    def batch_setting(self, name, default):
+        """Returns the value of an optional installer parameter, or default if it doesn't exist."""
+        par = getattr(self.ownerComp.par, name, None)
+        return par.eval() if par is not None else default
+
+    def journal_table(self):
+        """Returns the batch journal Table DAT inside the installer, creating it if needed."""
+        table = self.ownerComp.op('batch_journal')
+        if table is None:
+            table = self.ownerComp.create(tableDAT, 'batch_journal')
+            table.clear()
+            table.appendRow(['batch', 'action', 'source', 'result'])
+        return table
+
+    def batch_undo(self, name, mode=None):
+        """
+        Returns the BatchUndo for a batch operation, configured from the
+        Undomode and Undochunk installer parameters unless mode is given.
+        """
+        mode = mode or self.batch_setting('Undomode', 'single')
+        journal = self.journal_table() if mode == 'journal' else None
+        return BatchUndo(name, mode=mode, chunk_size=self.batch_setting('Undochunk', 200), journal=journal)
+
+    def Revertjournal(self):
+        """
+        Reverts the most recent journaled batch operation.
+
+        Stubs created by the batch are regenerated, components regenerated
+        from stubs are stubbed again, placed components are destroyed and
+        backfilled type tags are removed. Updates can't be reverted since the
+        previous master version no longer exists; they are reported and dropped.
+        The replay itself is recorded as a single undo step, not journaled, so
+        reverting again moves on to the batch before it.
+        """
+        table = self.ownerComp.op('batch_journal')
+        if table is None or table.numRows < 2:
+            self.log.Info("Revertjournal: Journal is empty.")
+            return
+
+        batch_id = table[table.numRows - 1, 'batch'].val
+        rows = [i for i in range(1, table.numRows) if table[i, 'batch'].val == batch_id]
+
+        stubs = []
+        comps = []
+        placed = []
+        untagged = 0
+        not_revertable = 0
+        for i in reversed(rows):
+            action = table[i, 'action'].val
+            target = op(table[i, 'result'].val) if action in ('stub', 'rehydrate', 'place') else None
+            if action == 'stub' and target:
+                stubs.append(target)
+            elif action == 'rehydrate' and target:
+                comps.append(target)
+            elif action == 'place' and target:
+                placed.append(target)
+            elif action == 'tag':
+                comp = op(table[i, 'source'].val)
+                tag = table[i, 'result'].val
+                if comp and tag in comp.tags:
+                    comp.tags.remove(tag)
+                    untagged += 1
+            elif action == 'update':
+                not_revertable += 1
+
+        # Drop the batch from the journal before replaying
+        for i in reversed(rows):
+            table.deleteRow(i)
+
+        errors = []
+        if stubs:
+            errors += self.replace_stubs(stubs, undo_mode='single').errors
+        if comps:
+            errors += self.create_stubs(comps, undo_mode='single').errors
+        for comp in placed:
+            comp.destroy()
+
+        message = f"Revertjournal: Reverted '{batch_id}' ({len(stubs)} regenerated, {len(comps)} stubbed, {len(placed)} removed, {untagged} untagged"
+        if not_revertable:
+            message += f", {not_revertable} updates not revertable"
+        message += f", {len(errors)} errors)"
+        self.log.Info(message)
+
+    def createStub(self, comp, stub_type='empty'):
         """
         Creates a lightweight stub of a component, preserving its connections and parameters.
         
         Args:
             comp (COMP): The component to create a stub from.
+            stub_type (str): 'empty' removes every child. 'frozen' keeps the out
+                operators fed by locked snapshots of their last result, so the
+                downstream network keeps working.
+
+        Children matched by the master's stub policy (see get_stub_policy) are
+        kept in either case, and the stub keeps cooking so they stay responsive.
         """
         name = comp.name
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"createStub: Creating stub for {comp.path} with tags {comp.tags}")
-        else:
-            print(f"createStub: Creating stub for {comp.path} with tags {comp.tags}")
+        self.log.Debug("createStub: Creating stub for %s with tags %s", comp.path, comp.tags)
 
         # IMPORTANT: Extract the operator type before copying
         # First look for a tag that matches {type}{familyName} pattern
@@ -450,19 +1704,30 @@ elif(source == 'input' and ({compatible_types_check})):
         for tag in comp.tags:
             if tag.endswith(self.family_name) and tag != self.family_name:
                 op_type = tag.removesuffix(self.family_name)
-                print(f"createStub: Found operator type '{op_type}' from tag '{tag}'")
+                self.log.Debug("createStub: Found operator type '%s' from tag '%s'", op_type, tag)
                 break
         
         # If no type-specific tag was found, use the component name as the type
         if not op_type:
             op_type = comp.name
-            if hasattr(op,'Logger'):
-                op.Logger.Warning(f"createStub: No type tag found, using component name '{op_type}' as type")
-            else:
-                print(f"createStub: No type tag found, using component name '{op_type}' as type")
-
-        copy = comp.parent().copy(comp)
-        copy.allowCooking = False
+            self.log.Warning("createStub: No type tag found, using component name '%s' as type", op_type)
+
+        comp_path = comp.path
+        frozen = {}
+        if stub_type == 'frozen':
+            with self.perf.phase('freeze', comp_path):
+                frozen = self.freeze_outputs(comp)
+
+        policy = self.get_stub_policy(op_type, comp)
+
+        with self.perf.phase('copy', comp_path):
+            copy = comp.parent().copy(comp)
+            # Frozen stubs cook their out operators, which only pass locked data through,
+            # partial stubs their kept control layer
+            copy.allowCooking = bool(frozen) or policy is not None
+            # A clone linked copy would pull the master network back in
+            if self.clone_master(comp):
+                copy.par.enablecloning = False
         
         # Preserve node position and size
         copy.nodeX = comp.nodeX
@@ -470,20 +1735,30 @@ elif(source == 'input' and ({compatible_types_check})):
         copy.nodeWidth = comp.nodeWidth
         copy.nodeHeight = comp.nodeHeight
         
-        # Remove all children to make it lightweight
-        children = copy.findChildren(depth=1)
-        while children:
-            if children[-1]:
-                children[-1].destroy()
-            else:
-                children = children[:-1]
+        # Remove all children to make it lightweight, frozen stubs keep their outputs
+        # and partial stubs the children their policy keeps
+        keep = set(frozen) | {null_name for null_name in frozen.values() if null_name}
+        with self.perf.phase('destroy', comp_path):
+            children = [c for c in copy.findChildren(depth=1)
+                        if c.name not in keep and not (policy and self.stub_keeps(policy, c.name))]
+            while children:
+                if children[-1]:
+                    children[-1].destroy()
+                else:
+                    children = children[:-1]
+            for null_name in frozen.values():
+                if null_name and comp.op(null_name):
+                    comp.op(null_name).destroy()
+
+        for out_name, null_name in frozen.items():
+            if null_name:
+                copy.op(null_name).outputConnectors[0].connect(copy.op(out_name).inputConnectors[0])
+        copy.store('frozen', bool(frozen))
+        copy.store('partial', policy is not None)
         
         # Store the operator type explicitly
         stub_tag = f"{op_type}{self.family_name}stub"
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"createStub: Setting stub tag to '{stub_tag}'")
-        else:
-            print(f"createStub: Setting stub tag to '{stub_tag}'")
+        self.log.Debug("createStub: Setting stub tag to '%s'", stub_tag)
         copy.tags = [stub_tag]
         
         # Also store the type directly for easier retrieval
@@ -493,69 +1768,145 @@ elif(source == 'input' and ({compatible_types_check})):
         copy.name = f"{name}_stub"
         
         # Store important properties
-        copy.store('cooking', comp.allowCooking)
+        copy.store('cooking', self.governor.release(comp))
         copy.store('bypass', comp.bypass)
         
-        # Store input connections
-        inputs = [(i.connections[0].outOP if i.connections[0].owner.isCOMP else i.connections[0].owner) 
-                if i.connections else None for i in comp.inputConnectors]
-        copy.store('inputs', inputs)
-        
-        # Store output connections
-        outputs = [[(con.owner, con.index) for con in o.connections] for o in comp.outputConnectors]
-        copy.store('outputs', outputs)
+        with self.perf.phase('capture', comp_path):
+            # Store connections as path based edges so they survive ops moving
+            copy.store('edges', self.capture_connections([comp]))
+
+            copy.store('params', self.capture_params(comp))
         
-        # Store parameter values
+        return copy
+
+    def capture_params(self, comp):
+        """
+        Returns the parameter values of a component as stored on stubs, each
+        sequence once under its first block parameter.
+        """
         params = {}
+        seen_sequences = set()
         for p in comp.pars():
             if hasattr(p, 'sequence') and p.sequence:
-                # Special handling for sequence parameters
                 seq = p.sequence
-                seq_data = {
-                    'name': seq.name if hasattr(seq, 'name') else '',
-                    'numBlocks': seq.numBlocks,
-                    'blocks': []
-                }
-                
-                # Store each block's parameters using direct name access instead of iteration
-                common_par_names = ['name', 'label', 'value', 'index', 'enable', 'display', 
-                                    'top', 'dat', 'text', 'op', 'ops', 'mode', 'active',
-                                    'parameters', 'pages', 'info', 'shortcut']
-                
-                for i in range(seq.numBlocks):
-                    block = seq.blocks[i]
-                    block_data = {}
-                    
-                    # Try each parameter name directly
-                    for par_name in common_par_names:
-                        try:
-                            if hasattr(block.par, par_name):
-                                par = block.par[par_name]
-                                if par.mode == ParMode.CONSTANT:
-                                    block_data[par_name] = par.val
-                                elif par.mode == ParMode.EXPRESSION:
-                                    block_data[par_name] = {'mode': 'expr', 'expr': par.expr}
-                                elif par.mode == ParMode.BIND:
-                                    block_data[par_name] = {'mode': 'bind', 'expr': par.bindExpr}
-                        except Exception as e:
-                            # Silently continue if a particular parameter access fails
-                            pass
-                    
-                    seq_data['blocks'].append(block_data)
-                
-                params[p.name] = {'type': 'sequence', 'data': seq_data}
+                if seq.name in seen_sequences:
+                    continue
+                seen_sequences.add(seq.name)
+                params[p.name] = {'type': 'sequence', 'data': self.sequence_to_data(comp, seq)}
             else:
-                # Regular parameter handling (existing code)
-                if p.mode == ParMode.CONSTANT:
-                    params[p.name] = p.val
-                elif p.mode == ParMode.EXPRESSION:
-                    params[p.name] = {'mode': 'expr', 'expr': p.expr}
-                elif p.mode == ParMode.BIND:
-                    params[p.name] = {'mode': 'bind', 'expr': p.bindExpr}
-        
-        copy.store('params', params)
-        
-        return copy
+                params[p.name] = self.par_to_data(p)
+        return params
+
+    def get_stub_policy(self, op_type, comp=None):
+        """
+        Returns the partial stub policy of a master as (keep, strip) lists of
+        child name patterns (fnmatch style), or None to strip every child.
+
+        A policy is declared either by 'stubkeep=<pattern>' and
+        'stubstrip=<pattern>' tags on the master, or by a row of the
+        stub_policy table in custom_operators with type, keep and strip
+        columns holding space separated patterns. The table wins over tags.
+        Children are kept if they match a keep pattern (or no keep pattern
+        is given) and no strip pattern.
+
+        Args:
+            op_type (str): The master name.
+            comp (COMP, optional): An instance, whose tags are used when the master is missing.
+        """
+        if op_type in self._stub_policies:
+            return self._stub_policies[op_type]
+
+        keep, strip = [], []
+        operators_folder = self.ownerComp.op('custom_operators')
+        table = operators_folder.op('stub_policy') if operators_folder else None
+        if table is not None and table[op_type, 0] is not None:
+            if table[op_type, 'keep'] is not None:
+                keep = table[op_type, 'keep'].val.split()
+            if table[op_type, 'strip'] is not None:
+                strip = table[op_type, 'strip'].val.split()
+        else:
+            master_ops = operators_folder.findChildren(name=op_type, maxDepth=1) if operators_folder else []
+            source = master_ops[0] if master_ops else comp
+            for tag in (source.tags if source else ()):
+                if tag.startswith('stubkeep='):
+                    keep.append(tag.removeprefix('stubkeep='))
+                elif tag.startswith('stubstrip='):
+                    strip.append(tag.removeprefix('stubstrip='))
+
+        policy = (keep, strip) if keep or strip else None
+        self._stub_policies[op_type] = policy
+        return policy
+
+    def get_priority(self, op_type):
+        """
+        Returns the cooking governor priority of an operator type, lower
+        priorities being throttled first. Declared in a governor_priority
+        table (type, priority) in custom_operators, or by a 'govpriority=<n>'
+        tag on the master; 50 otherwise.
+        """
+        if op_type in self._priorities:
+            return self._priorities[op_type]
+
+        priority = 50.0
+        operators_folder = self.ownerComp.op('custom_operators')
+        table = operators_folder.op('governor_priority') if operators_folder else None
+        if table is not None and table[op_type, 'priority'] is not None:
+            priority = float(table[op_type, 'priority'].val or priority)
+        elif operators_folder:
+            master_ops = operators_folder.findChildren(name=op_type, maxDepth=1) if op_type else []
+            for tag in (master_ops[0].tags if master_ops else ()):
+                if tag.startswith('govpriority='):
+                    priority = float(tag.removeprefix('govpriority='))
+                    break
+
+        self._priorities[op_type] = priority
+        return priority
+
+    def Governor(self):
+        """Starts or stops the cooking governor to follow the Governor parameter."""
+        if self.batch_setting('Governor', False):
+            self._priorities = {}
+            self.governor.start()
+        else:
+            self.governor.stop()
+
+    def stub_keeps(self, policy, name):
+        """Returns True if a child called name survives stubbing under policy."""
+        keep, strip = policy
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in strip):
+            return False
+        return not keep or any(fnmatch.fnmatchcase(name, pattern) for pattern in keep)
+
+    def freeze_outputs(self, comp):
+        """
+        Snapshots the result feeding each out operator of a component into a
+        locked null of the same family, created next to it inside comp. The
+        null is fed from the output the out operator reads, whichever output
+        of its source that is.
+
+        Returns:
+            dict: Out operator name -> locked null name, or None for out
+                operators that could not be frozen. Every out operator is
+                listed so the stub keeps all of the component's outputs.
+        """
+        null_types = {'TOP': nullTOP, 'CHOP': nullCHOP, 'SOP': nullSOP, 'DAT': nullDAT}
+        frozen = {}
+        for out_op in comp.findChildren(depth=1, key=lambda o: o.OPType.startswith('out')):
+            null_type = null_types.get(out_op.family)
+            sources = out_op.inputConnectors[0].connections if out_op.inputConnectors else []
+            if null_type is None or not sources:
+                self.log.Warning("freeze_outputs: %s can't be frozen, its output stays empty in the stub",
+                                 out_op.path)
+                frozen[out_op.name] = None
+                continue
+            null = comp.create(null_type, f"frozen_{out_op.name}")
+            null.nodeX = out_op.nodeX - 150
+            null.nodeY = out_op.nodeY
+            sources[0].connect(null.inputConnectors[0])
+            null.cook(force=True)
+            null.lock = True
+            frozen[out_op.name] = null.name
+        return frozen
 
     def Createstubs(self):
         """
@@ -563,21 +1914,13 @@ elif(source == 'input' and ({compatible_types_check})):
         Shows a confirmation dialog with stub count information.
         First warns about operators without specific type tags.
         """
-        # print(f"Createstubs: Starting for {self.family_name}")
-        # Find all operators of this family type, excluding the installer and its children
-        familyOps = op('/').findChildren(type=COMP, key=lambda o: (
-            self.family_name in o.tags and 
-            not hasattr(o.parent, self.family_name) and 
-            not hasattr(o.parent, f"{self.family_name}OPs") and
-            o != self.ownerComp and  # Exclude the installer component itself
-            self.ownerComp.path not in o.path  # Exclude children of the installer
-        ))
+        if not self.is_interactive():
+            return self.CreatestubsBatch()
+
+        familyOps = self.select_stub_candidates(self.collect_family_ops(self.scope_roots()))
         
         if not familyOps:
-            if hasattr(op,'Logger'):
-                op.Logger.Info("Createstubs: No family operators found.")
-            else:
-                print("Createstubs: No family operators found.")
+            self.log.Info("Createstubs: No family operators found.")
             ui.messageBox(
                 f"No {self.family_name} Operators Found",
                 f"No {self.family_name} operators found to create stubs.",
@@ -586,17 +1929,7 @@ elif(source == 'input' and ({compatible_types_check})):
             return
         
         # Check which operators don't have proper type tags
-        ops_without_type_tags = []
-        for comp in familyOps:
-            has_type_tag = False
-            for tag in comp.tags:
-                # Check if the tag follows the pattern {type}{familyName} but isn't just the family name
-                if tag.endswith(self.family_name) and tag != self.family_name:
-                    has_type_tag = True
-                    break
-            
-            if not has_type_tag:
-                ops_without_type_tags.append(comp)
+        ops_without_type_tags = [comp for comp in familyOps if not self.type_tag(comp)]
         
         # Show warning if any operators lack proper type tags
         if ops_without_type_tags:
@@ -613,17 +1946,14 @@ elif(source == 'input' and ({compatible_types_check})):
             else:
                 warning_message += "\n"
             
-            warning_message += "It's recommended to cancel and ensure all operators have proper type tags first.\n"
+            warning_message += "It's recommended to cancel and run Backfilltypetags first.\n"
             warning_message += "Do you want to proceed anyway?"
             
             warning_buttons = ['Proceed Anyway', 'Cancel']
             warning_choice = ui.messageBox(f'Missing Type Tags Warning', warning_message, buttons=warning_buttons)
             
             if warning_choice != 0:  # Not "Proceed Anyway"
-                if hasattr(op,'Logger'):
-                    op.Logger.Info("Createstubs: User cancelled due to missing type tags.")
-                else:
-                    print("Createstubs: User cancelled due to missing type tags.")
+                self.log.Info("Createstubs: User cancelled due to missing type tags.")
                 return
         
         # Show confirmation dialog with count information
@@ -646,37 +1976,12 @@ Do you want to continue?
         choice = ui.messageBox(f'Create {self.family_name} Stubs', message, buttons=buttons)
         
         if choice != 0:  # Not "Create Stubs"
-            if hasattr(op,'Logger'):
-                op.Logger.Info("Createstubs: User cancelled stub creation.")
-            else:
-                print("Createstubs: User cancelled stub creation.")
+            self.log.Info("Createstubs: User cancelled stub creation.")
             return
         
         # Proceed with stub creation
-        ui.undo.startBlock(f'Create {self.family_name} Stubs')
-        
-        created_stubs = []
-        for comp in familyOps:
-            try:
-                stub = self.createStub(comp)
-                created_stubs.append(stub)
-            except Exception as e:
-                if hasattr(op,'Logger'):
-                    op.Logger.Error(f"Createstubs: Error creating stub for {comp.path}: {e}")
-                else:
-                    print(f"Createstubs: Error creating stub for {comp.path}: {e}")
-
-        # After creating all stubs, destroy the originals
-        for comp in familyOps:
-            try:
-                comp.destroy()
-            except Exception as e:
-                if hasattr(op,'Logger'):
-                    op.Logger.Error(f"Createstubs: Error destroying original component {comp.path}: {e}")
-                else:
-                    print(f"Createstubs: Error destroying original component {comp.path}: {e}")
-
-        ui.undo.endBlock()
+        result = self.create_stubs(familyOps)
+        created_stubs = result.items
         
         # Show completion message
         completion_message = f"""
@@ -687,27 +1992,68 @@ Do you want to continue?
         """
         
         ui.messageBox(f'{self.family_name} Stubs Created', completion_message, buttons=["OK"])
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Createstubs: Completed creating {len(created_stubs)} stubs.")
-        else:
-            print(f"Createstubs: Completed creating {len(created_stubs)} stubs.")
+        self.log.Info("Createstubs: Completed creating %s stubs.", len(created_stubs))
         return
 
+    def create_stubs(self, comps, undo_mode=None, stub_type=None):
+        """
+        Replaces each component in comps with a lightweight stub.
+
+        Args:
+            comps (list): The family components to stub.
+            undo_mode (str, optional): Overrides the Undomode parameter.
+            stub_type (str, optional): 'empty' or 'frozen', overrides the Stubtype parameter.
+        Returns:
+            BatchResult: 'created' count, created stubs in items, per-op timings.
+        """
+        result = BatchResult('Createstubs')
+        stub_type = stub_type or self.batch_setting('Stubtype', 'empty')
+        # Policies and masters may have been edited since the last run
+        self._stub_policies = {}
+        self._sequence_schemas = {}
+        with self.perf.phase('Createstubs'), \
+                self.batch_undo(f'Create {self.family_name} Stubs', mode=undo_mode) as undo:
+            for comp in comps:
+                comp_path = comp.path
+                start = time.perf_counter()
+                try:
+                    stub = self.createStub(comp, stub_type=stub_type)
+                    result.items.append(stub)
+                except Exception as e:
+                    result.errors.append(f"Error creating stub for {comp_path}: {e}")
+                    self.log.Error("Createstubs: Error creating stub for %s: %s", comp_path, e)
+                    continue
+
+                # Connections are stored as paths, so the original can go right away
+                try:
+                    with self.perf.phase('destroy', comp_path):
+                        comp.destroy()
+                    if stub.fetch('frozen', False, search=False):
+                        # Downstream operators read from the stub until it is rehydrated
+                        with self.perf.phase('reconnect', comp_path):
+                            downstream = [e for e in stub.fetch('edges', [], search=False) if e[0] == comp_path]
+                            self.rewire_connections(downstream, {comp_path: stub.path})
+                    undo.step('stub', comp_path, stub.path)
+                except Exception as e:
+                    result.errors.append(f"Error destroying original component {comp_path}: {e}")
+                    self.log.Error("Createstubs: Error destroying original component %s: %s", comp_path, e)
+                result.time_op(comp_path, start)
+
+        result.count('created', len(result.items))
+        return result.finish()
+
     def Replacestubs(self):
         """
         Regenerates full components from stubs.
         """
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Replacestubs: Starting for {self.family_name}")
-        else:
-            print(f"Replacestubs: Starting for {self.family_name}")
-        stubs = op('/').findChildren(type=COMP, key=lambda o: len(o.tags) == 1 and f"{self.family_name}stub" in self.getElement(o.tags))
+        if not self.is_interactive():
+            return self.ReplacestubsBatch()
+
+        self.log.Info("Replacestubs: Starting for %s", self.family_name)
+        stubs = self.collect_stubs(self.scope_roots())
         
         if not stubs:
-            if hasattr(op,'Logger'):
-                op.Logger.Info("Replacestubs: No stubs found.")
-            else:
-                print("Replacestubs: No stubs found.")
+            self.log.Info("Replacestubs: No stubs found.")
             ui.messageBox(
                 f"No {self.family_name} Stubs Found",
                 f"No {self.family_name} stubs found to regenerate.",
@@ -715,15 +2061,9 @@ Do you want to continue?
             ) 
             return
         
-        if hasattr(op,'Logger'):
-            op.Logger.Info(f"Replacestubs: Found {len(stubs)} stubs")
-        else:
-            print(f"Replacestubs: Found {len(stubs)} stubs")
+        self.log.Info("Replacestubs: Found %s stubs", len(stubs))
         for s in stubs:
-            if hasattr(op,'Logger'):
-                op.Logger.Info(f"Replacestubs: Stub: {s.path}, Tags: {s.tags}")
-            else:
-                print(f"Replacestubs: Stub: {s.path}, Tags: {s.tags}")
+            self.log.Debug("Replacestubs: Stub: %s, Tags: %s", s.path, s.tags)
 
         # Show confirmation dialog
         message = f"""
@@ -742,163 +2082,21 @@ Do you want to continue?
         choice = ui.messageBox(f'Regenerate {self.family_name} Operators', message, buttons=buttons)
         
         if choice != 0:  # Not "Regenerate"
-            if hasattr(op,'Logger'):
-                op.Logger.Info("Replacestubs: User cancelled regeneration.")
-            else:
-                print("Replacestubs: User cancelled regeneration.")
+            self.log.Info("Replacestubs: User cancelled regeneration.")
             return
         
-        ui.undo.startBlock(f'Regenerate {self.family_name} from Stubs')
-        
-        operators_folder = self.ownerComp.op('custom_operators')
-        if not operators_folder:
-            if hasattr(op,'Logger'):
-                op.Logger.Error("Replacestubs: custom_operators folder not found.")
-            else:
-                print("Replacestubs: custom_operators folder not found.")
+        if not self.ownerComp.op('custom_operators'):
+            self.log.Error("Replacestubs: custom_operators folder not found.")
             ui.messageBox(
                 "Error",
                 f"Error: 'custom_operators' folder not found in the installer component.",
                 buttons=["OK"]
             )
-            ui.undo.endBlock()
             return
-        
-        regenerated = []
-        errors = []
-        
-        # First pass - create the components and set their parameters
-        for stub in stubs:
-            try:
-                # Get the operator type - first try from stored value, then from tag
-                op_type = stub.fetch('op_type', None)
-                if not op_type:
-                    # Extract from tag as fallback
-                    tag = self.getElement(stub.tags)
-                    if not tag or not tag.endswith(f"{self.family_name}stub"):
-                        errors.append(f"Invalid tag format on {stub.path}: {tag}")
-                        continue
-                    op_type = tag.removesuffix(f"{self.family_name}stub")
-                
-                # print(f"Replacestubs: Using operator type '{op_type}' for {stub.path}")
-                
-                # Find the master component to copy
-                master_ops = operators_folder.findChildren(name=op_type, maxDepth=1)
-                if not master_ops:
-                    if hasattr(op,'Logger'):
-                        op.Logger.Error(f"Replacestubs: No master component found for type '{op_type}'")
-                    else:
-                        print(f"Replacestubs: No master component found for type '{op_type}'")
-                    errors.append(f"No master component found for type {op_type}")
-                    continue
-                
-                master_op = master_ops[0]
-                # print(f"Replacestubs: Found master component: {master_op.path}")
-                
-                # Create the new component
-                new_comp = stub.parent().copy(master_op)
-                new_comp.nodeX = stub.nodeX
-                new_comp.nodeY = stub.nodeY
-                new_comp.nodeWidth = stub.nodeWidth
-                new_comp.nodeHeight = stub.nodeHeight
-                new_comp.name = stub.name.removesuffix('_stub')
-                
-                # Restore parameters from stub
-                params = stub.fetch('params', {})
-                for name, value in params.items():
-                    dest_pars = new_comp.pars(name)
-                    if not dest_pars:
-                        continue
-                        
-                    dest_par = dest_pars[0]
-                    
-                    # Check if this is a sequence parameter
-                    if isinstance(value, dict) and value.get('type') == 'sequence':
-                        seq_data = value.get('data', {})
-                        
-                        # Only proceed if the destination has a sequence
-                        if hasattr(dest_par, 'sequence') and dest_par.sequence:
-                            seq_dest = dest_par.sequence
-                            
-                            # Set the number of blocks
-                            if seq_dest.numBlocks != seq_data.get('numBlocks', 0):
-                                seq_dest.numBlocks = seq_data.get('numBlocks', 0)
-                            
-                            # Restore each block's parameters
-                            blocks_data = seq_data.get('blocks', [])
-                            for i, block_data in enumerate(blocks_data):
-                                if i < seq_dest.numBlocks:
-                                    dest_block = seq_dest.blocks[i]
-                                    
-                                    # Restore all parameters in this block using direct access
-                                    for par_name, par_value in block_data.items():
-                                        try:
-                                            if hasattr(dest_block.par, par_name):
-                                                dest_block_par = dest_block.par[par_name]
-                                                
-                                                if isinstance(par_value, dict):
-                                                    if par_value.get('mode') == 'expr':
-                                                        dest_block_par.mode = ParMode.EXPRESSION
-                                                        dest_block_par.expr = par_value.get('expr', '')
-                                                    elif par_value.get('mode') == 'bind':
-                                                        dest_block_par.mode = ParMode.BIND
-                                                        dest_block_par.bindExpr = par_value.get('expr', '')
-                                                else:
-                                                    dest_block_par.mode = ParMode.CONSTANT
-                                                    dest_block_par.val = par_value
-                                        except Exception as e:
-                                            # Silently handle parameter restoration errors
-                                            pass
-                    else:
-                        # Regular parameter handling (existing code)
-                        if isinstance(value, dict):
-                            if value.get('mode') == 'expr':
-                                dest_par.mode = ParMode.EXPRESSION
-                                dest_par.expr = value.get('expr', '')
-                            elif value.get('mode') == 'bind':
-                                dest_par.mode = ParMode.BIND
-                                dest_par.bindExpr = value.get('expr', '')
-                        else:
-                            dest_par.mode = ParMode.CONSTANT
-                            dest_par.val = value
-                
-                regenerated.append(new_comp)
-            except Exception as e:
-                errors.append(f"Error regenerating from stub {stub.path}: {e}")
-        
-        # Second pass - restore connections
-        for stub in stubs:
-            try:
-                new_comp = op(f"{stub.parent().path}/{stub.name.removesuffix('_stub')}")
-                if not new_comp:
-                    continue
-                    
-                # Restore input connections 
-                stored_inputs = stub.fetch('inputs')
-                if stored_inputs:
-                    for i, input_op in enumerate(stored_inputs):
-                        if i < len(new_comp.inputConnectors) and input_op:
-                            new_comp.inputConnectors[i].connect(input_op)
-                
-                # Restore output connections
-                stored_outputs = stub.fetch('outputs')
-                if stored_outputs:
-                    for o_idx, connections in enumerate(stored_outputs):
-                        if o_idx < len(new_comp.outputConnectors):
-                            for con in connections:
-                                if con[0].op() and con[1] < len(con[0].inputConnectors):
-                                    new_comp.outputConnectors[o_idx].connect(con[0].inputConnectors[con[1]])
-                
-                # Restore cooking and bypass state
-                new_comp.allowCooking = stub.fetch('cooking', 1)
-                new_comp.bypass = stub.fetch('bypass')
-                
-                # Remove the stub
-                stub.destroy()
-            except Exception as e:
-                errors.append(f"Error restoring connections for {stub.path}: {e}")
-        
-        ui.undo.endBlock()
+
+        result = self.replace_stubs(stubs)
+        regenerated = result.items
+        errors = result.errors
         
         # Show completion message with any errors
         completion_message = f"Successfully regenerated {len(regenerated)} {self.family_name} component(s) from stubs."
@@ -913,6 +2111,259 @@ Do you want to continue?
         # print(f"Replacestubs: Completed with {len(regenerated)} regenerated components.")
         return
 
+    def replace_stubs(self, stubs, undo_mode=None):
+        """
+        Rebuilds full components from a list of stubs, restoring their
+        parameters and connections, then destroys the stubs.
+
+        Args:
+            stubs (list): The stub components to regenerate.
+            undo_mode (str, optional): Overrides the Undomode parameter.
+        Returns:
+            BatchResult: 'regenerated' count, new components in items, per-op timings.
+        """
+        result = BatchResult('Replacestubs')
+        operators_folder = self.ownerComp.op('custom_operators')
+        if not operators_folder:
+            result.errors.append("'custom_operators' folder not found in the installer component.")
+            return result.finish()
+
+        regenerated = result.items
+        rebuilt = []
+        edges = set()
+        path_map = {}
+        errors = result.errors
+        
+        with self.perf.phase('Replacestubs'), \
+                self.batch_undo(f'Regenerate {self.family_name} from Stubs', mode=undo_mode) as undo:
+            # First pass - create the components and set their parameters
+            for stub in stubs:
+                start = time.perf_counter()
+                try:
+                    # Get the operator type - first try from stored value, then from tag
+                    op_type = stub.fetch('op_type', None)
+                    if not op_type:
+                        # Extract from tag as fallback
+                        tag = self.getElement(stub.tags)
+                        if not tag or not tag.endswith(f"{self.family_name}stub"):
+                            errors.append(f"Invalid tag format on {stub.path}: {tag}")
+                            continue
+                        op_type = tag.removesuffix(f"{self.family_name}stub")
+                
+                    # print(f"Replacestubs: Using operator type '{op_type}' for {stub.path}")
+                
+                    # Find the master component to copy
+                    with self.perf.phase('match', stub.path):
+                        master_op = self.get_master(op_type)
+                    if not master_op:
+                        self.log.Error("Replacestubs: No master component found for type '%s'", op_type)
+                        errors.append(f"No master component found for type {op_type}")
+                        continue
+                
+                    # print(f"Replacestubs: Found master component: {master_op.path}")
+                
+                    # Create the new component
+                    with self.perf.phase('copy', stub.path):
+                        new_comp = stub.parent().copy(master_op)
+                    # Cooking stays suspended until the whole set is rebuilt and wired
+                    new_comp.allowCooking = False
+                    new_comp.nodeX = stub.nodeX
+                    new_comp.nodeY = stub.nodeY
+                    new_comp.nodeWidth = stub.nodeWidth
+                    new_comp.nodeHeight = stub.nodeHeight
+                    new_comp.name = stub.name.removesuffix('_stub')
+                
+                    # Restore parameters from stub
+                    with self.perf.phase('param restore', new_comp.path):
+                        params = stub.fetch('params', {})
+                        for name, value in params.items():
+                            dest_pars = new_comp.pars(name)
+                            if not dest_pars:
+                                continue
+
+                            dest_par = dest_pars[0]
+
+                            # Check if this is a sequence parameter
+                            if isinstance(value, dict) and value.get('type') == 'sequence':
+                                # Only proceed if the destination has a sequence
+                                if hasattr(dest_par, 'sequence') and dest_par.sequence:
+                                    self.restore_sequence_data(new_comp, dest_par.sequence, value.get('data', {}))
+                            else:
+                                self.data_to_par(dest_par, value)
+                
+                    if stub.fetch('clonelinked', None, search=False):
+                        self.link_to_master(new_comp, master_op)
+
+                    regenerated.append(new_comp)
+                    rebuilt.append((stub, new_comp))
+                    original_path = f"{stub.parent().path}/{stub.name.removesuffix('_stub')}"
+                    path_map[original_path] = new_comp.path
+                    # Neighbours stubbed after a frozen stub captured its path instead
+                    path_map[stub.path] = new_comp.path
+                    edges.update(self.stub_edges(stub, original_path))
+                    result.time_op(original_path, start)
+                except Exception as e:
+                    errors.append(f"Error regenerating from stub {stub.path}: {e}")
+        
+            # Second pass - restore every connection of the rebuilt set at once
+            with self.perf.phase('reconnect'):
+                failed_edges = self.rewire_connections(edges, path_map)
+            if failed_edges:
+                errors.append(f"{failed_edges} connection(s) could not be restored")
+
+            cooking = {}
+            for stub, new_comp in rebuilt:
+                try:
+                    # Restore bypass state, cooking is restored once every stub is gone
+                    cooking[new_comp.path] = stub.fetch('cooking', 1)
+                    new_comp.bypass = stub.fetch('bypass')
+                
+                    # Remove the stub
+                    stub_path = stub.path
+                    with self.perf.phase('destroy', stub_path):
+                        stub.destroy()
+                    undo.step('rehydrate', stub_path, new_comp.path)
+                except Exception as e:
+                    errors.append(f"Error finalizing {stub.path}: {e}")
+
+            with self.perf.phase('activate'):
+                self.activate_cooking(cooking, edges, path_map)
+
+        result.count('regenerated', len(regenerated))
+        return result.finish()
+
+    def capture_connections(self, comps):
+        """
+        Snapshots the wiring of a set of components as path based edges.
+
+        Args:
+            comps (list): The components whose inputs and outputs are captured.
+        Returns:
+            list: Unique (source_path, output_index, dest_path, input_index) tuples.
+        """
+        edges = []
+        seen = set()
+        for comp in comps:
+            comp_path = comp.path
+            for in_conn in comp.inputConnectors:
+                for source in in_conn.connections:
+                    edge = (source.owner.path, source.index, comp_path, in_conn.index)
+                    if edge not in seen:
+                        seen.add(edge)
+                        edges.append(edge)
+            for out_conn in comp.outputConnectors:
+                for dest in out_conn.connections:
+                    edge = (comp_path, out_conn.index, dest.owner.path, dest.index)
+                    if edge not in seen:
+                        seen.add(edge)
+                        edges.append(edge)
+        return edges
+
+    def stub_edges(self, stub, comp_path):
+        """
+        Returns the edges stored on a stub, converting the OP references
+        written by older stubs into path based edges for comp_path.
+        """
+        edges = stub.fetch('edges', None, search=False)
+        if edges is not None:
+            return [tuple(edge) for edge in edges]
+
+        edges = []
+        for i, input_op in enumerate(stub.fetch('inputs', None, search=False) or []):
+            if input_op and input_op.valid:
+                edges.append((input_op.path, 0, comp_path, i))
+        for o_idx, connections in enumerate(stub.fetch('outputs', None, search=False) or []):
+            for owner, index in connections:
+                if owner and owner.valid:
+                    edges.append((comp_path, o_idx, owner.path, index))
+        return edges
+
+    def rewire_connections(self, edges, path_map=None):
+        """
+        Restores edges captured by capture_connections in a single pass.
+        Each path is resolved once, however many edges reference it.
+
+        Args:
+            edges (iterable): (source_path, output_index, dest_path, input_index) tuples.
+            path_map (dict, optional): Maps captured paths to the paths to connect instead.
+        Returns:
+            int: The number of edges that could not be restored.
+        """
+        path_map = path_map or {}
+        resolved = {}
+
+        def resolve(path):
+            path = path_map.get(path, path)
+            if path not in resolved:
+                resolved[path] = op(path)
+            return resolved[path]
+
+        failed = 0
+        for source_path, out_index, dest_path, in_index in edges:
+            source = resolve(source_path)
+            dest = resolve(dest_path)
+            if (not source or not dest or out_index >= len(source.outputConnectors)
+                    or in_index >= len(dest.inputConnectors)):
+                failed += 1
+                continue
+            try:
+                source.outputConnectors[out_index].connect(dest.inputConnectors[in_index])
+            except Exception:
+                failed += 1
+        return failed
+
+    def activation_order(self, paths, edges, path_map=None):
+        """
+        Orders component paths so each one comes after the components of the
+        set feeding it (Kahn's algorithm over the captured edges). Components
+        caught in a feedback loop keep their original order at the end.
+
+        Args:
+            paths (list): The component paths to order.
+            edges (iterable): (source_path, output_index, dest_path, input_index) tuples.
+            path_map (dict, optional): Maps captured paths to the current ones.
+        """
+        path_map = path_map or {}
+        indegree = dict.fromkeys(paths, 0)
+        downstream = {path: [] for path in paths}
+        for source_path, _, dest_path, _ in edges:
+            source = path_map.get(source_path, source_path)
+            dest = path_map.get(dest_path, dest_path)
+            if source != dest and source in indegree and dest in indegree:
+                downstream[source].append(dest)
+                indegree[dest] += 1
+
+        ready = deque(path for path in paths if indegree[path] == 0)
+        order = []
+        while ready:
+            path = ready.popleft()
+            order.append(path)
+            for dest in downstream[path]:
+                indegree[dest] -= 1
+                if indegree[dest] == 0:
+                    ready.append(dest)
+
+        if len(order) < len(paths):
+            placed = set(order)
+            order.extend(path for path in paths if path not in placed)
+        return order
+
+    def activate_cooking(self, cooking, edges, path_map=None):
+        """
+        Restores allowCooking on components rebuilt with cooking suspended,
+        upstream first, so each rebuilt subgraph cooks once instead of after
+        every copy, parameter write and connection.
+
+        Args:
+            cooking (dict): Maps component paths to the allowCooking state to restore.
+            edges (iterable): The captured edges of the rebuilt set.
+            path_map (dict, optional): Maps captured paths to the current ones.
+        """
+        for path in self.activation_order(list(cooking), edges, path_map):
+            comp = op(path)
+            if comp:
+                comp.allowCooking = cooking[path]
+
     def copyPar(self, destPar, sourcePar):
         """
         Copies parameter values and settings from one parameter to another,
@@ -929,42 +2380,118 @@ Do you want to continue?
             
             # First set the number of blocks
             if seq_dest.numBlocks != seq_source.numBlocks:
-                # print(f"Copying sequence: {sourcePar.name} - setting numBlocks from {seq_dest.numBlocks} to {seq_source.numBlocks}")
                 seq_dest.numBlocks = seq_source.numBlocks
             
-            # Copy each block individually using direct parameter access by name
-            # Rather than trying to iterate over the parameters
+            # Copy each block using the enumerated block layout of the source
+            layout = self.get_sequence_schema(sourcePar.owner, seq_source)
             for i in range(min(seq_source.numBlocks, seq_dest.numBlocks)):
-                try:
-                    # Instead of trying to iterate over parameters, use a direct approach
-                    # by trying common parameter names found in sequences
-                    common_par_names = ['name', 'label', 'value', 'index', 'enable', 'display', 
-                                       'top', 'dat', 'text', 'op', 'ops', 'mode', 'active',
-                                       'parameters', 'pages', 'info', 'shortcut']
-                    
-                    source_block = seq_source.blocks[i]
-                    dest_block = seq_dest.blocks[i]
-                    
-                    # Try each parameter name directly
-                    for name in common_par_names:
-                        try:
-                            if hasattr(source_block.par, name) and hasattr(dest_block.par, name):
-                                self.copySimplePar(dest_block.par[name], source_block.par[name])
-                        except Exception as e:
-                            # Silently continue if a particular parameter access fails
-                            pass
-                        
-                except Exception as e:
-                    if hasattr(op,'Logger'):
-                        op.Logger.Error(f"Error processing sequence block {i} of parameter {sourcePar.name}: {e}")
-                    else:
-                        print(f"Error processing sequence block {i} of parameter {sourcePar.name}: {e}")
+                source_block = seq_source.blocks[i].par
+                dest_block = seq_dest.blocks[i].par
+                for name in layout:
+                    source = getattr(source_block, name, None)
+                    dest = getattr(dest_block, name, None)
+                    if source is None or dest is None:
+                        continue
+                    try:
+                        self.copySimplePar(dest, source)
+                    except Exception as e:
+                        self.log.Error("Error copying %s in sequence block %s of parameter %s: %s", name, i, sourcePar.name, e)
 
             return  # We've handled the sequence parameter, no need to continue
         
         # Handle regular parameters
         self.copySimplePar(destPar, sourcePar)
 
+    def get_sequence_schema(self, owner, seq):
+        """
+        Returns the base names of the parameters making up one block of a sequence.
+
+        The layout is read from the first block's parameters on the owner once
+        per (sequence name, owner type tag, owner version) and batch; owners
+        without a type tag are cached by path.
+
+        Args:
+            owner (OP): The operator holding the sequence.
+            seq (Sequence): The sequence to describe.
+        Returns:
+            tuple: Block parameter base names, in parameter order.
+        """
+        if not seq.numBlocks:
+            return ()
+        key = (seq.name, self.type_tag(owner) or owner.path,
+               owner.par.Version.eval() if hasattr(owner.par, 'Version') else None)
+        layout = self._sequence_schemas.get(key)
+        if layout is not None:
+            return layout
+        prefix = f"{seq.name}{seq.blocks[0].index}"
+        layout = []
+        for p in owner.pars(f"{prefix}*"):
+            base = p.name[len(prefix):]
+            # Skip later blocks sharing the prefix (ext1* also matches ext10*)
+            if not base or base[0].isdigit():
+                continue
+            if hasattr(p, 'sequence') and p.sequence and p.sequence.name == seq.name:
+                layout.append(base)
+        layout = self._sequence_schemas[key] = tuple(layout)
+        return layout
+
+    def par_to_data(self, par):
+        """Serializes a parameter's mode and value for storage on a stub."""
+        if par.mode == ParMode.CONSTANT:
+            return par.val
+        elif par.mode == ParMode.EXPRESSION:
+            return {'mode': 'expr', 'expr': par.expr}
+        elif par.mode == ParMode.BIND:
+            return {'mode': 'bind', 'expr': par.bindExpr}
+        return None
+
+    def data_to_par(self, par, value):
+        """Restores a parameter from a value produced by par_to_data."""
+        if isinstance(value, dict):
+            if value.get('mode') == 'expr':
+                par.mode = ParMode.EXPRESSION
+                par.expr = value.get('expr', '')
+            elif value.get('mode') == 'bind':
+                par.mode = ParMode.BIND
+                par.bindExpr = value.get('expr', '')
+        elif value is not None:
+            par.mode = ParMode.CONSTANT
+            par.val = value
+
+    def sequence_to_data(self, owner, seq):
+        """
+        Serializes every block of a sequence, keyed by block parameter base name.
+        """
+        layout = self.get_sequence_schema(owner, seq)
+        blocks = []
+        for block in seq.blocks:
+            block_par = block.par
+            block_data = {}
+            for name in layout:
+                par = getattr(block_par, name, None)
+                if par is not None:
+                    block_data[name] = self.par_to_data(par)
+            blocks.append(block_data)
+        return {'name': seq.name, 'numBlocks': seq.numBlocks, 'blocks': blocks}
+
+    def restore_sequence_data(self, owner, seq, seq_data):
+        """
+        Restores a sequence from data produced by sequence_to_data.
+        """
+        num_blocks = seq_data.get('numBlocks', 0)
+        if seq.numBlocks != num_blocks:
+            seq.numBlocks = num_blocks
+        for block, block_data in zip(seq.blocks, seq_data.get('blocks', [])):
+            block_par = block.par
+            for name, value in block_data.items():
+                par = getattr(block_par, name, None)
+                if par is None:
+                    continue
+                try:
+                    self.data_to_par(par, value)
+                except Exception as e:
+                    self.log.Error("Error restoring %s in sequence %s: %s", name, seq.name, e)
+
     def copySimplePar(self, destPar, sourcePar):
         """Helper function to copy a simple (non-sequence) parameter."""
         destPar.mode = sourcePar.mode
@@ -976,6 +2503,396 @@ Do you want to continue?
         elif sourcePar.mode == ParMode.BIND:
             destPar.bindExpr = sourcePar.bindExpr
 
+    def link_to_master(self, comp, master):
+        """
+        Links a placed component to its master in custom_operators through
+        TouchDesigner cloning. Its network then follows the master and only
+        its parameter values stay local, so updates need no copy.
+
+        Args:
+            comp (COMP): The placed family component.
+            master (COMP): Its master in custom_operators.
+        """
+        comp.par.clone.mode = ParMode.EXPRESSION
+        comp.par.clone.expr = f"op.{self.family_name}.op('custom_operators/{master.name}')"
+        # Clones follow the master network, the library must never unload it
+        master.store('clonepinned', True)
+        comp.par.enablecloning = True
+        comp.store('clonelinked', master.name)
+        comp.par.enablecloningpulse.pulse()
+
+    def clone_master(self, comp):
+        """
+        Returns the master a component is clone linked to, or None if it is
+        an independent copy.
+        """
+        if not comp.fetch('clonelinked', None, search=False):
+            return None
+        if not hasattr(comp.par, 'enablecloning') or not comp.par.enablecloning.eval():
+            return None
+        master = comp.par.clone.eval()
+        if isinstance(master, str):
+            master = op(master) if master else None
+        return master if master and master.parent() == self.ownerComp.op('custom_operators') else None
+
+    def library_masters(self):
+        """Returns the master components of custom_operators, without the annotates."""
+        operators_folder = self.ownerComp.op('custom_operators')
+        if not operators_folder:
+            return []
+        return [o for o in operators_folder.findChildren(type=COMP, maxDepth=1) if o.OPType != 'annotateCOMP']
+
+    def master_catalog(self):
+        """Returns the master_catalog Table DAT (name, file, version), creating it if needed."""
+        table = self.ownerComp.op('master_catalog')
+        if table is None:
+            table = self.ownerComp.create(tableDAT, 'master_catalog')
+            table.appendRow(['name', 'file', 'version'])
+        return table
+
+    def is_lazy(self, master):
+        """Returns True if a master is an unloaded placeholder of the library."""
+        return bool(master.fetch('lazy_master', None, search=False))
+
+    def Externalizemasters(self):
+        """
+        Saves every master of custom_operators as a .tox in the Libraryfolder,
+        records it in master_catalog and unloads it, leaving a placeholder
+        with the master's name, tags and parameters. Placeholders keep the
+        annotates and the menu working and are loaded back by load_master
+        the first time they are needed.
+
+        Masters with clone linked instances are saved but stay loaded. Saving
+        ends the editing of masters loaded by Loadmasters.
+        """
+        folder = self.batch_setting('Libraryfolder', '') or 'masters'
+        catalog = self.master_catalog()
+        catalog.clear()
+        catalog.appendRow(['name', 'file', 'version'])
+        saved = 0
+        with self.perf.phase('Externalizemasters'):
+            for master in self.library_masters():
+                version = master.par.Version.eval() if hasattr(master.par, 'Version') else ''
+                if self.is_lazy(master):
+                    catalog.appendRow([master.name, master.fetch('lazy_master'), version])
+                    continue
+                path = f"{folder}/{master.name}.tox"
+                # Load state is not part of the saved master
+                master.unstore('editing', 'loaded_fingerprint')
+                try:
+                    with self.perf.phase('save', master.path):
+                        master.save(path, createFolders=True)
+                except Exception as e:
+                    self.log.Error("Externalizemasters: Could not save %s to %s: %s", master.path, path, e)
+                    continue
+                catalog.appendRow([master.name, path, version])
+                saved += 1
+                if not master.fetch('clonepinned', False, search=False):
+                    self.unload_master(master, path)
+        self.log.Info("Externalizemasters: Saved %s %s masters to %s", saved, self.family_name, folder)
+
+    def Loadmasters(self):
+        """
+        Loads every library master back into custom_operators for editing.
+        They stay loaded, whatever Unloadidle is, until Externalizemasters
+        saves them again.
+        """
+        for master in self.library_masters():
+            self.load_master(master, editing=True)
+
+    def get_master(self, name):
+        """
+        Returns the master called name in custom_operators, loaded from the
+        library if it is a placeholder, or None if there is no such master or
+        it could not be loaded.
+        """
+        master = self.indexed_master(name)
+        if master is None:
+            return None
+        master = self.load_master(master)
+        return None if self.is_lazy(master) else master
+
+    def load_master(self, master, editing=False):
+        """
+        Makes sure a master is loaded and marks it as used. A placeholder is
+        replaced by the master loaded from its .tox, at the same position so
+        it stays in its annotate, and remembers its master_fingerprint.
+
+        Args:
+            master (COMP): The master or its placeholder.
+            editing (bool): Pin the master so unload_idle_masters leaves it loaded.
+        Returns:
+            COMP: The loaded master, the placeholder itself if loading failed.
+        """
+        path = master.fetch('lazy_master', None, search=False)
+        if path:
+            name = master.name
+            try:
+                with self.perf.phase('load master', master.path):
+                    loaded = master.parent().loadTox(path)
+            except Exception as e:
+                self.log.Error("load_master: Could not load %s from %s: %s", name, path, e)
+                return master
+            loaded.nodeX = master.nodeX
+            loaded.nodeY = master.nodeY
+            loaded.nodeWidth = master.nodeWidth
+            loaded.nodeHeight = master.nodeHeight
+            master.destroy()
+            loaded.name = name
+            master = loaded
+            master.store('loaded_fingerprint', self.master_fingerprint(master))
+            self.library_changed()
+            self.log.Debug("load_master: Loaded %s from %s", name, path)
+
+        if editing:
+            master.store('editing', True)
+            self._loaded_masters.pop(master.name, None)
+        elif not master.fetch('editing', False, search=False):
+            self._loaded_masters[master.name] = time.monotonic()
+            self.schedule_idle_check()
+        return master
+
+    def master_fingerprint(self, master):
+        """
+        Returns a checksum of a master's parameters and the names and types
+        of its operators, used by unload_master to tell whether it changed
+        since it was loaded. Parameter edits inside its children don't show.
+        """
+        operators = sorted((o.path.removeprefix(master.path), o.OPType) for o in master.findChildren())
+        return zlib.crc32(repr((operators, self.capture_params(master))).encode())
+
+    def unload_master(self, master, path):
+        """
+        Strips a master down to a placeholder that load_master reloads from
+        path. A master changed since load_master loaded it is saved back to
+        path first, and stays loaded if that fails.
+
+        Returns:
+            bool: True if the master was unloaded.
+        """
+        fingerprint = master.fetch('loaded_fingerprint', None, search=False)
+        if fingerprint is not None and fingerprint != self.master_fingerprint(master):
+            master.unstore('editing', 'loaded_fingerprint')
+            try:
+                with self.perf.phase('save', master.path):
+                    master.save(path, createFolders=True)
+            except Exception as e:
+                master.store('loaded_fingerprint', fingerprint)
+                self.log.Error("unload_master: %s changed but could not be saved to %s, keeping it loaded: %s",
+                               master.path, path, e)
+                return False
+            self.log.Info("unload_master: Saved the changes to %s to %s", master.path, path)
+        master.unstore('editing', 'loaded_fingerprint')
+        with self.perf.phase('unload master', master.path):
+            children = master.findChildren(depth=1)
+            while children:
+                if children[-1]:
+                    children[-1].destroy()
+                else:
+                    children = children[:-1]
+        master.store('lazy_master', path)
+        self._loaded_masters.pop(master.name, None)
+        self.library_changed()
+        return True
+
+    def schedule_idle_check(self):
+        """Runs unload_idle_masters once the Unloadidle time has passed."""
+        idle = self.batch_setting('Unloadidle', 300.0)
+        if self._idle_check_pending or idle <= 0:
+            return
+        self._idle_check_pending = True
+        run("args[0].unload_idle_masters()", self, delayMilliSeconds=int(idle * 1000), delayRef=op.TDResources)
+
+    def unload_idle_masters(self):
+        """
+        Unloads the library masters not used for Unloadidle seconds. Masters
+        without a catalog entry, with clone linked instances or loaded for
+        editing stay loaded.
+        """
+        self._idle_check_pending = False
+        idle = self.batch_setting('Unloadidle', 300.0)
+        if idle <= 0:
+            return
+        catalog = self.master_catalog()
+        operators_folder = self.ownerComp.op('custom_operators')
+        now = time.monotonic()
+        for name, used in list(self._loaded_masters.items()):
+            if now - used < idle:
+                continue
+            master = operators_folder.op(name) if operators_folder else None
+            cell = catalog[name, 'file']
+            if (master is None or cell is None or master.fetch('clonepinned', False, search=False)
+                    or master.fetch('editing', False, search=False)):
+                self._loaded_masters.pop(name, None)
+                continue
+            if self.unload_master(master, cell.val):
+                self.log.Debug("unload_idle_masters: Unloaded %s", name)
+            else:
+                self._loaded_masters.pop(name, None)
+        if self._loaded_masters:
+            self.schedule_idle_check()
+
+    def search_entries(self):
+        """
+        Returns (name, category, keywords) for every master: the category
+        title comes from the group_mapping table, the keywords from
+        'keyword=<word>' tags on the master.
+        """
+        categories = {}
+        mapping = self.ownerComp.op('group_mapping')
+        if mapping is not None and mapping.numRows:
+            for col in range(mapping.numCols):
+                title = mapping[0, col].val
+                for row in range(1, mapping.numRows):
+                    name = mapping[row, col].val
+                    if name:
+                        categories[name] = title
+        return [(master.name, categories.get(master.name, ''),
+                 sorted(tag.removeprefix('keyword=') for tag in master.tags if tag.startswith('keyword=')))
+                for master in self.library_masters()]
+
+    def search_index(self):
+        """Returns the FamilySearchIndex of the library, rebuilt after library_changed."""
+        if self._search_index is None:
+            entries = self.search_entries()
+            with self.perf.phase('search index'):
+                self._search_index = FamilySearchIndex(entries)
+            self.log.Debug("search_index: Indexed %s %s masters", len(entries), self.family_name)
+        return self._search_index
+
+    def library_changed(self):
+        """
+        Drops the search index and master index, rebuilt on their next use.
+        Called when Install runs and when masters are tagged, loaded or unloaded.
+        """
+        self._search_index = None
+        self._master_index = None
+
+    def Search(self, query, limit=10):
+        """
+        Returns up to limit master names of this family matching query,
+        best first. Matches word prefixes of names, category titles and
+        keyword tags, and tolerates typos through trigrams.
+        """
+        return self.search_index().search(query, limit, boost=self.usage_boost)
+
+    def usage_stats(self):
+        """
+        Returns the placement statistics kept in the installer's storage,
+        {type: [count, last placed (seconds since epoch)]}, saved with the project.
+        """
+        return self.ownerComp.fetch('usage_stats', {}, search=False)
+
+    def record_usage(self, op_type, count=1):
+        """Counts count placements of op_type. The usage_stats table follows at the end of the frame."""
+        stats = self.usage_stats()
+        entry = stats.setdefault(op_type, [0, 0.0])
+        entry[0] += count
+        entry[1] = time.time()
+        self.ownerComp.store('usage_stats', stats)
+        if not self._usage_table_pending:
+            self._usage_table_pending = True
+            run("args[0].write_usage_table()", self, endFrame=True, delayRef=op.TDResources)
+
+    def most_used(self, count=None):
+        """Returns the operator types placed so far, most placed (then most recent) first."""
+        stats = self.usage_stats()
+        ranked = sorted(stats, key=lambda t: (-stats[t][0], -stats[t][1]))
+        return ranked if count is None else ranked[:count]
+
+    def usage_boost(self, op_type):
+        """Search score bonus of a type, growing with the log of its placement count."""
+        entry = self.usage_stats().get(op_type)
+        return 2.0 * math.log1p(entry[0]) if entry else 0.0
+
+    def write_usage_table(self):
+        """Writes the usage_stats Table DAT (type, count, last_placed) inside the installer."""
+        self._usage_table_pending = False
+        table = self.ownerComp.op('usage_stats')
+        if table is None:
+            table = self.ownerComp.create(tableDAT, 'usage_stats')
+        table.clear()
+        table.appendRow(['type', 'count', 'last_placed'])
+        stats = self.usage_stats()
+        for op_type in self.most_used():
+            count, last = stats[op_type]
+            table.appendRow([op_type, count, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last))])
+
+    def Prewarm(self, count=None):
+        """
+        Loads the masters of the most placed types from the library ahead
+        of their next placement.
+
+        Args:
+            count (int, optional): Number of types, defaults to the Prewarmcount parameter.
+        Returns:
+            list: The names of the masters loaded.
+        """
+        count = count or self.batch_setting('Prewarmcount', 10)
+        loaded = []
+        for op_type in self.most_used(count):
+            if self.get_master(op_type):
+                loaded.append(op_type)
+        self.log.Info("Prewarm: Loaded %s %s masters", len(loaded), self.family_name)
+        return loaded
+
+    def master_index(self, rebuild=False):
+        """
+        Returns (masters by name, masters by ext0object) for the library,
+        built in one pass and kept until a master is swapped in by
+        load_master or a batch starts. The ext0object lists hold every
+        master sharing that extension.
+        """
+        if self._master_index is None or rebuild:
+            by_name = {}
+            by_ext = {}
+            with self.perf.phase('master index'):
+                for master in self.library_masters():
+                    by_name.setdefault(master.name, master)
+                    ext_obj = master.par.ext0object.eval() if hasattr(master.par, 'ext0object') else ''
+                    if ext_obj:
+                        by_ext.setdefault(ext_obj, []).append(master)
+            self._master_index = (by_name, by_ext)
+        return self._master_index
+
+    def indexed_master(self, name):
+        """Returns the library master called name from master_index, or None."""
+        by_name, _ = self.master_index()
+        master = by_name.get(name)
+        if master is None or not master.valid:
+            # Masters may have been added, renamed or replaced since the index was built
+            by_name, _ = self.master_index(rebuild=True)
+            master = by_name.get(name)
+        return master
+
+    def ext_candidates(self, comp):
+        """Returns the library masters sharing the ext0object of comp."""
+        if not hasattr(comp.par, 'ext0object'):
+            return []
+        ext_obj = comp.par.ext0object.eval()
+        if not ext_obj:
+            return []
+        _, by_ext = self.master_index()
+        candidates = by_ext.get(ext_obj, [])
+        if not all(m.valid for m in candidates):
+            _, by_ext = self.master_index(rebuild=True)
+            candidates = by_ext.get(ext_obj, [])
+        return candidates
+
+    def pick_ext_master(self, comp, candidates):
+        """
+        Returns the one master among candidates comp was copied from, using
+        its name when several masters share the extension, or None if that
+        is still ambiguous.
+        """
+        if len(candidates) == 1:
+            return candidates[0]
+        named = [m for m in candidates if comp.name.startswith(m.name)]
+        if len(named) > 1:
+            stem = re.sub(r'_?\d+$', '', comp.name)
+            named = [m for m in named if m.name == stem]
+        return named[0] if len(named) == 1 else None
+
     def find_matching_master_op(self, comp, operators_folder):
         """
         Find a matching master operator for a component using multiple matching methods.
@@ -989,31 +2906,116 @@ Do you want to continue?
                    and match_method is a string describing how the match was made
         """
         # First try matching by type tag
-        comp_type = next((s for s in comp.tags if s.endswith(self.family_name) and len(s) > len(self.family_name)), None)
+        comp_type = self.type_tag(comp)
         if comp_type:
-            comp_type = comp_type.removesuffix(self.family_name)
-            master_ops = operators_folder.findChildren(name=comp_type, maxDepth=1)
-            if master_ops:
-                return (master_ops[0], "type_tag")
+            master_op = self.indexed_master(comp_type.removesuffix(self.family_name))
+            if master_op is not None:
+                return (master_op, "type_tag")
         
-        # If no match found by tag, try using ext0object
-        if hasattr(comp.par, 'ext0object'):
-            ext_obj = comp.par.ext0object.eval()
-            if ext_obj:
-                # Look for master operators with matching ext0object
-                for master_op in operators_folder.findChildren(type=COMP, maxDepth=1):
-                    if hasattr(master_op.par, 'ext0object') and master_op.par.ext0object.eval() == ext_obj:
-                        return (master_op, "ext0object")
+        # If no match found by tag, try the masters sharing its ext0object
+        candidates = self.ext_candidates(comp)
+        if candidates:
+            return (self.pick_ext_master(comp, candidates) or candidates[0], "ext0object")
         
         # No match found
         return (None, "none")
 
-    def update_comp(self, old_comp):
+    def par_state(self, par):
+        """Returns a comparable (mode, value) tuple describing a parameter's current setting."""
+        if par.mode == ParMode.CONSTANT:
+            return (ParMode.CONSTANT, par.val)
+        elif par.mode == ParMode.EXPRESSION:
+            return (ParMode.EXPRESSION, par.expr)
+        elif par.mode == ParMode.BIND:
+            return (ParMode.BIND, par.bindExpr)
+        return (par.mode, None)
+
+    def get_copy_plan(self, old_comp, master_comp):
+        """
+        Returns the parameter copy plan used to move values from an existing
+        instance onto a fresh copy of its master. Plans are cached per
+        (old instance version and parameter names, master) pair, since
+        instances of one version can still differ in their parameters.
+
+        Args:
+            old_comp (COMP): The instance being updated.
+            master_comp (COMP): The master the instance is rebuilt from.
+        Returns:
+            dict: The copy plan (see build_copy_plan).
+        """
+        old_version = old_comp.par.Version.eval() if hasattr(old_comp.par, 'Version') else ''
+        master_version = master_comp.par.Version.eval() if hasattr(master_comp.par, 'Version') else ''
+        old_names = frozenset(p.name for p in old_comp.pars())
+        key = (old_version, old_names, master_comp.path, master_version)
+        plan = self._copy_plans.get(key)
+        if plan is None:
+            plan = self.build_copy_plan(old_comp, master_comp)
+            self._copy_plans[key] = plan
+        return plan
+
+    def build_copy_plan(self, old_comp, master_comp):
+        """
+        Builds a parameter copy plan for an (old instance, master) pair.
+
+        The plan lists the simple parameters both sides share together with the
+        master's value for each, and the sequences to copy (once per sequence,
+        not once per block parameter). The ext sequence, Version and Copyright
+        always come from the master and are left out.
+
+        Returns:
+            dict: {'simple': [(name, master_state)], 'sequences': [(seq_name, par_name)]}
+        """
+        old_names = {p.name for p in old_comp.pars()}
+        simple = []
+        sequences = []
+        seen_sequences = set()
+
+        for p in master_comp.pars():
+            seq = p.sequence if hasattr(p, 'sequence') else None
+            if seq:
+                if seq.name != 'ext' and seq.name not in seen_sequences and p.name in old_names:
+                    seen_sequences.add(seq.name)
+                    sequences.append((seq.name, p.name))
+                continue
+            if p.name in ('Version', 'Copyright'):
+                continue
+            if p.name in old_names:
+                simple.append((p.name, self.par_state(p)))
+
+        return {'simple': simple, 'sequences': sequences}
+
+    def apply_copy_plan(self, plan, new_comp, old_comp):
+        """
+        Copies parameters from old_comp onto new_comp following a copy plan.
+        Simple parameters still set to the master's value are skipped since
+        new_comp is a fresh copy of the master and already holds them.
+        """
+        new_par = new_comp.par
+        old_par = old_comp.par
+        for name, master_state in plan['simple']:
+            source = getattr(old_par, name, None)
+            if source is None or self.par_state(source) == master_state:
+                continue
+            dest = getattr(new_par, name, None)
+            if dest is not None:
+                self.copySimplePar(dest, source)
+
+        for seq_name, par_name in plan['sequences']:
+            source = getattr(old_par, par_name, None)
+            dest = getattr(new_par, par_name, None)
+            if source is not None and dest is not None:
+                self.copyPar(dest, source)
+
+    def update_comp(self, old_comp, rewire=True, deferred=None):
         """
         Updates a single component to the newest version.
         
         Args:
             old_comp (COMP): The component to update.
+            rewire (bool): Restore the component's connections. Batch callers
+                pass False and rewire the whole set once with rewire_connections.
+            deferred (dict, optional): Leave cooking off on the new component and
+                record its allowCooking state here by path, for activate_cooking.
         Returns:
             tuple: (success, message) indicating if update was successful and status message
         """
@@ -1021,14 +3023,24 @@ Do you want to continue?
         if not operators_folder:
             return (False, f"Error: 'custom_operators' folder not found in the installer component.")
 
-        master_comp, match_method = self.find_matching_master_op(old_comp, operators_folder)
+        # Clone linked components follow their master, they only need a resync
+        linked_master = self.clone_master(old_comp)
+        if linked_master:
+            old_comp.par.enablecloningpulse.pulse()
+            return (True, f"Refreshed {old_comp.path} from {linked_master.path} (matched via clone)")
+
+        with self.perf.phase('match', old_comp.path):
+            master_comp, match_method = self.find_matching_master_op(old_comp, operators_folder)
         if not master_comp:
             return (False, f"Couldn't update {old_comp.path}, no matching master component found.")
+        master_comp = self.load_master(master_comp)
 
         try:
             # print(f"Updating {old_comp.path} using match method: {match_method}")
 
-            new_comp = old_comp.parent().copy(master_comp)
+            comp_path = old_comp.path
+            with self.perf.phase('copy', comp_path):
+                new_comp = old_comp.parent().copy(master_comp)
             old_name = old_comp.name
 
             # Preserve attributes
@@ -1036,51 +3048,613 @@ Do you want to continue?
             new_comp.nodeY = old_comp.nodeY
             new_comp.nodeWidth = old_comp.nodeWidth
             new_comp.nodeHeight = old_comp.nodeHeight
-            new_comp.allowCooking = old_comp.allowCooking
+            cooking = self.governor.release(old_comp)
+            new_comp.allowCooking = False if deferred is not None else cooking
             new_comp.bypass = old_comp.bypass
             new_comp.activeViewer = old_comp.activeViewer
             new_comp.viewer = old_comp.viewer
 
-            # Copy parameters, avoiding certain ones
-            for p in new_comp.pars():
-                if p.name in ('Version', 'Copyright') or (hasattr(p, 'sequence') and p.sequence and p.sequence.name == 'ext'):
-                    continue
-                old_pars = old_comp.pars(p.name)
-                if old_pars:
-                    self.copyPar(p, old_pars[0])
-
-            # Restore connections
-            for i in range(min(len(new_comp.inputConnectors), len(old_comp.inputConnectors))):
-                old_in = old_comp.inputConnectors[i]
-                if old_in.connections:
-                    new_comp.inputConnectors[i].connect(old_in.connections[0])
-
-            for o in range(min(len(new_comp.outputConnectors), len(old_comp.outputConnectors))):
-                old_out = old_comp.outputConnectors[o]
-                for conn in old_out.connections:
-                    new_comp.outputConnectors[o].connect(conn)
-
-            old_comp.destroy()
+            # Copy parameters using the cached plan for this version pair
+            with self.perf.phase('param restore', comp_path):
+                plan = self.get_copy_plan(old_comp, master_comp)
+                self.apply_copy_plan(plan, new_comp, old_comp)
+
+            edges = self.capture_connections([old_comp]) if rewire else None
+
+            with self.perf.phase('destroy', comp_path):
+                old_comp.destroy()
             new_comp.name = old_name
+            if deferred is not None:
+                deferred[new_comp.path] = cooking
+            if edges:
+                with self.perf.phase('reconnect', comp_path):
+                    self.rewire_connections(edges)
 
             return (True, f"Successfully updated {new_comp.path} (matched via {match_method})")
 
         except Exception as e:
             return (False, f"Error updating {old_comp.path}: {e}")
 
+    def update_comps(self, comps, undo_mode=None):
+        """
+        Updates a list of family components to the newest version of their masters.
+
+        Args:
+            comps (list): The family components to update.
+            undo_mode (str, optional): Overrides the Undomode parameter.
+        Returns:
+            BatchResult: 'updated' count plus 'type_tag'/'ext0object'/'clone' match counts,
+                updated paths in items, unmatched paths in skipped.
+        """
+        # Masters may have been edited since the last run
+        self._copy_plans = {}
+        self._sequence_schemas = {}
+        self._master_index = None
+
+        result = BatchResult('Updateall')
+        result.counts.update({"updated": 0, "type_tag": 0, "ext0object": 0, "clone": 0})
+
+        with self.perf.phase('Updateall'), \
+                self.batch_undo(f'Update {self.family_name} operators', mode=undo_mode) as undo:
+            # Snapshot the wiring of the whole set, rebuild, then rewire once.
+            # Clone linked components stay in place, their edges are captured
+            # from the rebuilt neighbours.
+            with self.perf.phase('capture'):
+                edges = self.capture_connections([c for c in comps if not self.clone_master(c)])
+
+            # Rebuilt components cook once the whole set is rewired
+            cooking = {}
+            for op_comp in comps:
+                comp_path = op_comp.path
+                old_version = op_comp.par.Version.eval() if hasattr(op_comp.par, 'Version') else ''
+                start = time.perf_counter()
+                try:
+                    success, message = self.update_comp(op_comp, rewire=False, deferred=cooking)
+
+                    if success:
+                        result.items.append(comp_path)
+                        result.count('updated')
+                        undo.step('update', comp_path, old_version)
+                        if "matched via type_tag" in message:
+                            result.count('type_tag')
+                        elif "matched via ext0object" in message:
+                            result.count('ext0object')
+                        elif "matched via clone" in message:
+                            result.count('clone')
+                    else:
+                        if "no matching master component found" in message:
+                            result.skipped.append(comp_path)
+                        else:
+                            result.errors.append(message)
+                except Exception as e:
+                    error_msg = f"Error updating {comp_path}: {e}"
+                    self.log.Error(error_msg)
+                    result.errors.append(error_msg)
+                result.time_op(comp_path, start)
+
+            with self.perf.phase('reconnect'):
+                failed_edges = self.rewire_connections(edges)
+            if failed_edges:
+                result.errors.append(f"{failed_edges} connection(s) could not be restored")
+
+            with self.perf.phase('activate'):
+                self.activate_cooking(cooking, edges)
+
+        result.count('skipped', len(result.skipped))
+        return result.finish()
+
+    def place_spec(self, spec):
+        """
+        Normalizes a PlaceOps spec, a dict or a (type, parent, name, position,
+        params, connections) tuple of which the trailing items may be left out,
+        into a dict with all six keys.
+        """
+        keys = ('type', 'parent', 'name', 'position', 'params', 'connections')
+        if not isinstance(spec, dict):
+            spec = dict(zip(keys, spec))
+        spec = {key: spec.get(key) for key in keys}
+        if isinstance(spec['parent'], str):
+            spec['parent'] = op(spec['parent'])
+        spec['params'] = spec['params'] or {}
+        spec['connections'] = spec['connections'] or []
+        return spec
+
+    def PlaceOps(self, specs, undo_mode=None):
+        """
+        Places many family operators from a script in one batch. Masters are
+        resolved (and loaded from the library) once per type, every operator
+        is created with cooking off and its parameters set, all connections
+        are made in one pass, then cooking is switched on upstream first.
+        The placements are counted in the usage stats like menu placements.
+
+        Args:
+            specs (list): One dict or tuple per operator, see place_spec:
+                type (str): The master name.
+                parent (COMP or str): Where to place it.
+                name (str, optional): Defaults to the type followed by 1.
+                position (tuple, optional): (nodeX, nodeY).
+                params (dict, optional): Parameter values, or {'mode': 'expr', 'expr': ...}
+                    dicts as stored on stubs.
+                connections (list, optional): (source, output_index, input_index) inputs of
+                    the operator. source is the name of another operator of the batch,
+                    or an operator or path outside it, relative paths resolved from parent.
+            undo_mode (str, optional): Overrides the Undomode parameter.
+        Returns:
+            BatchResult: 'placed' count, placed paths in items, per-op timings.
+        """
+        result = BatchResult('Placeops')
+        specs = [self.place_spec(spec) for spec in specs]
+        clone = self.batch_setting('Placemode', 'copy') == 'clone'
+
+        with self.perf.phase('Placeops'), \
+                self.batch_undo(f'Place {self.family_name} operators', mode=undo_mode) as undo:
+            with self.perf.phase('match'):
+                masters = {}
+                for spec in specs:
+                    if spec['type'] not in masters:
+                        masters[spec['type']] = self.get_master(spec['type'])
+
+            placed = []
+            by_name = {}
+            cooking = {}
+            usage = {}
+            for spec in specs:
+                start = time.perf_counter()
+                master = masters[spec['type']]
+                if master is None:
+                    result.errors.append(f"No master component found for type {spec['type']}")
+                    continue
+                if spec['parent'] is None:
+                    result.errors.append(f"No parent to place {spec['name'] or spec['type']} in")
+                    continue
+                try:
+                    with self.perf.phase('copy', spec['parent'].path):
+                        comp = spec['parent'].copy(master, name=spec['name'] or f"{spec['type'].replace(' ', '_')}1")
+                    comp.allowCooking = False
+                    comp.bypass = False
+                    if spec['position']:
+                        comp.nodeX, comp.nodeY = spec['position'][0], spec['position'][1]
+                    with self.perf.phase('param restore', comp.path):
+                        for name, value in spec['params'].items():
+                            pars = comp.pars(name)
+                            if pars:
+                                self.data_to_par(pars[0], value)
+                            else:
+                                result.errors.append(f"{comp.path} has no parameter {name}")
+                    if clone:
+                        self.link_to_master(comp, master)
+                    placed.append((spec, comp))
+                    if spec['name']:
+                        by_name[spec['name']] = comp
+                    cooking[comp.path] = True
+                    usage[spec['type']] = usage.get(spec['type'], 0) + 1
+                    result.items.append(comp.path)
+                    undo.step('place', master.path, comp.path)
+                    result.time_op(comp.path, start)
+                except Exception as e:
+                    result.errors.append(f"Error placing {spec['type']} in {spec['parent'].path}: {e}")
+
+            # Every connection of the batch at once, sources of the batch by name
+            edges = []
+            for spec, comp in placed:
+                for source, out_index, in_index in spec['connections']:
+                    if isinstance(source, str):
+                        source = by_name[source] if source in by_name else spec['parent'].op(source)
+                    if source is None:
+                        result.errors.append(f"Input {in_index} of {comp.path} not found")
+                        continue
+                    edges.append((source.path, out_index, comp.path, in_index))
+            with self.perf.phase('reconnect'):
+                failed_edges = self.rewire_connections(edges)
+            if failed_edges:
+                result.errors.append(f"{failed_edges} connection(s) could not be made")
+
+            with self.perf.phase('activate'):
+                self.activate_cooking(cooking, edges)
+
+        for op_type, count in usage.items():
+            self.record_usage(op_type, count)
+        result.count('placed', len(result.items))
+        return result.finish()
+
+    def CreatestubsBatch(self, allow_untagged=True, undo_mode=None, stub_type=None, top=None, min_score=None,
+                         scope=None):
+        """
+        Non-interactive Createstubs: stubs every family instance without
+        showing any dialog.
+
+        Args:
+            allow_untagged (bool): Proceed when some instances have no type tag.
+                When False the batch is cancelled instead.
+            undo_mode (str, optional): 'single', 'chunked' or 'journal'; defaults
+                to the Undomode parameter.
+            stub_type (str, optional): 'empty' or 'frozen'; defaults to the
+                Stubtype parameter.
+            top (int, optional): Only stub the N best candidates of the stub_advisor ranking.
+            min_score (float, optional): Only stub candidates scoring at least this.
+                Without top and min_score the Stubselect parameter decides.
+            scope (optional): Root COMP, path, list of either, 'selection' or
+                'project' (see scope_roots); defaults to the Scope parameter.
+        Returns:
+            BatchResult
+        """
+        family_ops = self.select_stub_candidates(self.collect_family_ops(self.scope_roots(scope)),
+                                                 top=top, min_score=min_score)
+        untagged = [comp for comp in family_ops if not self.type_tag(comp)]
+        if untagged and not allow_untagged:
+            result = BatchResult('Createstubs')
+            result.skipped = [comp.path for comp in untagged]
+            return self.report_result(result.cancel(f"{len(untagged)} operators have no type tag"))
+        return self.report_result(self.create_stubs(family_ops, undo_mode=undo_mode, stub_type=stub_type))
+
+    def ReplacestubsBatch(self, undo_mode=None, scope=None):
+        """
+        Non-interactive Replacestubs: regenerates every stub of this family
+        in scope without showing any dialog.
+
+        Args:
+            scope (optional): See CreatestubsBatch; defaults to the Scope parameter.
+        Returns:
+            BatchResult
+        """
+        stubs = self.collect_stubs(self.scope_roots(scope))
+        return self.report_result(self.replace_stubs(stubs, undo_mode=undo_mode))
+
+    def UpdateallBatch(self, allow_unmatched=True, undo_mode=None, scope=None):
+        """
+        Non-interactive Updateall: updates every family instance without
+        showing any dialog.
+
+        Args:
+            allow_unmatched (bool): Proceed when some instances match no master
+                (they are skipped). When False the batch is cancelled instead.
+            scope (optional): See CreatestubsBatch; defaults to the Scope parameter.
+        Returns:
+            BatchResult
+        """
+        family_ops = self.collect_family_ops(self.scope_roots(scope))
+        result = BatchResult('Updateall')
+        operators_folder = self.ownerComp.op('custom_operators')
+        if not operators_folder:
+            return self.report_result(result.cancel("'custom_operators' folder not found in the installer component"))
+        self._master_index = None
+        if not allow_unmatched:
+            unmatched = [comp.path for comp in family_ops if not self.find_matching_master_op(comp, operators_folder)[0]]
+            if unmatched:
+                result.skipped = unmatched
+                return self.report_result(result.cancel(f"{len(unmatched)} operators match no master"))
+        return self.report_result(self.update_comps(family_ops, undo_mode=undo_mode))
+
+    def Backfilltypetags(self, scope=None, undo_mode=None):
+        """
+        One time repair of the instances without a {type}{family} tag: each
+        is resolved to its master through the ext0object map of master_index
+        and given the master's type tag, so later batches match it by tag.
+        Instances whose extension is shared by several masters are resolved
+        by name when possible and reported as ambiguous otherwise.
+
+        Args:
+            scope: Overrides the Scope parameter, see scope_roots.
+            undo_mode (str, optional): Overrides the Undomode parameter.
+        Returns:
+            BatchResult: 'tagged', 'ambiguous' and 'unmatched' counts, tagged
+                paths in items, the others in skipped with the reason in errors.
+        """
+        result = BatchResult('Backfilltypetags')
+        result.counts.update({"tagged": 0, "ambiguous": 0, "unmatched": 0})
+        self._master_index = None
+
+        with self.perf.phase('Backfilltypetags'), \
+                self.batch_undo(f'Tag {self.family_name} operators', mode=undo_mode) as undo:
+            untagged = [comp for comp in self.collect_family_ops(self.scope_roots(scope)) if not self.type_tag(comp)]
+            for comp in untagged:
+                # Clone linked instances name their master already
+                master = self.clone_master(comp)
+                candidates = [master] if master else self.ext_candidates(comp)
+                master = master or (self.pick_ext_master(comp, candidates) if candidates else None)
+                if master is None:
+                    result.skipped.append(comp.path)
+                    if candidates:
+                        result.count('ambiguous')
+                        result.errors.append(f"{comp.path}: ambiguous, matches {', '.join(m.name for m in candidates)}")
+                    else:
+                        result.count('unmatched')
+                        result.errors.append(f"{comp.path}: no master shares its ext0object")
+                    continue
+                tag = f"{master.name}{self.family_name}"
+                comp.tags.add(tag)
+                undo.step('tag', comp.path, tag)
+                result.items.append(comp.path)
+                result.count('tagged')
+
+        for error in result.errors:
+            self.log.Warning("Backfilltypetags: %s", error)
+        return self.report_result(result.finish())
+
+    def inventory_record(self, comp, masters):
+        """
+        Returns the inventory entry of a family instance or stub: its type,
+        version and the version of its master, parameters differing from
+        the master and connection counts.
+
+        Args:
+            comp (COMP): The instance or stub.
+            masters (dict): (version, captured parameters) of the master by type,
+                filled as types are met.
+        """
+        stub = self.is_stub(comp)
+        if stub:
+            op_type = comp.fetch('op_type', None, search=False) or self.getElement(comp.tags).removesuffix(f"{self.family_name}stub")
+        else:
+            type_tag = self.type_tag(comp)
+            op_type = type_tag.removesuffix(self.family_name) if type_tag else comp.name
+
+        if op_type not in masters:
+            operators_folder = self.ownerComp.op('custom_operators')
+            master_ops = operators_folder.findChildren(name=op_type, maxDepth=1) if operators_folder else []
+            master = master_ops[0] if master_ops else None
+            if master is None:
+                masters[op_type] = (None, {})
+            else:
+                masters[op_type] = (master.par.Version.eval() if hasattr(master.par, 'Version') else None,
+                                    self.capture_params(master))
+        master_version, master_params = masters[op_type]
+
+        # Stubs only have the values stored on them, the live parameters are gone
+        values = comp.fetch('params', {}, search=False) if stub else self.capture_params(comp)
+        params = {name: value for name, value in values.items()
+                  if name != 'Version' and (name not in master_params or value != master_params[name])}
+        if stub:
+            version = values.get('Version')
+            edges = comp.fetch('edges', None, search=False) or []
+            original_path = f"{comp.parent().path}/{comp.name.removesuffix('_stub')}"
+            inputs = sum(1 for edge in edges if edge[2] in (original_path, comp.path))
+            outputs = sum(1 for edge in edges if edge[0] in (original_path, comp.path))
+        else:
+            version = comp.par.Version.eval() if hasattr(comp.par, 'Version') else None
+            inputs = sum(len(c.connections) for c in comp.inputConnectors)
+            outputs = sum(len(c.connections) for c in comp.outputConnectors)
+
+        return {
+            'project': project.name,
+            'family': self.family_name,
+            'path': comp.path,
+            'type': op_type,
+            'version': version,
+            'master_version': master_version,
+            'stub': stub,
+            'clone': bool(self.clone_master(comp)) if not stub else False,
+            'params': params,
+            'inputs': inputs,
+            'outputs': outputs,
+        }
+
+    def ExportInventory(self, path=None, scope=None):
+        """
+        Writes one JSON line per instance and stub of this family to path,
+        streaming over the network rather than collecting it first. Merge
+        the files of several projects with inventory_aggregate.py.
+
+        Args:
+            path (str, optional): Defaults to the Inventoryfile parameter.
+            scope: Overrides the Scope parameter, see scope_roots.
+        Returns:
+            int: The number of entries written.
+        """
+        path = path or self.batch_setting('Inventoryfile', '')
+        if not path:
+            self.log.Error("ExportInventory: No inventory file given.")
+            return 0
+
+        masters = {}
+        count = 0
+        key = lambda o: self.is_family_op(o) or self.is_stub(o)
+        try:
+            with self.perf.phase('Exportinventory'), open(path, 'w') as f:
+                for comp in self.iter_in_scope(self.scope_roots(scope), key):
+                    f.write(json.dumps(self.inventory_record(comp, masters), default=str) + '\n')
+                    count += 1
+        except OSError as e:
+            self.log.Error("ExportInventory: Could not write %s: %s", path, e)
+            return count
+        self.log.Info("ExportInventory: Wrote %s %s entries to %s", count, self.family_name, path)
+        return count
+
+    def schedule_perf_report(self, recorder):
+        """Writes the perf report at the end of the frame, once however many phases finished in it."""
+        if not self._perf_report_pending:
+            self._perf_report_pending = True
+            run("args[0].write_perf_report(args[1])", self, recorder, endFrame=True, delayRef=op.TDResources)
+
+    def write_perf_report(self, recorder):
+        """
+        Writes the phase timings to the perf_report Table DAT inside the
+        installer, and to the JSON file set in the Perffile parameter if any.
+        """
+        self._perf_report_pending = False
+        table = self.ownerComp.op('perf_report')
+        if table is None:
+            table = self.ownerComp.create(tableDAT, 'perf_report')
+        table.clear()
+        for row in recorder.rows():
+            table.appendRow(row)
+
+        path = self.batch_setting('Perffile', '')
+        if not path:
+            return
+        try:
+            with open(path, 'w') as f:
+                json.dump({'family': self.family_name,
+                           'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                           'phases': recorder.to_dict()}, f, indent=2)
+        except OSError as e:
+            self.log.Error("write_perf_report: Could not write %s: %s", path, e)
+
+    def Profile(self, frames=None):
+        """
+        Samples the cook cost of every family instance over a number of frames
+        and writes it, aggregated by operator type, to the profile_report Table
+        DAT (plus the worst instances to profile_top) inside the installer.
+
+        Args:
+            frames (int, optional): Frames to sample, defaults to the Profileframes parameter.
+        Returns:
+            CookProfile: Filled in over the next frames, complete once .done is True.
+        """
+        frames = frames or self.batch_setting('Profileframes', 30)
+        profile = CookProfile(frames)
+        self.last_profile = profile
+        self.log.Info("Profile: Sampling %s operators over %s frames", self.family_name, profile.frames)
+        self.profile_step(profile, self.collect_family_ops())
+        return profile
+
+    def profile_step(self, profile, comps):
+        """Takes one frame of samples, then schedules the next or writes the report."""
+        for comp in comps:
+            if not comp.valid:
+                continue
+            op_type = (self.type_tag(comp) or '').removesuffix(self.family_name) or '(untagged)'
+            profile.add_sample(
+                comp.path, op_type,
+                comp.cookTime + getattr(comp, 'childrenCookTime', 0.0),
+                comp.cpuCookTime + getattr(comp, 'childrenCPUCookTime', 0.0),
+                comp.gpuCookTime + getattr(comp, 'childrenGPUCookTime', 0.0),
+                comp.childrenCPUMemory(), comp.childrenGPUMemory(),
+                comp.numChildrenRecursive)
+        profile.frames_sampled += 1
+
+        if not profile.done:
+            run("args[0].profile_step(args[1], args[2])", self, profile, comps,
+                delayFrames=1, delayRef=op.TDResources)
+            return
+        self.write_profile_report(profile)
+
+    def write_profile_report(self, profile):
+        """Writes a finished CookProfile to the profile_report and profile_top Table DATs."""
+        for name, rows in (('profile_report', profile.report_rows()),
+                           ('profile_top', profile.top_rows(self.batch_setting('Profiletop', 20)))):
+            table = self.ownerComp.op(name)
+            if table is None:
+                table = self.ownerComp.create(tableDAT, name)
+            table.clear()
+            for row in rows:
+                table.appendRow(row)
+        self.log.Info("Profile: %s instances of %s types sampled over %s frames",
+                      len(profile.samples), len(profile.by_type()), profile.frames_sampled)
+
+    def Advise(self, profile=None):
+        """
+        Ranks family instances by how much stubbing them is expected to save
+        and writes the ranking to the stub_advisor Table DAT.
+
+        The score (0-100) weighs, relative to the most expensive instance:
+        CPU + GPU cook time 40%, GPU memory 30%, frames since the component
+        last cooked (neither viewed nor changed) 20% and subtree size 10%.
+
+        Args:
+            profile (CookProfile, optional): Samples to rank. Defaults to the
+                last finished Profile run, or a single frame sampled now.
+        Returns:
+            list: One dict per instance, best candidate first.
+        """
+        profile = profile or self.last_profile
+        if profile is None or not profile.done:
+            profile = CookProfile(1)
+            self.profile_step(profile, self.collect_family_ops())
+
+        frame = absTime.frame
+        candidates = []
+        for inst in profile.instances():
+            comp = op(inst['path'])
+            if not comp:
+                continue
+            inst['idle'] = max(0, frame - getattr(comp, 'cookAbsFrame', frame))
+            candidates.append(inst)
+
+        def top(key):
+            return max((c[key] for c in candidates), default=0) or 1
+
+        max_cost = max((c['cpu'] + c['gpu'] for c in candidates), default=0) or 1
+        max_gpu_mem, max_idle, max_children = top('gpu_mem'), top('idle'), top('children')
+        for c in candidates:
+            c['score'] = 100 * (0.4 * (c['cpu'] + c['gpu']) / max_cost
+                                + 0.3 * c['gpu_mem'] / max_gpu_mem
+                                + 0.2 * c['idle'] / max_idle
+                                + 0.1 * c['children'] / max_children)
+        candidates.sort(key=lambda c: c['score'], reverse=True)
+
+        table = self.ownerComp.op('stub_advisor')
+        if table is None:
+            table = self.ownerComp.create(tableDAT, 'stub_advisor')
+        table.clear()
+        table.appendRow(['rank', 'path', 'type', 'score', 'save_ms', 'save_cpu_mb', 'save_gpu_mb',
+                         'children', 'idle_frames'])
+        for rank, c in enumerate(candidates, start=1):
+            table.appendRow([rank, c['path'], c['type'], f"{c['score']:.1f}", f"{c['cpu'] + c['gpu']:.3f}",
+                             f"{c['cpu_mem'] / 1048576:.2f}", f"{c['gpu_mem'] / 1048576:.2f}",
+                             c['children'], c['idle']])
+
+        total_ms = sum(c['cpu'] + c['gpu'] for c in candidates)
+        self.log.Info("Advise: Ranked %s instances, stubbing all would save about %.2f ms per frame",
+                      len(candidates), total_ms)
+        return candidates
+
+    def select_stub_candidates(self, comps, top=None, min_score=None):
+        """
+        Narrows comps down to the best stubbing candidates, ranked again by
+        Advise on every call (rewriting the stub_advisor table). The last
+        Profile run supplies the cook costs if it sampled every one of comps,
+        otherwise comps are sampled for one frame now.
+
+        Args:
+            comps (list): Family components eligible for stubbing.
+            top (int, optional): Keep the N best ranked instances.
+            min_score (float, optional): Keep instances scoring at least this.
+                When neither is given they come from the Stubselect, Stubtop
+                and Stubminscore parameters; 'all' returns comps unchanged.
+        Returns:
+            list: The selected components, best candidate first.
+        """
+        if top is None and min_score is None:
+            mode = self.batch_setting('Stubselect', 'all')
+            if mode == 'top':
+                top = self.batch_setting('Stubtop', 10)
+            elif mode == 'score':
+                min_score = self.batch_setting('Stubminscore', 50.0)
+            else:
+                return comps
+
+        profile = self.last_profile
+        if profile is None or not profile.done or any(comp.path not in profile.samples for comp in comps):
+            profile = CookProfile(1)
+            self.profile_step(profile, comps)
+
+        by_path = {comp.path: comp for comp in comps}
+        selected = []
+        for candidate in self.Advise(profile):
+            if top is not None and len(selected) >= int(top):
+                break
+            if min_score is not None and candidate['score'] < float(min_score):
+                break
+            comp = by_path.get(candidate['path'])
+            if comp is not None:
+                selected.append(comp)
+        return selected
+
+    def report_result(self, result):
+        """Logs a batch result summary and keeps it as last_result."""
+        self.last_result = result
+        self.log.Info("%s", result)
+        return result
+
     def Updateall(self):
         """
         Updates all components of this family type to the newest version.
         """
-        # print(f"Updateall: Starting for {self.family_name}")
+        if not self.is_interactive():
+            return self.UpdateallBatch()
 
-        family_ops = op('/').findChildren(type=COMP, key=lambda o: (
-            self.family_name in o.tags and
-            not hasattr(o.parent, self.family_name) and
-            not hasattr(o.parent, f"{self.family_name}OPs") and
-            o != self.ownerComp and
-            self.ownerComp.path not in o.path
-        ))
+        family_ops = self.collect_family_ops(self.scope_roots())
 
         if not family_ops:
             ui.messageBox(
@@ -1102,11 +3676,12 @@ Do you want to continue?
         ops_without_type_tags = []
         ops_with_ext_object = []
         ops_without_matches = []
+        ops_clone_linked = []
 
         for comp in family_ops:
-            has_type_tag = any(tag.endswith(self.family_name) and tag != self.family_name for tag in comp.tags)
-
-            if not has_type_tag:
+            if self.clone_master(comp):
+                ops_clone_linked.append(comp)
+            elif not self.type_tag(comp):
                 ops_without_type_tags.append(comp)
 
                 if hasattr(comp.par, 'ext0object') and comp.par.ext0object.eval():
@@ -1144,6 +3719,7 @@ Of these operators:
 • {len(family_ops) - len(ops_without_type_tags)} have type tags
 • {len(ops_with_ext_object)} will be matched using ext0object
 • {len(ops_without_matches)} cannot be matched (will be skipped)
+• {len(ops_clone_linked)} are clone linked and will be refreshed from their master
 
 Updating will:
 • Preserve connections
@@ -1159,48 +3735,22 @@ Do you want to continue?
         if choice != 0:
             return
 
-        ui.undo.startBlock(f'Update {self.family_name} operators')
-
-        updated = []
-        skipped = []
-        errors = []
-        match_methods = {"type_tag": 0, "ext0object": 0, "none": 0}
-
-        for op_comp in family_ops:
-            try:
-                # print(f"Updateall: Processing {op_comp.path}")
-
-                success, message = self.update_comp(op_comp)
-
-                if success:
-                    updated.append(op_comp.path)
-                    if "matched via type_tag" in message:
-                        match_methods["type_tag"] += 1
-                    elif "matched via ext0object" in message:
-                        match_methods["ext0object"] += 1
-                else:
-                    if "no matching master component found" in message:
-                        skipped.append(op_comp.path)
-                    else:
-                        errors.append(message)
-            except Exception as e:
-                error_msg = f"Error updating {op_comp.path}: {e}"
-                if hasattr(op,'Logger'):
-                    op.Logger.Error(error_msg)
-                else:
-                    print(error_msg)
-                errors.append(error_msg)
-
-        ui.undo.endBlock()
+        result = self.update_comps(family_ops)
+        updated = result.items
+        skipped = result.skipped
+        errors = result.errors
+        match_methods = result.counts
 
         completion_message = f"Successfully updated {len(updated)} {self.family_name} operator(s) to the latest version.\n\n"
 
         if updated:
             completion_message += "Match methods used:\n"
-            if match_methods["type_tag"] > 0:
+            if match_methods.get("type_tag", 0) > 0:
                 completion_message += f"• {match_methods['type_tag']} operators matched by type tag\n"
-            if match_methods["ext0object"] > 0:
+            if match_methods.get("ext0object", 0) > 0:
                 completion_message += f"• {match_methods['ext0object']} operators matched by ext0object\n"
+            if match_methods.get("clone", 0) > 0:
+                completion_message += f"• {match_methods['clone']} clone linked operators refreshed\n"
             completion_message += "\n"
 
         if skipped:
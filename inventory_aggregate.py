@@ -0,0 +1,179 @@
+"""
+Merges the family inventories written by ExportInventory (one JSON object
+per line and operator) from any number of projects into fleet wide summary
+tables. Runs without TouchDesigner; the files are parsed in parallel by a
+process pool and the partial summaries merged at the end.
+
+    python inventory_aggregate.py show1.jsonl show2.jsonl
+    python inventory_aggregate.py inventories/*.jsonl --out summary --workers 8
+
+With --out the tables are written as CSV files to that folder:
+    types.csv     family, type, instances, stubs, clones, drifted, projects, versions
+    versions.csv  family, type, version, instances, projects
+    params.csv    family, type, param, overrides
+    projects.csv  project, family, instances, stubs, drifted, types
+Without it the types table is printed.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def empty_summary():
+    return {
+        # (family, type) -> [instances, stubs, clones, drifted, projects, versions]
+        'types': {},
+        # (family, type, version) -> [instances, projects]
+        'versions': {},
+        # (family, type, param) -> instances overriding it
+        'params': Counter(),
+        # (project, family) -> [instances, stubs, drifted, types]
+        'projects': {},
+        'entries': 0,
+        'bad_lines': 0,
+    }
+
+
+def add_entry(summary, entry, default_project):
+    """Adds one inventory line to a summary."""
+    project = entry.get('project') or default_project
+    family = entry.get('family', '')
+    op_type = entry.get('type', '')
+    version = entry.get('version')
+    master_version = entry.get('master_version')
+    drifted = version is not None and master_version is not None and version != master_version
+
+    row = summary['types'].setdefault((family, op_type), [0, 0, 0, 0, set(), set()])
+    row[0] += 1
+    row[1] += bool(entry.get('stub'))
+    row[2] += bool(entry.get('clone'))
+    row[3] += drifted
+    row[4].add(project)
+    row[5].add(str(version))
+
+    row = summary['versions'].setdefault((family, op_type, str(version)), [0, set()])
+    row[0] += 1
+    row[1].add(project)
+
+    for name in entry.get('params') or {}:
+        summary['params'][(family, op_type, name)] += 1
+
+    row = summary['projects'].setdefault((project, family), [0, 0, 0, set()])
+    row[0] += 1
+    row[1] += bool(entry.get('stub'))
+    row[2] += drifted
+    row[3].add(op_type)
+    summary['entries'] += 1
+
+
+def summarize_file(path):
+    """Reads one inventory file, line by line, into a partial summary."""
+    summary = empty_summary()
+    default_project = Path(path).stem
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                summary['bad_lines'] += 1
+                continue
+            add_entry(summary, entry, default_project)
+    return summary
+
+
+def merge(total, part):
+    """Merges the partial summary part into total."""
+    for key, row in part['types'].items():
+        into = total['types'].setdefault(key, [0, 0, 0, 0, set(), set()])
+        for i in range(4):
+            into[i] += row[i]
+        into[4] |= row[4]
+        into[5] |= row[5]
+    for key, row in part['versions'].items():
+        into = total['versions'].setdefault(key, [0, set()])
+        into[0] += row[0]
+        into[1] |= row[1]
+    total['params'].update(part['params'])
+    for key, row in part['projects'].items():
+        into = total['projects'].setdefault(key, [0, 0, 0, set()])
+        for i in range(3):
+            into[i] += row[i]
+        into[3] |= row[3]
+    total['entries'] += part['entries']
+    total['bad_lines'] += part['bad_lines']
+    return total
+
+
+def tables(summary):
+    """Returns the summary tables as {name: (header, rows)}."""
+    return {
+        'types': (['family', 'type', 'instances', 'stubs', 'clones', 'drifted', 'projects', 'versions'],
+                  [[family, op_type, *row[:4], len(row[4]), ' '.join(sorted(row[5]))]
+                   for (family, op_type), row in sorted(summary['types'].items())]),
+        'versions': (['family', 'type', 'version', 'instances', 'projects'],
+                     [[*key, row[0], len(row[1])] for key, row in sorted(summary['versions'].items())]),
+        'params': (['family', 'type', 'param', 'overrides'],
+                   [[*key, count] for key, count in sorted(summary['params'].items())]),
+        'projects': (['project', 'family', 'instances', 'stubs', 'drifted', 'types'],
+                     [[*key, *row[:3], len(row[3])] for key, row in sorted(summary['projects'].items())]),
+    }
+
+
+def aggregate(paths, workers=None):
+    """Summarizes the inventory files at paths in parallel and merges the results."""
+    total = empty_summary()
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            merge(total, summarize_file(path))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(summarize_file, paths):
+            merge(total, part)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='+', help='Inventory files or glob patterns')
+    parser.add_argument('--out', default='', help='Folder to write the CSV tables to')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    paths = sorted({path for pattern in args.files for path in (glob.glob(pattern) or [pattern])})
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"not found: {', '.join(missing)}")
+
+    summary = aggregate(paths, args.workers)
+    result = tables(summary)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name, (header, rows) in result.items():
+            with open(os.path.join(args.out, f'{name}.csv'), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+    else:
+        header, rows = result['types']
+        print('\t'.join(header))
+        for row in rows:
+            print('\t'.join(str(v) for v in row))
+
+    print(f"{summary['entries']} entries from {len(paths)} files"
+          + (f", {summary['bad_lines']} unreadable lines" if summary['bad_lines'] else ''), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())